@@ -1,10 +1,15 @@
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
+import contextlib
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional
 from sqlalchemy.orm import Session
 
+from agents import decision_policy
 from events.event_bus import EventBus
 from events.event_definitions import EventType, EventCategory
+from events.payload_blobs import slim_payload
 from core.logger import logger
+from core.settings import settings
 
 
 @dataclass
@@ -15,16 +20,88 @@ class BaseAgent:
     event_bus: EventBus
     config: Optional[Dict[str, Any]] = None
 
+    # decisions collected while inside batch_decisions()
+    _batched: Optional[List[Dict[str, Any]]] = field(default=None, init=False, repr=False)
+    # decisions dropped by sampling since the last published one
+    _sampled_out: int = field(default=0, init=False, repr=False)
+
     def emit_decision(self, message: str, payload: Optional[Dict[str, Any]] = None, blueprint_id=None, task_id=None):
         """
         Helper: log a decision event, both in logs and in EventBus.
+
+        Subject to the agent role's verbosity and sample rate
+        (AGENT_DECISION_VERBOSITY / AGENT_DECISION_SAMPLE_RATES); the next
+        published decision reports how many were sampled out before it.
         """
+        if self._batched is not None:
+            self._batched.append({"message": message, "blueprint_id": blueprint_id, "task_id": task_id})
+            decision_policy.record(self.role, "batched")
+            return
+
+        if decision_policy.verbosity_for(self.role) == "off":
+            logger.debug(f"[Agent:{self.name}] {message}")
+            decision_policy.record(self.role, "off")
+            return
+
+        rate = decision_policy.sample_rate_for(self.role)
+        if rate < 1.0 and random.random() >= rate:
+            logger.debug(f"[Agent:{self.name}] {message}")
+            self._sampled_out += 1
+            decision_policy.record(self.role, "sampled_out")
+            return
+
+        if self._sampled_out:
+            payload = dict(payload or {}, sampled={"rate": rate, "skipped": self._sampled_out})
+            self._sampled_out = 0
+
+        self._publish_decision(message, payload, blueprint_id, task_id)
+
+    def _publish_decision(self, message: str, payload: Optional[Dict[str, Any]], blueprint_id=None, task_id=None):
         logger.info(f"[Agent:{self.name}] {message}")
         self.event_bus.publish(
             event_type=EventType.AGENT_DECISION,
             category=EventCategory.AGENT,
             message=message,
-            payload=payload or {},
+            payload=slim_payload(
+                payload,
+                settings.AGENT_DECISION_PAYLOAD_BUDGET,
+                summarize=decision_policy.verbosity_for(self.role) == "summary",
+            ),
             blueprint_id=blueprint_id,
             task_id=task_id,
-        )
\ No newline at end of file
+        )
+        decision_policy.record(self.role, "published")
+
+    @contextlib.contextmanager
+    def batch_decisions(self) -> Iterator[None]:
+        """
+        Collect emit_decision() calls made inside the block and publish one
+        summary decision when it exits, instead of one event (and log line)
+        per call. Per-decision payloads are dropped; nested blocks fold into
+        the outermost one.
+        """
+        if self._batched is not None:
+            yield
+            return
+
+        self._batched = []
+        try:
+            yield
+        finally:
+            batched, self._batched = self._batched, None
+            if batched:
+                self._emit_summary(batched)
+
+    def _emit_summary(self, batched: List[Dict[str, Any]]) -> None:
+        # never sampled: it stands for every decision in the batch
+        if decision_policy.verbosity_for(self.role) == "off":
+            return
+        blueprint_ids = sorted({d["blueprint_id"] for d in batched if d["blueprint_id"] is not None})
+        self._publish_decision(
+            message=f"{len(batched)} decisions (batched); last: {batched[-1]['message']}",
+            payload={
+                "count": len(batched),
+                "blueprint_ids": blueprint_ids,
+                "messages": [d["message"] for d in batched[:5]],
+            },
+        )
@@ -0,0 +1,45 @@
+import collections
+import threading
+from typing import Any, Dict
+
+from core.settings import settings
+
+VERBOSITY_LEVELS = ("off", "summary", "full")
+
+_stats: "collections.Counter[tuple]" = collections.Counter()
+_stats_lock = threading.Lock()
+
+
+def verbosity_for(role: str) -> str:
+    """
+    Decision-event verbosity for an agent role: off | summary | full.
+    """
+    levels = settings.AGENT_DECISION_VERBOSITY
+    level = levels.get(role, levels.get("default", "summary"))
+    return level if level in VERBOSITY_LEVELS else "summary"
+
+
+def sample_rate_for(role: str) -> float:
+    """
+    Fraction of an agent's decisions that are published (0..1).
+    """
+    rates = settings.AGENT_DECISION_SAMPLE_RATES
+    return min(1.0, max(0.0, float(rates.get(role, rates.get("default", 1.0)))))
+
+
+def record(role: str, outcome: str, n: int = 1) -> None:
+    # outcome: published | sampled_out | off | batched
+    with _stats_lock:
+        _stats[(role, outcome)] += n
+
+
+def decision_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Per-role decision counters since process start.
+    """
+    with _stats_lock:
+        items = list(_stats.items())
+    out: Dict[str, Dict[str, Any]] = {}
+    for (role, outcome), n in sorted(items):
+        out.setdefault(role, {"verbosity": verbosity_for(role), "sample_rate": sample_rate_for(role)})[outcome] = n
+    return out
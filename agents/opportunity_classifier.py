@@ -1,8 +1,77 @@
-from typing import Dict, Any
+import re
+from typing import Dict, Any, Optional, Sequence
+
+import numpy as np
 from sqlalchemy.orm import Session
 
 from agents.base_agent import BaseAgent
 
+# (name, keywords, roi delta, automation delta, risk delta); each rule
+# applies at most once per title, on a substring match of any keyword
+_RULES = (
+    ("automation", ("ai", "automation", "bot"), 0, 25, 0),
+    ("income", ("get paid", "earn", "income"), 15, 0, 0),
+    ("beginner", ("no experience", "beginner"), 5, 0, 0),
+    ("manual", ("survey", "captcha", "manual typing"), -15, -10, 0),
+    ("speculative", ("crypto", "forex", "binary options"), -10, 0, 20),
+)
+_DELTAS = np.array([r[2:] for r in _RULES], dtype=np.float64)  # (rules, 3)
+
+
+class _KeywordMatcher:
+    """
+    Every _RULES keyword compiled into one regex, run once over all titles
+    joined into a single string.
+
+    The pattern is a zero-width lookahead, so it reports a match at every
+    position a keyword starts, overlapping ones included ("ai" inside
+    "paid"), which is exactly the `in` substring test classify() does.
+    Match offsets map back to their title with np.searchsorted.
+    """
+
+    def __init__(self):
+        keywords = sorted({k for r in _RULES for k in r[1]}, key=len, reverse=True)
+        rules_of = {k: [i for i, r in enumerate(_RULES) if k in r[1]] for k in keywords}
+        # at one position only the longest alternative is reported, so a
+        # keyword also counts for every keyword that is a prefix of it
+        self._rules_of = {
+            k: sorted({i for p in keywords if k.startswith(p) for i in rules_of[p]})
+            for k in keywords
+        }
+        self._pattern = re.compile("(?=(" + "|".join(map(re.escape, keywords)) + "))")
+
+    def rule_hits(self, titles: Sequence[str]) -> np.ndarray:
+        hits = np.zeros((len(titles), len(_RULES)), dtype=bool)
+        if not len(titles):
+            return hits
+
+        texts = [(t or "").lower().replace("\n", " ") for t in titles]
+        corpus = "\n".join(texts)  # keywords contain no newline: no match spans two titles
+        starts = np.cumsum([0] + [len(t) + 1 for t in texts[:-1]])
+
+        positions = []
+        rules = []
+        rules_of = self._rules_of
+        for m in self._pattern.finditer(corpus):
+            for rule in rules_of[m.group(1)]:
+                positions.append(m.start())
+                rules.append(rule)
+
+        if positions:
+            rows = np.searchsorted(starts, positions, side="right") - 1
+            hits[rows, rules] = True
+        return hits
+
+
+_MATCHER: Optional[_KeywordMatcher] = None
+
+
+def _matcher() -> _KeywordMatcher:
+    global _MATCHER
+    if _MATCHER is None:
+        _MATCHER = _KeywordMatcher()
+    return _MATCHER
+
 
 class OpportunityClassifierAgent(BaseAgent):
     """
@@ -30,23 +99,12 @@ class OpportunityClassifierAgent(BaseAgent):
         automation = 50.0
         risk = 50.0
 
-        # Heuristics (simple for now)
-        if "ai" in text or "automation" in text or "bot" in text:
-            automation += 25
-
-        if "get paid" in text or "earn" in text or "income" in text:
-            roi += 15
-
-        if "no experience" in text or "beginner" in text:
-            roi += 5
-
-        if "survey" in text or "captcha" in text or "manual typing" in text:
-            roi -= 15
-            automation -= 10
-
-        if "crypto" in text or "forex" in text or "binary options" in text:
-            risk += 20
-            roi -= 10
+        # Heuristics (simple for now), see _RULES
+        for _, keywords, d_roi, d_auto, d_risk in _RULES:
+            if any(k in text for k in keywords):
+                roi += d_roi
+                automation += d_auto
+                risk += d_risk
 
         # clamp 0–100
         roi = max(0, min(100, roi))
@@ -65,4 +123,39 @@ class OpportunityClassifierAgent(BaseAgent):
             payload=result,
         )
 
-        return result
\ No newline at end of file
+        return result
+
+    def classify_batch(self, titles: Sequence[str], source: str = "") -> Dict[str, np.ndarray]:
+        """
+        Score many titles at once; same heuristics and results as classify().
+
+        Returns float arrays "roi_score", "automation_score", "risk_score"
+        (aligned with `titles`) and emits one summary event for the batch.
+        """
+        hits = _matcher().rule_hits(titles)          # (n, rules) bool
+        deltas = hits.astype(np.float64) @ _DELTAS  # (n, 3)
+        scores = np.clip(50.0 + deltas, 0.0, 100.0)
+
+        result = {
+            "roi_score": scores[:, 0],
+            "automation_score": scores[:, 1],
+            "risk_score": scores[:, 2],
+        }
+
+        n = len(titles)
+        if n:
+            means = scores.mean(axis=0)
+            self.emit_decision(
+                message=f"Classified {n} opportunities from '{source or 'batch'}' → "
+                        f"mean ROI={means[0]:.1f}, AUTO={means[1]:.1f}, RISK={means[2]:.1f}",
+                payload={
+                    "count": n,
+                    "source": source,
+                    "mean_roi_score": float(means[0]),
+                    "mean_automation_score": float(means[1]),
+                    "mean_risk_score": float(means[2]),
+                    "rule_hits": {r[0]: int(c) for r, c in zip(_RULES, hits.sum(axis=0))},
+                },
+            )
+
+        return result
@@ -1,8 +1,13 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Mapping, Optional, Sequence
+
+import numpy as np
 from sqlalchemy.orm import Session
 
 from agents.base_agent import BaseAgent
 
+# combined_score weights for roi, automation, risk
+WEIGHTS = (0.7, 0.3, -0.2)
+
 
 class ROIRankerAgent(BaseAgent):
     """
@@ -21,13 +26,14 @@ class ROIRankerAgent(BaseAgent):
 
     def rank(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         ranked = []
+        w_roi, w_auto, w_risk = WEIGHTS
 
         for item in items:
             roi = float(item.get("roi_score", 0))
             auto = float(item.get("automation_score", 0))
             risk = float(item.get("risk_score", 0))
 
-            score = roi * 0.7 + auto * 0.3 - risk * 0.2
+            score = roi * w_roi + auto * w_auto + risk * w_risk
             item_with_score = dict(item)
             item_with_score["combined_score"] = score
             ranked.append(item_with_score)
@@ -41,4 +47,59 @@ class ROIRankerAgent(BaseAgent):
                 payload={"top_item": top},
             )
 
-        return ranked
\ No newline at end of file
+        return ranked
+
+    def rank_batch(
+        self,
+        scores: Mapping[str, Sequence[float]],
+        top_k: int = 10,
+        labels: Optional[Sequence[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Vectorized rank() for large candidate sets, e.g. the arrays returned
+        by OpportunityClassifierAgent.classify_batch().
+
+        Only the best `top_k` are selected (np.argpartition, O(n)) and sorted.
+        Returns them best first, each with its index into the input (and its
+        label, if given). Emits one summary event.
+        """
+        roi = np.asarray(scores["roi_score"], dtype=np.float64)
+        auto = np.asarray(scores["automation_score"], dtype=np.float64)
+        risk = np.asarray(scores["risk_score"], dtype=np.float64)
+
+        n = len(roi)
+        k = max(0, min(top_k, n))
+        if not k:
+            return []
+
+        w_roi, w_auto, w_risk = WEIGHTS
+        combined = roi * w_roi + auto * w_auto + risk * w_risk
+
+        top = np.argpartition(-combined, k - 1)[:k] if k < n else np.arange(n)
+        top = top[np.argsort(-combined[top], kind="stable")]
+
+        ranked = [
+            {
+                "index": int(i),
+                "label": labels[i] if labels is not None else None,
+                "roi_score": float(roi[i]),
+                "automation_score": float(auto[i]),
+                "risk_score": float(risk[i]),
+                "combined_score": float(combined[i]),
+            }
+            for i in top
+        ]
+
+        best = ranked[0]
+        self.emit_decision(
+            message=f"Ranked {n} items, top {k}: best SCORE={best['combined_score']:.1f}"
+                    + (f" ({best['label'][:60]})" if best["label"] else ""),
+            payload={
+                "count": n,
+                "top_k": k,
+                "mean_score": float(combined.mean()),
+                "top_items": ranked[:5],
+            },
+        )
+
+        return ranked
@@ -0,0 +1,476 @@
+import collections
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode
+
+from core.logger import logger
+from core.settings import settings
+
+# (status, raw ASGI headers, body)
+CachedResponse = Tuple[int, List[Tuple[bytes, bytes]], bytes]
+
+
+class _Entry:
+    __slots__ = ("response", "expires_at", "tags")
+
+    def __init__(self, response: CachedResponse, expires_at: float, tags: Tuple[str, ...]):
+        self.response = response
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class SharedCacheTier:
+    """
+    SQLite file shared by every process using the same API_CACHE_PATH
+    (uvicorn workers, the engine process that owns the EventBus).
+
+    - cache_entries: key -> response, expiry, and the generation of each of
+      its tags when it was stored
+    - cache_tags: tag -> generation, bumped on every invalidation; an entry
+      is only served while all its tags are still at the stored generation
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=2000")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache_entries ("
+            "key TEXT PRIMARY KEY, status INTEGER NOT NULL, headers TEXT NOT NULL, body BLOB NOT NULL, "
+            "expires_at REAL NOT NULL, generations TEXT NOT NULL)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS cache_tags (tag TEXT PRIMARY KEY, generation INTEGER NOT NULL)")
+        self._conn.commit()
+        self._puts = 0
+
+    def generations(self, tags: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT tag, generation FROM cache_tags").fetchall()
+        gens = dict(rows)
+        return gens if tags is None else {t: gens.get(t, 0) for t in tags}
+
+    def get(self, key: str) -> Optional[Tuple[CachedResponse, float, Tuple[str, ...]]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, headers, body, expires_at, generations FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[3] <= time.time():
+            return None
+        stored = json.loads(row[4])
+        if self.generations(stored) != stored:
+            return None
+        headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in json.loads(row[1])]
+        return (row[0], headers, bytes(row[2])), row[3], tuple(stored)
+
+    def put(self, key: str, response: CachedResponse, expires_at: float, generations: Dict[str, int]) -> None:
+        status, headers, body = response
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache_entries (key, status, headers, body, expires_at, generations) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    status,
+                    json.dumps([(k.decode("latin-1"), v.decode("latin-1")) for k, v in headers]),
+                    body,
+                    expires_at,
+                    json.dumps(generations),
+                ),
+            )
+            self._puts += 1
+            if self._puts % 500 == 0:
+                self._conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+
+    def bump(self, tags: Iterable[str]) -> Dict[str, int]:
+        """
+        Invalidate `tags` for every process; returns their new generations.
+        """
+        with self._lock:
+            gens = {}
+            for tag in tags:
+                gens[tag] = self._conn.execute(
+                    "INSERT INTO cache_tags (tag, generation) VALUES (?, 1) "
+                    "ON CONFLICT(tag) DO UPDATE SET generation = generation + 1 RETURNING generation",
+                    (tag,),
+                ).fetchone()[0]
+            self._conn.commit()
+        return gens
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache_entries")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache of whole GET responses, keyed by path + sorted query
+    string, with tags for invalidation.
+
+    - memory tier: OrderedDict bounded to `max_entries`; a hit is a dict
+      lookup and an expiry check
+    - tag index: tag -> keys, so invalidate(["income"]) drops exactly the
+      income responses. Each tag also has a generation; a response computed
+      while its tags were invalidated is not stored (see begin()/put()).
+    - optional shared tier (`db_path`): misses fall back to the file, puts
+      and invalidations are written through. Invalidations made by other
+      processes are picked up every `sync_interval` seconds.
+
+    Invalidation comes from attach_to_bus() (event type -> tags, see
+    API_CACHE_EVENT_TAGS) and from events_written() for the "events" tag.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        db_path: Optional[str] = None,
+        event_tags: Optional[Dict[str, Sequence[str]]] = None,
+        sync_interval: Optional[float] = None,
+    ):
+        self.max_entries = max_entries or settings.API_CACHE_SIZE
+        self.db_path = db_path
+        self.sync_interval = settings.API_CACHE_SYNC_INTERVAL if sync_interval is None else sync_interval
+
+        tags = settings.API_CACHE_EVENT_TAGS if event_tags is None else event_tags
+        self._event_tags = {k: tuple(v) for k, v in tags.items() if not k.endswith("*")}
+        self._event_prefixes = [(k[:-1], tuple(v)) for k, v in tags.items() if k.endswith("*")]
+        self._tags_by_type: Dict[str, Tuple[str, ...]] = {}
+
+        self._lock = threading.Lock()
+        self._entries: "collections.OrderedDict[str, _Entry]" = collections.OrderedDict()
+        self._tag_keys: Dict[str, set] = {}
+        self._generations: Dict[str, int] = {}
+
+        self._shared = SharedCacheTier(db_path) if db_path else None
+        self._shared_seen: Dict[str, int] = self._shared.generations() if self._shared else {}
+        self._synced_at = time.time()
+        self._subscription = None
+        self._bus = None
+
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidated = 0
+        self.stale_puts = 0
+        self._by_rule: Dict[str, List[int]] = collections.defaultdict(lambda: [0, 0])  # rule -> [hits, misses]
+
+    # ---------- lookups ----------
+
+    def get(self, key: str, rule: str = "") -> Optional[CachedResponse]:
+        now = time.time()
+        if self._shared is not None and now - self._synced_at >= self.sync_interval:
+            self._sync_shared(now)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    self._by_rule[rule][0] += 1
+                    return entry.response
+                self._drop(key)
+                self.expirations += 1
+
+        if self._shared is not None:
+            try:
+                found = self._shared.get(key)
+            except sqlite3.Error as e:
+                logger.warning(f"[ResponseCache] Shared read failed: {e}")
+                found = None
+            if found is not None:
+                response, expires_at, tags = found
+                with self._lock:
+                    self._remember(key, _Entry(response, expires_at, tags))
+                    self.shared_hits += 1
+                    self._by_rule[rule][0] += 1
+                return response
+
+        with self._lock:
+            self.misses += 1
+            self._by_rule[rule][1] += 1
+        return None
+
+    def begin(self, tags: Sequence[str]) -> Tuple[int, ...]:
+        """
+        Tag generations to pass to put() once the response is computed.
+        """
+        with self._lock:
+            return tuple(self._generations.get(t, 0) for t in tags)
+
+    def put(
+        self,
+        key: str,
+        response: CachedResponse,
+        ttl: float,
+        tags: Sequence[str] = (),
+        token: Optional[Tuple[int, ...]] = None,
+        rule: str = "",
+    ) -> bool:
+        """
+        Store a response unless one of its tags was invalidated since begin().
+        """
+        tags = tuple(tags)
+        expires_at = time.time() + ttl
+        with self._lock:
+            if token is not None and token != tuple(self._generations.get(t, 0) for t in tags):
+                self.stale_puts += 1
+                return False
+            self._remember(key, _Entry(response, expires_at, tags))
+            shared_gens = {t: self._shared_seen.get(t, 0) for t in tags}
+
+        if self._shared is not None:
+            try:
+                self._shared.put(key, response, expires_at, shared_gens)
+            except sqlite3.Error as e:
+                # the shared tier is an optimisation; never fail the request
+                logger.warning(f"[ResponseCache] Shared write failed: {e}")
+        return True
+
+    def _remember(self, key: str, entry: _Entry) -> None:
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = entry
+        for tag in entry.tags:
+            self._tag_keys.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry.tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+    # ---------- invalidation ----------
+
+    def _invalidate_local(self, tags: Iterable[str]) -> int:
+        dropped = 0
+        with self._lock:
+            for tag in tags:
+                self._generations[tag] = self._generations.get(tag, 0) + 1
+                for key in list(self._tag_keys.get(tag, ())):
+                    self._drop(key)
+                    dropped += 1
+            self.invalidated += dropped
+        return dropped
+
+    def invalidate(self, tags: Iterable[str]) -> int:
+        """
+        Drop every response tagged with any of `tags` (in all processes
+        sharing the file). Returns the number dropped here.
+        """
+        tags = tuple(tags)
+        dropped = self._invalidate_local(tags)
+        if self._shared is not None and tags:
+            try:
+                bumped = self._shared.bump(tags)
+                with self._lock:
+                    for tag, gen in bumped.items():
+                        self._shared_seen[tag] = max(self._shared_seen.get(tag, 0), gen)
+            except sqlite3.Error as e:
+                logger.warning(f"[ResponseCache] Shared invalidation failed: {e}")
+        return dropped
+
+    def _sync_shared(self, now: float) -> None:
+        # invalidations bumped by other processes since the last check
+        self._synced_at = now
+        try:
+            current = self._shared.generations()
+        except sqlite3.Error as e:
+            logger.warning(f"[ResponseCache] Shared sync failed: {e}")
+            return
+        with self._lock:
+            changed = [t for t, g in current.items() if g > self._shared_seen.get(t, 0)]
+            self._shared_seen.update(current)
+        if changed:
+            self._invalidate_local(changed)
+
+    def tags_for_event(self, event_type: str) -> Tuple[str, ...]:
+        tags = self._tags_by_type.get(event_type)
+        if tags is None:
+            found = list(self._event_tags.get(event_type, ()))
+            for prefix, prefix_tags in self._event_prefixes:
+                if event_type.startswith(prefix):
+                    found.extend(prefix_tags)
+            tags = tuple(dict.fromkeys(found))
+            self._tags_by_type[event_type] = tags
+        return tags
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        tags = self.tags_for_event(event.get("type") or "")
+        if tags:
+            self.invalidate(tags)
+
+    def events_written(self, count: int) -> None:
+        """
+        EventStore write listener: stored events changed.
+        """
+        self.invalidate(("events",))
+
+    def attach_to_bus(self, bus) -> None:
+        self._bus = bus
+        # memory-only invalidation is a few dict operations; writing the
+        # shared file is not, so keep that off the publisher's thread
+        self._subscription = bus.subscribe(self.handle_event, threaded=self._shared is not None)
+
+    def clear(self) -> int:
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._tag_keys.clear()
+            for tag in list(self._generations):
+                self._generations[tag] += 1
+        if self._shared is not None:
+            self._shared.clear()
+        return dropped
+
+    def close(self) -> None:
+        if self._bus is not None and self._subscription is not None:
+            self._bus.unsubscribe(self._subscription)
+            self._subscription = None
+        if self._shared is not None:
+            self._shared.close()
+            self._shared = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.shared_hits) / lookups, 4) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidated": self.invalidated,
+                "stale_puts": self.stale_puts,
+                "tags": {t: len(keys) for t, keys in self._tag_keys.items()},
+                "by_route": {r: {"hits": h, "misses": m} for r, (h, m) in self._by_rule.items()},
+                "shared": self.db_path,
+            }
+
+
+_cache: Optional[ResponseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Process-wide cache configured from settings.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ResponseCache(db_path=settings.API_CACHE_PATH)
+    return _cache
+
+
+def cache_key(path: str, query_string: bytes) -> str:
+    if not query_string:
+        return path
+    params = sorted(parse_qsl(query_string.decode("latin-1"), keep_blank_values=True))
+    return f"{path}?{urlencode(params)}"
+
+
+class ResponseCacheMiddleware:
+    """
+    ASGI middleware serving GET requests for the API_CACHE_ROUTES prefixes
+    from the ResponseCache. A hit skips routing, dependencies and the DB
+    entirely; 200 responses of a miss are stored with the rule's TTL/tags.
+    Adds X-Cache: HIT/MISS; a hit with a matching If-None-Match gets a 304.
+
+    Register it before CORSMiddleware so CORS headers are still added per
+    request rather than cached.
+    """
+
+    def __init__(self, app, cache: Optional[ResponseCache] = None, rules: Optional[Dict[str, Any]] = None):
+        self.app = app
+        self._cache = cache
+        self.rules = sorted(
+            (settings.API_CACHE_ROUTES if rules is None else rules).items(), key=lambda r: -len(r[0])
+        )
+
+    @property
+    def cache(self) -> ResponseCache:
+        if self._cache is None:
+            self._cache = get_response_cache()
+        return self._cache
+
+    def _rule(self, path: str):
+        for prefix, (ttl, tags) in self.rules:
+            if path.startswith(prefix):
+                return prefix, ttl, tuple(tags)
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not settings.API_CACHE_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        rule = self._rule(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        prefix, ttl, tags = rule
+        cache = self.cache
+        key = cache_key(scope["path"], scope.get("query_string", b""))
+
+        cached = cache.get(key, prefix)
+        if cached is not None:
+            await self._send_cached(scope, send, cached)
+            return
+
+        token = cache.begin(tags)
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+                message = dict(message, headers=list(message.get("headers", [])) + [(b"x-cache", b"MISS")])
+            elif message["type"] == "http.response.body" and start.get("status") == 200:
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    body = b"".join(chunks)
+                    if len(body) <= settings.API_CACHE_MAX_BODY:
+                        cache.put(key, (200, list(start.get("headers", [])), body), ttl, tags, token, prefix)
+            await send(message)
+
+        await self.app(scope, receive, capture)
+
+    @staticmethod
+    async def _send_cached(scope, send, cached: CachedResponse) -> None:
+        status, headers, body = cached
+        etag = next((v for k, v in headers if k == b"etag"), None)
+        if etag is not None:
+            if_none_match = next((v for k, v in scope["headers"] if k == b"if-none-match"), None)
+            if if_none_match is not None and etag in [t.strip() for t in if_none_match.split(b",")]:
+                keep = [(k, v) for k, v in headers if k not in (b"content-length", b"content-type")]
+                await send({"type": "http.response.start", "status": 304, "headers": keep + [(b"x-cache", b"HIT")]})
+                await send({"type": "http.response.body", "body": b""})
+                return
+        await send({"type": "http.response.start", "status": status, "headers": headers + [(b"x-cache", b"HIT")]})
+        await send({"type": "http.response.body", "body": body})
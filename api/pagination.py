@@ -0,0 +1,172 @@
+import base64
+import binascii
+import datetime as dt
+import hashlib
+import json
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import DateTime, and_, select
+from sqlalchemy.orm import Session
+
+from core.settings import settings
+
+# (field name, descending)
+SortSpec = Sequence[Tuple[str, bool]]
+
+
+def page_limit(limit: Optional[int], default: Optional[int] = None) -> int:
+    """
+    Requested page size, clamped to 1..API_PAGE_SIZE_MAX.
+    """
+    if limit is None:
+        limit = default or settings.API_PAGE_SIZE_DEFAULT
+    return max(1, min(int(limit), settings.API_PAGE_SIZE_MAX))
+
+
+def parse_fields(fields: Optional[str], columns: Mapping[str, Any], default: Sequence[str]) -> List[str]:
+    """
+    `fields=a,b,c` -> validated column names ("id" is always included).
+    """
+    if not fields:
+        names = list(default)
+    else:
+        names = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in names if f not in columns]
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown field(s): {', '.join(unknown)}. Available: {', '.join(columns)}",
+            )
+    if "id" in columns and "id" not in names:
+        names.insert(0, "id")
+    return names
+
+
+def parse_sort(sort: str, allowed: Mapping[str, SortSpec]) -> SortSpec:
+    if sort not in allowed:
+        raise HTTPException(status_code=400, detail=f"Unknown sort '{sort}'. Available: {', '.join(allowed)}")
+    return allowed[sort]
+
+
+def encode_cursor(order: SortSpec, values: Sequence[Any]) -> str:
+    token = {
+        "o": [f"-{name}" if desc else name for name, desc in order],
+        "v": [v.isoformat() if isinstance(v, dt.datetime) else v for v in values],
+    }
+    raw = json.dumps(token, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, order: SortSpec, columns: Mapping[str, Any]) -> List[Any]:
+    """
+    Values of the last row of the previous page. A cursor is only valid for
+    the sort order it was issued for.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        token = json.loads(raw)
+        values = list(token["v"])
+        expected = [f"-{name}" if desc else name for name, desc in order]
+        if token["o"] != expected or len(values) != len(order):
+            raise ValueError("cursor issued for a different sort order")
+        for i, (name, _) in enumerate(order):
+            if values[i] is not None and isinstance(columns[name].type, DateTime):
+                values[i] = dt.datetime.fromisoformat(values[i])
+        return values
+    except (ValueError, KeyError, TypeError, binascii.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor: {e}")
+
+
+def _same(col, value):
+    return col.is_(None) if value is None else col == value
+
+
+def _after(col, desc: bool, value) -> List[Any]:
+    """
+    Conditions, in sort order, for the rows after `value` in one column.
+    SQLite sorts NULL lowest: first when ascending, last when descending.
+    A plain `col > value` is never true for a NULL on either side, so the
+    NULL rows get their own seek.
+    """
+    if value is None:
+        return [] if desc else [col.is_not(None)]
+    if desc:
+        return [col < value, col.is_(None)]
+    return [col > value]
+
+
+def keyset_page(
+    session: Session,
+    columns: Mapping[str, Any],
+    fields: Sequence[str],
+    order: SortSpec,
+    where: Sequence[Any] = (),
+    cursor: Optional[str] = None,
+    limit: int = 100,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of rows after `cursor`, selecting only `fields` (plus the sort
+    columns). Returns (rows, next_cursor); next_cursor is None on the last page.
+
+    The last column of `order` must be unique (normally "id"). Instead of a
+    single OR-ed row comparison, which SQLite can only range-scan on its
+    first column, the rows after the cursor are read as up to len(order)
+    index seeks: same (a, b), next c; then same a, next b; then next a.
+    Each seek is bounded by the remaining page size, so the cost of a page
+    does not depend on how deep into the table it is. Nullable sort columns
+    are fine: a NULL in the cursor seeks with IS NULL / IS NOT NULL.
+    """
+    sort_cols = [columns[name] for name, _ in order]
+    order_by = [col.desc() if desc else col.asc() for col, (_, desc) in zip(sort_cols, order)]
+    selected = list(dict.fromkeys(list(fields) + [name for name, _ in order]))
+    stmt = select(*[columns[name].label(name) for name in selected]).where(*where).order_by(*order_by)
+
+    if cursor is None:
+        seeks = [()]
+    else:
+        values = decode_cursor(cursor, order, columns)
+        seeks = []
+        for i in range(len(order) - 1, -1, -1):
+            same = tuple(_same(c, v) for c, v in zip(sort_cols[:i], values[:i]))
+            seeks.extend(same + (after,) for after in _after(sort_cols[i], order[i][1], values[i]))
+
+    rows: List[Any] = []
+    for conditions in seeks:
+        remaining = limit + 1 - len(rows)
+        if remaining <= 0:
+            break
+        seek = stmt.where(and_(*conditions)) if conditions else stmt
+        rows.extend(session.execute(seek.limit(remaining)).all())
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]._mapping
+        next_cursor = encode_cursor(order, [last[name] for name, _ in order])
+
+    return [{name: r._mapping[name] for name in fields} for r in rows], next_cursor
+
+
+def etag_response(request: Request, body: Any, next_cursor: Optional[str] = None) -> Response:
+    """
+    JSON response with a weak ETag over the body; 304 if the client's
+    If-None-Match already has it. The next page cursor (if any) goes in
+    the X-Next-Cursor header.
+    """
+    content = jsonable_encoder(body)
+    digest = hashlib.sha1(
+        json.dumps(content, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8")
+    ).hexdigest()
+    etag = f'W/"{digest}"'
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [t.strip() for t in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=content, headers=headers)
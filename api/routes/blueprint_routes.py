@@ -1,32 +1,57 @@
-from fastapi import APIRouter
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
 
-from db.engine import init_engine
-from db.session import create_session
+from api.cache import get_response_cache
+from api.pagination import etag_response, keyset_page, page_limit, parse_fields, parse_sort
+from db.session import get_session
 from db.models import Blueprint
 from pipelines.blueprint_pipeline import process_new_blueprints
+from scheduler import context
 
 router = APIRouter(prefix="/blueprints", tags=["blueprints"])
 
 
+_COLUMNS = {c.name: c for c in Blueprint.__table__.columns}
+_DEFAULT_FIELDS = ("id", "title", "source", "status", "strategy")
+_SORTS = {
+    "id": [("id", False)],
+    "-id": [("id", True)],
+    "created_at": [("created_at", False), ("id", False)],
+    "-created_at": [("created_at", True), ("id", True)],
+}
+
+
 @router.get("/list")
-def list_blueprints():
-    session = create_session(init_engine())
-    rows = session.query(Blueprint).order_by(Blueprint.id.asc()).all()
-    return [
-        {
-            "id": b.id,
-            "title": b.title,
-            "source": b.source,
-            "status": b.status,
-            "strategy": b.strategy,
-        }
-        for b in rows
-    ]
+def list_blueprints(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+    sort: str = "id",
+    status: Optional[str] = None,
+    session: Session = Depends(get_session),
+):
+    """
+    Blueprints, one keyset page at a time (next page: ?cursor=<X-Next-Cursor>).
+    ?fields=id,title,... selects only those columns; ?status= filters.
+    """
+    rows, next_cursor = keyset_page(
+        session,
+        _COLUMNS,
+        parse_fields(fields, _COLUMNS, _DEFAULT_FIELDS),
+        parse_sort(sort, _SORTS),
+        where=[Blueprint.status == status] if status else (),
+        cursor=cursor,
+        limit=page_limit(limit),
+    )
+    return etag_response(request, rows, next_cursor)
 
 
 @router.post("/process")
-def process_blueprints():
-    session = create_session(init_engine())
-    count = process_new_blueprints(session, None)  # event_bus injected in jobs
-    return {"processed": count}
\ No newline at end of file
+def process_blueprints(session: Session = Depends(get_session)):
+    count = process_new_blueprints(session, context.event_bus)
+    # the bus may live in another process (api-only launcher)
+    get_response_cache().invalidate(["blueprints", "tasks"])
+    return {"processed": count}
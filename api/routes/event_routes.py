@@ -1,35 +1,109 @@
-from fastapi import APIRouter
-from sqlalchemy.orm import Session
-import time
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.responses import StreamingResponse
 
-from db.engine import init_engine
-from db.session import create_session
-from events.event_store import EventStore
+from db.async_engine import get_async_session
+from agents.decision_policy import decision_stats
+from api.pagination import etag_response, keyset_page, page_limit, parse_fields
+from db.models import EventLog
+from events.payload_blobs import get_payload_blob_store
+from api.streaming import hub
+from scheduler import context
 
 router = APIRouter(prefix="/events", tags=["events"])
 
 
+def _split(value: Optional[str]):
+    if not value:
+        return None
+    return [v.strip() for v in value.split(",") if v.strip()]
+
+
+EVENT_COLUMNS = {c.name: c for c in EventLog.__table__.columns}
+EVENT_FIELDS = tuple(EVENT_COLUMNS)
+NEWEST_FIRST = [("id", True)]
+
+
 @router.get("/recent")
-def recent_events():
-    session = create_session(init_engine())
-    store = EventStore(session)
-    return store.list_recent(100)
+async def recent_events(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Stored events, newest first; older pages via ?cursor=<X-Next-Cursor>.
+    """
+    rows, next_cursor = await session.run_sync(
+        keyset_page,
+        EVENT_COLUMNS,
+        parse_fields(fields, EVENT_COLUMNS, EVENT_FIELDS),
+        NEWEST_FIRST,
+        cursor=cursor,
+        limit=page_limit(limit),
+    )
+    return etag_response(request, rows, next_cursor)
 
 
 @router.get("/stream")
-def stream_events():
-    def event_generator():
-        session = create_session(init_engine())
-        store = EventStore(session)
+async def stream_events(
+    request: Request,
+    types: Optional[str] = None,
+    categories: Optional[str] = None,
+    last_event_id: Optional[int] = None,
+    last_event_id_header: Optional[int] = Header(None, alias="Last-Event-ID"),
+):
+    """
+    Server-sent events pushed from the in-process EventBus.
+
+    Reconnecting clients send Last-Event-ID (or ?last_event_id=) and are
+    caught up from the bus ring buffer / EventStore first.
+    Optional filters: ?types=task_created,task_failed&categories=income
+    """
+    bus = context.event_bus
+    client = hub.connect(
+        bus,
+        types=_split(types),
+        categories=_split(categories),
+        peer=request.client.host if request.client else "",
+    )
+    resume_from = last_event_id_header if last_event_id_header is not None else last_event_id
+
+    return StreamingResponse(
+        hub.stream(bus, client, resume_from, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/stream/stats")
+async def stream_stats():
+    """
+    Connected SSE clients with per-client sent/dropped/lag counters.
+    """
+    stats = hub.stats()
+    stats["bus"] = context.event_bus.stats() if context.event_bus is not None else None
+    return stats
+
 
-        last_id = store.get_last_event_id()
+@router.get("/decisions/stats")
+async def decisions_stats():
+    """
+    Agent decision counters per role (published / sampled_out / off / batched)
+    plus blob store writes.
+    """
+    return {"agents": decision_stats(), "blobs": get_payload_blob_store().stats()}
 
-        while True:
-            new = store.get_events_since(last_id)
-            for e in new:
-                last_id = e["id"]
-                yield f"data: {e}\n\n"
-            time.sleep(0.8)
 
-    return StreamingResponse(event_generator(), media_type="text/event-stream")
\ No newline at end of file
+@router.get("/blobs/{sha}")
+def payload_blob(sha: str):
+    """
+    Full payload of an event whose inline payload was slimmed ("blob": sha).
+    """
+    payload = get_payload_blob_store().get(sha)
+    if payload is None:
+        raise HTTPException(status_code=404, detail="blob not found")
+    return payload
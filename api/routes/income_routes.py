@@ -1,8 +1,12 @@
-from fastapi import APIRouter
-from sqlalchemy.orm import Session
+import datetime as dt
+from typing import Dict, Optional
 
-from db.engine import init_engine
-from db.session import create_session
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.cache import get_response_cache
+from db.async_engine import get_async_session
+from pipelines.income_analytics import get_currency_rates, get_income_series, set_currency_rate
 from pipelines.income_pipeline import (
     get_total_income,
     get_income_by_platform,
@@ -13,18 +17,61 @@ router = APIRouter(prefix="/income", tags=["income"])
 
 
 @router.get("/total")
-def total_income():
-    session = create_session(init_engine())
-    return get_total_income(session)
+async def total_income(session: AsyncSession = Depends(get_async_session)):
+    return await session.run_sync(get_total_income)
 
 
 @router.get("/platforms")
-def income_by_platform():
-    session = create_session(init_engine())
-    return get_income_by_platform(session)
+async def income_by_platform(session: AsyncSession = Depends(get_async_session)):
+    return await session.run_sync(get_income_by_platform)
 
 
 @router.get("/recent")
-def recent_income():
-    session = create_session(init_engine())
-    return get_recent_income(session)
\ No newline at end of file
+async def recent_income(session: AsyncSession = Depends(get_async_session)):
+    return await session.run_sync(get_recent_income)
+
+
+@router.get("/series")
+async def income_series(
+    bucket: str = "day",
+    start: Optional[dt.datetime] = Query(None, alias="from"),
+    end: Optional[dt.datetime] = Query(None, alias="to"),
+    platform: Optional[str] = None,
+    currency: Optional[str] = None,
+    window: Optional[int] = Query(None, ge=1),
+    horizon: Optional[int] = Query(None, ge=0),
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Bucketed income (hour/day/week) with moving average, run rate and projection.
+    """
+    try:
+        return await session.run_sync(
+            get_income_series, bucket, start, end, platform, currency, window, horizon
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/rates")
+async def currency_rates(session: AsyncSession = Depends(get_async_session)):
+    return await session.run_sync(get_currency_rates)
+
+
+@router.post("/rates")
+async def update_currency_rates(payload: Dict[str, float], session: AsyncSession = Depends(get_async_session)):
+    """
+    {"EUR": 1.09, ...}: units of the base currency per unit of each currency.
+    """
+    if any(rate <= 0 for rate in payload.values()):
+        raise HTTPException(status_code=400, detail="rates must be positive")
+
+    def _apply(sync_session):
+        for currency, rate in payload.items():
+            set_currency_rate(sync_session, currency, rate)
+        sync_session.commit()
+        return get_currency_rates(sync_session)
+
+    rates = await session.run_sync(_apply)
+    get_response_cache().invalidate(["income"])
+    return rates
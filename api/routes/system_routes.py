@@ -1,22 +1,27 @@
-from fastapi import APIRouter
+from typing import Optional
 
-from db.engine import init_engine
-from db.session import create_session
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.cache import get_response_cache
+from api.pagination import etag_response, keyset_page, page_limit, parse_fields
+from api.routes.event_routes import EVENT_COLUMNS, EVENT_FIELDS, NEWEST_FIRST
+from db.async_engine import get_async_session, init_async_engine
 from events.event_store import EventStore
 
 router = APIRouter(prefix="/system", tags=["system"])
 
 
 @router.get("/health")
-def system_health():
+async def system_health():
     """
     Lightweight liveness check.
     Returns 200 if API process is running and DB is reachable.
     """
-    engine = init_engine()
+    engine = init_async_engine()
     # simple connection test; will raise if DB is unavailable
-    connection = engine.connect()
-    connection.close()
+    async with engine.connect():
+        pass
 
     return {
         "engine": "Nomad v1.5",
@@ -26,15 +31,11 @@ def system_health():
 
 
 @router.get("/status")
-def system_status():
+async def system_status(session: AsyncSession = Depends(get_async_session)):
     """
     Richer status endpoint you can use as your personal quick-check.
     """
-    engine = init_engine()
-    session = create_session(engine)
-
-    store = EventStore(session)
-    last_id = store.get_last_event_id()
+    last_id = await session.run_sync(lambda s: EventStore(s).get_last_event_id())
 
     return {
         "engine": "Nomad v1.5",
@@ -44,14 +45,43 @@ def system_status():
     }
 
 
+@router.get("/cache")
+async def cache_stats():
+    """
+    Response cache counters: hits / misses / evictions / invalidations, per route and tag.
+    """
+    return get_response_cache().stats()
+
+
+@router.delete("/cache")
+async def clear_cache(tags: Optional[str] = None):
+    """
+    Drop cached responses: all of them, or only ?tags=income,tasks.
+    """
+    cache = get_response_cache()
+    if tags:
+        return {"dropped": cache.invalidate([t.strip() for t in tags.split(",") if t.strip()])}
+    return {"dropped": cache.clear()}
+
+
 @router.get("/timeline")
-def system_timeline(limit: int = 50):
+async def system_timeline(
+    request: Request,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+):
     """
     Recent events timeline for quick introspection / debugging.
+    `limit` is capped at API_PAGE_SIZE_MAX; older events via ?cursor=<next_cursor>.
     """
-    engine = init_engine()
-    session = create_session(engine)
-    store = EventStore(session)
-
-    events = store.list_recent(limit=limit)
-    return {"count": len(events), "events": events}
\ No newline at end of file
+    events, next_cursor = await session.run_sync(
+        keyset_page,
+        EVENT_COLUMNS,
+        parse_fields(fields, EVENT_COLUMNS, EVENT_FIELDS),
+        NEWEST_FIRST,
+        cursor=cursor,
+        limit=page_limit(limit),
+    )
+    return etag_response(request, {"count": len(events), "events": events, "next_cursor": next_cursor}, next_cursor)
@@ -1,36 +1,51 @@
-from fastapi import APIRouter
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from db.engine import init_engine
-from db.session import create_session
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from api.cache import get_response_cache
+from api.pagination import etag_response, keyset_page, page_limit, parse_fields
+from db.async_engine import get_async_session
 from db.models import Task
-from pipelines.execution_pipeline import select_pending_tasks
+from events.event_definitions import EventType, EventCategory
+from scheduler import context
+from workers.wakeup import notify_workers
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
 
+_COLUMNS = {c.name: c for c in Task.__table__.columns}
+_PENDING_FIELDS = ("id", "name", "short_description", "category", "status", "priority", "importance")
+# same order as select_pending_tasks(); served by idx_task_pending_order
+_PENDING_ORDER = [("priority", False), ("importance", True), ("id", False)]
+
+
 @router.get("/pending")
-def list_pending_tasks():
-    session = create_session(init_engine())
-    tasks = select_pending_tasks(session, limit=50)
-
-    return [
-        {
-            "id": t.id,
-            "name": t.name,
-            "short_description": t.short_description,
-            "category": t.category,
-            "status": t.status,
-            "priority": t.priority,
-            "importance": t.importance,
-        }
-        for t in tasks
-    ]
+async def list_pending_tasks(
+    request: Request,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    fields: Optional[str] = None,
+    session: AsyncSession = Depends(get_async_session),
+):
+    """
+    Pending tasks by priority & importance, one keyset page at a time
+    (next page: ?cursor=<X-Next-Cursor>). ?fields= selects columns.
+    """
+    rows, next_cursor = await session.run_sync(
+        keyset_page,
+        _COLUMNS,
+        parse_fields(fields, _COLUMNS, _PENDING_FIELDS),
+        _PENDING_ORDER,
+        where=[Task.status == "pending"],
+        cursor=cursor,
+        limit=page_limit(limit, default=50),
+    )
+    return etag_response(request, rows, next_cursor)
 
 
 @router.post("/add")
-def add_task(payload: dict):
-    session = create_session(init_engine())
+async def add_task(payload: dict, session: AsyncSession = Depends(get_async_session)):
     task = Task(
         name=payload.get("name", "Unnamed"),
         short_description=payload.get("short_description", ""),
@@ -38,6 +53,23 @@ def add_task(payload: dict):
         payload=payload.get("payload", {}),
     )
     session.add(task)
-    session.commit()
+    await session.commit()
+    # the TASK_CREATED event below only evicts when a bus runs in this process
+    get_response_cache().invalidate(["tasks"])
+
+    if context.event_bus is not None:
+        context.event_bus.publish(
+            event_type=EventType.TASK_CREATED,
+            category=EventCategory.TASK,
+            message=f"Task #{task.id} added via API: {task.name}",
+            task_id=task.id,
+            payload={
+                "short_description": task.short_description,
+                "category": task.category,
+                "importance": task.importance,
+                "priority": task.priority,
+            },
+        )
+    notify_workers()
 
-    return {"status": "ok", "task_id": task.id}
\ No newline at end of file
+    return {"status": "ok", "task_id": task.id}
@@ -1,5 +1,12 @@
-from fastapi import APIRouter
+import datetime as dt
 
+from fastapi import APIRouter, Depends
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from core.settings import settings
+from db.models import Task, Worker
+from db.session import get_session
 from workers.worker_controller import WorkerController
 from events.event_bus import EventBus
 
@@ -16,4 +23,42 @@ def start_python_worker():
         controller = WorkerController(bus)
 
     worker = controller.start_python_worker("python_worker_main")
-    return {"status": "started", "worker": worker.name}
\ No newline at end of file
+    return {"status": "started", "worker": worker.name}
+
+@router.get("/status")
+def workers_status(session: Session = Depends(get_session)):
+    """
+    Liveness per worker from last_heartbeat_at, plus how many tasks each is running.
+    """
+    now = dt.datetime.utcnow()
+
+    running = dict(
+        session.query(Task.assigned_worker_id, func.count(Task.id))
+        .filter(Task.status == "running", Task.assigned_worker_id.isnot(None))
+        .group_by(Task.assigned_worker_id)
+        .all()
+    )
+
+    result = []
+    for w in session.query(Worker).order_by(Worker.id).all():
+        age = (now - w.last_heartbeat_at).total_seconds() if w.last_heartbeat_at else None
+        if age is None or age > settings.WORKER_OFFLINE_AFTER:
+            status = "offline"
+        elif age > settings.WORKER_STALE_AFTER:
+            status = "stale"
+        else:
+            status = "online"
+
+        result.append(
+            {
+                "id": w.id,
+                "name": w.name,
+                "kind": w.kind,
+                "status": status,
+                "heartbeat_age_seconds": round(age, 1) if age is not None else None,
+                "last_heartbeat_at": w.last_heartbeat_at.isoformat() if w.last_heartbeat_at else None,
+                "last_seen_at": w.last_seen_at.isoformat() if w.last_seen_at else None,
+                "running_tasks": running.get(w.id, 0),
+            }
+        )
+    return result
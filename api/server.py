@@ -1,6 +1,13 @@
+import contextlib
+
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from api.cache import ResponseCacheMiddleware
+from core.settings import settings
+from db.async_engine import dispose_async_engines
+
 from api.routes.system_routes import router as system_router
 from api.routes.task_routes import router as task_router
 from api.routes.event_routes import router as event_router
@@ -8,12 +15,27 @@ from api.routes.blueprint_routes import router as blueprint_router
 from api.routes.income_routes import router as income_router
 from api.routes.worker_routes import router as worker_router
 
+
+@contextlib.asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # sync (def) routes, sync dependencies and run_in_threadpool() share this
+    # limiter; hot routes are async and do not use it
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.API_THREADPOOL_SIZE
+    yield
+    await dispose_async_engines()
+
+
 app = FastAPI(
     title="Nomad Engine v1.5 API",
     version="1.5",
-    description="Autonomous income generation engine API layer"
+    description="Autonomous income generation engine API layer",
+    lifespan=lifespan,
 )
 
+# Cached GET responses for polled routes (api/cache.py); added before CORS so
+# it runs inside it and CORS headers stay per request
+app.add_middleware(ResponseCacheMiddleware)
+
 # CORS for dashboards / extensions
 app.add_middleware(
     CORSMiddleware,
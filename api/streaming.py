@@ -0,0 +1,237 @@
+import asyncio
+import datetime as dt
+import itertools
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from core.settings import settings
+from db.engine import init_engine
+from db.session import create_session
+from events.event_bus import EventBus, Subscription
+from events.event_store import EventStore
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """
+    Serialize one event as an SSE frame (id + event type + JSON data).
+    """
+    data = json.dumps(event, default=str, separators=(",", ":"))
+    return f"id: {event['id']}\nevent: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+
+def _load_events_since(last_id: int, limit: int) -> List[Dict[str, Any]]:
+    session = create_session(init_engine())
+    try:
+        return EventStore(session).get_events_since(last_id, limit=limit)
+    finally:
+        session.close()
+
+
+class StreamClient:
+    """
+    One connected SSE client: an asyncio queue fed from the EventBus
+    (through call_soon_threadsafe) plus counters for /events/stream/stats.
+    """
+
+    def __init__(
+        self,
+        client_id: int,
+        loop: asyncio.AbstractEventLoop,
+        queue_size: int,
+        types: Optional[Iterable[str]] = None,
+        categories: Optional[Iterable[str]] = None,
+        peer: str = "",
+    ):
+        self.id = client_id
+        self.peer = peer
+        self.loop = loop
+        self.types = frozenset(types) if types is not None else None
+        self.categories = frozenset(categories) if categories is not None else None
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=queue_size)
+        self.subscription: Optional[Subscription] = None
+        self.connected_at = dt.datetime.utcnow()
+
+        self.sent = 0
+        self.dropped = 0
+        self.last_sent_id = 0
+        self.start_id = 0  # newest event id at connect time (live-tail start)
+        self.overflowed = False
+
+    def push(self, event: Dict[str, Any]) -> None:
+        """
+        Runs on the event loop thread.
+        """
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self.overflowed = True
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.types is not None and event.get("type") not in self.types:
+            return False
+        if self.categories is not None and event.get("category") not in self.categories:
+            return False
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "id": self.id,
+            "peer": self.peer,
+            "connected_at": self.connected_at.isoformat(),
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "lag": self.queue.qsize(),
+            "last_sent_id": self.last_sent_id,
+        }
+
+
+class EventStreamHub:
+    """
+    Fans out live EventBus events to SSE clients.
+
+    - each client gets its own (optionally filtered) bus subscription and
+      a bounded asyncio.Queue, so no thread is parked per connection
+    - Last-Event-ID reconnects are replayed from the bus ring buffer, and
+      from EventStore (paged) for anything older than the ring
+    - a client whose queue overflows is caught up the same way
+    - without an in-process bus (API-only mode) it falls back to polling
+      EventStore every SSE_POLL_INTERVAL seconds
+    """
+
+    def __init__(self):
+        self._clients: Dict[int, StreamClient] = {}
+        self._ids = itertools.count(1)
+
+    def connect(
+        self,
+        bus: Optional[EventBus],
+        types: Optional[Iterable[str]] = None,
+        categories: Optional[Iterable[str]] = None,
+        peer: str = "",
+    ) -> StreamClient:
+        loop = asyncio.get_running_loop()
+        client = StreamClient(
+            next(self._ids),
+            loop,
+            settings.SSE_CLIENT_QUEUE_SIZE,
+            types=types,
+            categories=categories,
+            peer=peer,
+        )
+
+        if bus is not None:
+
+            def _forward(event: Dict[str, Any]) -> None:
+                loop.call_soon_threadsafe(client.push, event)
+
+            # subscribe before reading the boundary: every later event is
+            # either <= start_id or reaches the queue, so none falls between
+            client.subscription = bus.subscribe(_forward, threaded=False, types=types, categories=categories)
+            recent = bus.get_recent(1)
+            client.start_id = recent[-1]["id"] if recent else bus.oldest_id - 1
+
+        self._clients[client.id] = client
+        return client
+
+    def disconnect(self, bus: Optional[EventBus], client: StreamClient) -> None:
+        self._clients.pop(client.id, None)
+        if bus is not None and client.subscription is not None:
+            bus.unsubscribe(client.subscription)
+
+    async def _replay(self, bus: Optional[EventBus], last_id: int) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Events after `last_id`: from EventStore, SSE_CATCHUP_LIMIT rows per
+        page, until the bus ring covers the rest (re-checked per page, as
+        the ring keeps moving) or the store runs out; then from the ring.
+        """
+        while bus is None or last_id + 1 < bus.oldest_id:
+            stored = await run_in_threadpool(_load_events_since, last_id, settings.SSE_CATCHUP_LIMIT)
+            for event in stored:
+                yield event
+                last_id = event["id"]
+            if len(stored) < settings.SSE_CATCHUP_LIMIT:
+                break
+
+        if bus is not None:
+            for event in bus.get_events_since(last_id):
+                yield event
+
+    async def _catch_up(self, bus: Optional[EventBus], client: StreamClient, last_id: int) -> AsyncIterator[str]:
+        async for event in self._replay(bus, last_id):
+            if event["id"] <= client.last_sent_id:
+                continue
+            if client.matches(event):
+                yield self._send(client, event)
+            # filtered-out events still move the cursor so they are not re-read
+            client.last_sent_id = event["id"]
+
+    async def stream(
+        self,
+        bus: Optional[EventBus],
+        client: StreamClient,
+        last_event_id: Optional[int],
+        is_disconnected,
+    ) -> AsyncIterator[str]:
+        try:
+            if last_event_id is None:
+                # live tail only: start after the newest event at connect time
+                if bus is not None:
+                    last_event_id = client.start_id
+                else:
+                    last_event_id = await run_in_threadpool(self._last_stored_id)
+            else:
+                async for frame in self._catch_up(bus, client, last_event_id):
+                    yield frame
+
+            client.last_sent_id = max(client.last_sent_id, last_event_id)
+
+            while not await is_disconnected():
+                if bus is None:
+                    async for frame in self._catch_up(None, client, client.last_sent_id):
+                        yield frame
+                    await asyncio.sleep(settings.SSE_POLL_INTERVAL)
+                    continue
+
+                if client.overflowed:
+                    client.overflowed = False
+                    async for frame in self._catch_up(bus, client, client.last_sent_id):
+                        yield frame
+
+                try:
+                    event = await asyncio.wait_for(client.queue.get(), timeout=settings.SSE_KEEPALIVE_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+
+                # skip anything already delivered during replay
+                if event["id"] > client.last_sent_id:
+                    yield self._send(client, event)
+        finally:
+            self.disconnect(bus, client)
+
+    @staticmethod
+    def _last_stored_id() -> int:
+        session = create_session(init_engine())
+        try:
+            return EventStore(session).get_last_event_id()
+        finally:
+            session.close()
+
+    @staticmethod
+    def _send(client: StreamClient, event: Dict[str, Any]) -> str:
+        client.sent += 1
+        client.last_sent_id = event["id"]
+        return format_sse(event)
+
+    def stats(self) -> Dict[str, Any]:
+        clients = list(self._clients.values())
+        return {
+            "connections": len(clients),
+            "clients": [c.stats() for c in clients],
+        }
+
+
+hub = EventStreamHub()
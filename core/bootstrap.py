@@ -1,19 +1,30 @@
+import atexit
+
 from core.settings import settings
 from db.engine import init_engine
 from db.session import create_session
-from db.models import Base
-from scheduler.scheduler_engine import start_scheduler_engine
+from db.migrations.init_db import run_migrations
+from scheduler.scheduler_engine import start_scheduler_engine, stop_scheduler_engine
 from events.event_bus import EventBus
 from events.event_store import EventStore
 from events.event_definitions import EventType, EventCategory
+from pipelines.task_dispatcher import TaskDispatcher
+from api.cache import get_response_cache
+from scheduler import context
 from core.logger import logger
 
+_event_bus = None
+_event_store = None
+_dispatcher = None
+_response_cache = None
+
 
 def bootstrap_system():
+    global _event_bus, _event_store, _dispatcher, _response_cache
     print("[BOOTSTRAP] Starting Nomad v1.5...")
 
     engine = init_engine(settings.DB_PATH)
-    Base.metadata.create_all(engine)
+    run_migrations(engine)  # create_all + columns/indexes added since the DB was made
 
     session = create_session(engine)
 
@@ -21,10 +32,26 @@ def bootstrap_system():
     event_bus = EventBus()
     event_store = EventStore(session)
     event_store.attach_to_bus(event_bus)
+    _event_bus = event_bus
+    _event_store = event_store
+    atexit.register(shutdown_system)
 
     logger.info("[BOOTSTRAP] DB initialized.")
     logger.info("[BOOTSTRAP] Event systems ready.")
 
+    # In-memory priority queue workers pull from
+    if settings.TASK_DISPATCH_ENABLED:
+        _dispatcher = TaskDispatcher()
+        _dispatcher.attach_to_bus(event_bus)
+        _dispatcher.rebuild()
+        context.dispatcher = _dispatcher
+
+    # Evict cached API responses when the data behind them changes
+    if settings.API_CACHE_ENABLED:
+        _response_cache = get_response_cache()
+        _response_cache.attach_to_bus(event_bus)
+        event_store.add_write_listener(_response_cache.events_written)
+
     # Announce that system is starting
     event_bus.publish(
         event_type=EventType.SYSTEM_START,
@@ -42,4 +69,32 @@ def bootstrap_system():
     )
 
     logger.info("[BOOTSTRAP] Scheduler online.")
-    print("=== NOMAD v1.5 SYSTEM ONLINE ===")
\ No newline at end of file
+    print("=== NOMAD v1.5 SYSTEM ONLINE ===")
+
+
+def shutdown_system():
+    """
+    Stop the scheduler first (no new events from jobs), then drain threaded
+    bus subscribers and the event store's write-behind queue into the DB.
+    """
+    global _event_bus, _event_store, _dispatcher, _response_cache
+    stop_scheduler_engine()
+
+    if _dispatcher is not None:
+        _dispatcher.close()
+        context.dispatcher = None
+        _dispatcher = None
+
+    if _response_cache is not None:
+        _response_cache.close()
+        _response_cache = None
+
+    if _event_bus is not None:
+        _event_bus.close()
+        _event_bus = None
+
+    if _event_store is not None:
+        _event_store.close()
+        _event_store = None
+
+    logger.info("[BOOTSTRAP] Shutdown complete.")
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 class Settings:
     APP_NAME = "Nomad Engine v1.5"
@@ -9,12 +10,163 @@ class Settings:
     DB_PATH = os.path.join(BASE_DIR, "db", "nomad_v15.db")
     LOG_PATH = os.path.join(BASE_DIR, "logs", "nomad.log")
 
+    # Connection pool (one cached engine per process + DB file)
+    DB_POOL_SIZE = 10
+    DB_MAX_OVERFLOW = 20
+    DB_POOL_TIMEOUT = 30      # seconds to wait for a free connection
+    DB_POOL_RECYCLE = 1800    # seconds before a pooled connection is replaced
+
+    # SQLite page cache budget per engine. The cache is allocated per connection
+    # and an engine pools up to DB_POOL_SIZE + DB_MAX_OVERFLOW of them (the API
+    # process holds a sync and an async engine), so the budget is split across a
+    # full pool: 128MB / 30 = ~4MB each. Reads beyond that come from mmap_size,
+    # which the OS shares between connections and processes.
+    SQLITE_CACHE_KIB_PER_POOL = 131072
+
+    # PRAGMAs applied to every new SQLite connection (empty dict = SQLite defaults)
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",       # readers no longer block the writer
+        "synchronous": "NORMAL",     # fsync on checkpoint, not every commit (safe with WAL)
+        # negative = KiB; never below SQLite's default of 2000
+        "cache_size": -max(2000, SQLITE_CACHE_KIB_PER_POOL // (DB_POOL_SIZE + DB_MAX_OVERFLOW)),
+        "mmap_size": 268435456,      # 256MB memory-mapped reads
+        "temp_store": "MEMORY",
+        "busy_timeout": 5000,        # ms to wait on a locked DB before "database is locked"
+    }
+    SQLITE_MAINTENANCE_MINUTES = 30  # wal_checkpoint + PRAGMA optimize job
+
+    # Agent decision events (agents/base_agent.py), keyed by agent role ("default" for the rest).
+    # Verbosity: "off" = log only, "summary" = payload summarized (full copy kept in
+    # the blob store), "full" = payload as is unless over the byte budget.
+    AGENT_DECISION_VERBOSITY = {
+        "default": "summary",
+        "roi_ranker": "full",
+        "risk_evaluator": "full",
+    }
+    # Fraction of decisions published. The mapper/autofill output is persisted on
+    # the tasks themselves, so their decision events are mostly redundant.
+    AGENT_DECISION_SAMPLE_RATES = {
+        "default": 1.0,
+        "human_step_mapper": 0.1,
+        "autofill": 0.1,
+    }
+    AGENT_DECISION_PAYLOAD_BUDGET = 2048   # max inline payload bytes per decision event
+    PAYLOAD_BLOB_PATH = None               # SQLite file for full payloads (None = "<DB_PATH stem>_blobs.sqlite")
+    PAYLOAD_BLOB_MAX_PENDING = 1000        # blobs held for the event store's writer before writing inline
+
     API_HOST = "127.0.0.1"
     API_PORT = 9001
+    API_THREADPOOL_SIZE = 64   # threads for the remaining sync routes (anyio's default is 40)
+
+    # List endpoints (api/pagination.py): keyset cursors, ?limit= is clamped to the max
+    API_PAGE_SIZE_DEFAULT = 100
+    API_PAGE_SIZE_MAX = 1000
+
+    # Response cache (api/cache.py) for GET routes dashboards poll. Entries carry
+    # tags and are evicted by EventBus events; the TTL bounds staleness when the
+    # bus lives in another process (api-only launcher) and there is no shared file.
+    API_CACHE_ENABLED = True
+    API_CACHE_SIZE = 2048               # responses kept in memory (LRU)
+    API_CACHE_MAX_BODY = 1048576        # bytes; larger responses are not cached
+    API_CACHE_PATH = None               # SQLite file shared by uvicorn workers / the engine, e.g. db/api_cache.sqlite
+    API_CACHE_SYNC_INTERVAL = 1.0       # seconds between tag-generation checks against API_CACHE_PATH
+    # path prefix -> (ttl seconds, tags)
+    API_CACHE_ROUTES = {
+        "/system/status": (5.0, ["events"]),
+        "/events/recent": (5.0, ["events"]),
+        "/tasks/pending": (5.0, ["tasks"]),
+        "/blueprints/list": (30.0, ["blueprints"]),
+        "/income/": (60.0, ["income"]),
+    }
+    # event type (or "prefix_*") -> tags it evicts. "events" is not listed: it is
+    # evicted whenever the event store commits, i.e. once the rows are readable.
+    API_CACHE_EVENT_TAGS = {
+        "task_*": ["tasks"],
+        "blueprint_*": ["blueprints", "tasks"],
+        "income_*": ["income"],
+        "worker_offline": ["tasks"],
+    }
+
+    # Income series (pipelines/income_analytics.py). Rates convert 1 unit of a
+    # currency into the base currency; rows in the currency_rates table win.
+    INCOME_BASE_CURRENCY = "USD"
+    INCOME_CURRENCY_RATES = {"USD": 1.0, "EUR": 1.08, "GBP": 1.27}
+    INCOME_RATE_CACHE_TTL = 300.0        # seconds between currency_rates reloads
+    INCOME_SERIES_MAX_BUCKETS = 20000    # per request (~2.3 years of hourly buckets)
+    INCOME_SERIES_WINDOW = {"hour": 24, "day": 7, "week": 4}        # moving average / run-rate window
+    INCOME_SERIES_DEFAULT_SPAN = {"hour": 48, "day": 30, "week": 26}  # buckets when ?from= is omitted
 
     SCHEDULER_JOBSTORE = os.path.join(BASE_DIR, "db", "scheduler_jobs.sqlite")
 
+    # Server-sent events (/events/stream)
+    SSE_CLIENT_QUEUE_SIZE = 1000     # per-client buffer before events are dropped
+    SSE_KEEPALIVE_INTERVAL = 15.0    # seconds between keep-alive comments
+    SSE_POLL_INTERVAL = 0.8          # DB polling fallback when no in-process bus
+    SSE_CATCHUP_LIMIT = 5000         # max events replayed for Last-Event-ID
+
     # Worker config
     WORKER_POLL_INTERVAL = 1.0
+    WORKER_MAX_POLL_INTERVAL = 30.0      # idle fallback polling backs off up to this
+    WORKER_HEARTBEAT_INTERVAL = 15.0     # seconds between liveness writes
+    WORKER_HEARTBEAT_EVENTS = False      # also publish WORKER_HEARTBEAT events
+    WORKER_STALE_AFTER = 45.0            # /workers/status: "stale" past this age
+    WORKER_OFFLINE_AFTER = 120.0         # ... and "offline" past this one
+    WORKER_WAKEUP_DIR = os.path.join(tempfile.gettempdir(), "nomad_v15_wakeup")  # UNIX sockets
+    WORKER_CONCURRENCY_MODE = "thread"   # thread | process | async
+    WORKER_MAX_IN_FLIGHT = 8             # tasks executing at once per worker
+    WORKER_BATCH_SIZE = 16               # tasks claimed per round
+    WORKER_PREFETCH = True               # claim the next batch while one runs
+    WORKER_CATEGORY_LIMITS = {           # per-category in-flight caps (>= 1)
+        "compute": 2,
+    }
+
+    # Task dispatch queue (pipelines/task_dispatcher.py)
+    TASK_DISPATCH_ENABLED = True
+    TASK_DISPATCH_AGING_RATE = 1 / 60.0    # priority points gained per second waited
+    TASK_DISPATCH_RESYNC_INTERVAL = 60.0   # full rebuild from the DB every N seconds
+    TASK_DISPATCH_EMPTY_RESYNC = 5.0       # ... or sooner when the queue looks empty
+
+    # Blueprint -> task pipeline (pipelines/blueprint_pipeline.py)
+    TASKPIPE_CHUNK_SIZE = 500   # blueprints planned, inserted and committed per batch
+
+    # Capability routing (pipelines/task_routing.py): task category -> worker capability.
+    # "platform:<name>" categories route to that platform's workers; anything
+    # unlisted goes to TASK_DEFAULT_CAPABILITY.
+    TASK_CATEGORY_CAPABILITIES = {
+        "platform_exec": "platform",
+        "setup": "prep",
+        "human_prep": "prep",
+    }
+    TASK_DEFAULT_CAPABILITY = "compute"
+
+    # Retries (pipelines/retry_policy.py): per-category overrides of "default".
+    # Delays are seconds; attempt n waits ~base_delay * 2^(n-1), capped at max_delay.
+    TASK_RETRY_POLICIES = {
+        "default": {"max_attempts": 5, "base_delay": 30.0, "max_delay": 3600.0},
+        "platform_exec": {"max_attempts": 8, "base_delay": 60.0, "max_delay": 6 * 3600.0},
+        "compute": {"max_attempts": 3, "base_delay": 10.0, "max_delay": 600.0},
+    }
+    TASK_RETRY_BATCH_SIZE = 100    # due retries re-queued per retry job run
+    TASK_RETRY_SWEEP_SECONDS = 10  # retry job cadence; keep <= the smallest base_delay
+
+    # Leases: claimed/queued tasks are reclaimed once the lease runs out
+    # (running workers extend it on every heartbeat) or their worker goes offline
+    TASK_LEASE_SECONDS = 300.0
+    TASK_LEASE_SWEEP_SECONDS = 60    # how often the sweep job runs
+    TASK_LEASE_SWEEP_BATCH = 500     # max tasks reclaimed per status per sweep
+
+    # Event bus
+    EVENT_BUS_DISPATCH = "inline"        # default subscriber mode: inline | threaded
+    EVENT_BUS_SUBSCRIBER_QUEUE = 10000   # per threaded subscriber, drops beyond this
+
+    # Event store (write-behind persistence)
+    EVENT_STORE_WRITE_BEHIND = True
+    EVENT_STORE_QUEUE_SIZE = 10000      # max events waiting to be written
+    EVENT_STORE_BATCH_SIZE = 500        # flush when this many events are queued
+    EVENT_STORE_FLUSH_INTERVAL = 0.5    # ... or after this many seconds
+    EVENT_STORE_BLOCK_WHEN_FULL = False  # True = backpressure, False = drop + count
+    EVENT_STORE_PUT_TIMEOUT = 1.0       # max publisher wait when blocking
+    EVENT_STORE_SKIP_TYPES = ["worker_heartbeat"]  # kept in memory only, never written
+    EVENT_RETENTION_DAYS = 30           # db_maintenance_job drops older events and blobs (None = keep all)
 
 settings = Settings()
@@ -0,0 +1,31 @@
+import hashlib
+import re
+import unicodedata
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# dropped when fingerprinting, so "Get paid to label data" == "get paid for label data"
+_STOPWORDS = frozenset("a an and by for from in of on or the to with your you".split())
+
+
+def normalize_text(text: str) -> str:
+    """
+    Lowercase, strip accents and punctuation, collapse whitespace.
+    """
+    text = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode("ascii")
+    return _NON_WORD.sub(" ", text.lower()).strip()
+
+
+def text_fingerprint(text: str) -> str:
+    """
+    Near-duplicate fingerprint: the sorted set of significant tokens, so
+    word order, case, punctuation, stopwords and plural "s" do not matter.
+    """
+    tokens = set()
+    for token in normalize_text(text).split():
+        if token in _STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.add(token)
+    return hashlib.sha1(" ".join(sorted(tokens)).encode("utf-8")).hexdigest()
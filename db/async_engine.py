@@ -0,0 +1,90 @@
+import os
+import threading
+from typing import AsyncIterator, Dict, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from core.settings import settings
+from db.engine import apply_sqlite_pragmas
+
+# One async engine per (process, database file), like db.engine.init_engine().
+# The API runs on a single event loop, so its pooled aiosqlite connections
+# are only ever used from that loop.
+_engines: Dict[Tuple[int, str], AsyncEngine] = {}
+_factories: Dict[AsyncEngine, async_sessionmaker] = {}
+_lock = threading.Lock()
+
+
+def init_async_engine(db_path: str = None) -> AsyncEngine:
+    """
+    Return the process-wide AsyncEngine (aiosqlite) for `db_path`.
+    Queries run on aiosqlite's connection threads, so awaiting them never
+    blocks the event loop or takes a threadpool slot.
+    """
+    if db_path is None:
+        db_path = settings.DB_PATH
+
+    key = (os.getpid(), os.path.abspath(db_path))
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
+
+    with _lock:
+        engine = _engines.get(key)
+        if engine is None:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+            engine = create_async_engine(
+                f"sqlite+aiosqlite:///{db_path}",
+                echo=False,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+            )
+            # same PRAGMA profile as the sync engine (WAL, busy_timeout, ...)
+            event.listen(engine.sync_engine, "connect", lambda conn, _record: apply_sqlite_pragmas(conn))
+            _engines[key] = engine
+    return engine
+
+
+def get_async_sessionmaker(engine: AsyncEngine) -> async_sessionmaker:
+    """
+    Cached async_sessionmaker per engine.
+    """
+    factory = _factories.get(engine)
+    if factory is None:
+        with _lock:
+            factory = _factories.get(engine)
+            if factory is None:
+                factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+                _factories[engine] = factory
+    return factory
+
+
+async def get_async_session() -> AsyncIterator[AsyncSession]:
+    """
+    FastAPI dependency: one AsyncSession per request, always closed afterwards.
+
+    Existing sync query helpers can be reused unchanged with
+    `await session.run_sync(helper, *args)`; they get a regular Session
+    whose I/O is awaited underneath.
+    """
+    session = get_async_sessionmaker(init_async_engine())()
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def dispose_async_engines() -> None:
+    """
+    Close every cached async engine's pool (API shutdown, tests, benchmarks).
+    """
+    with _lock:
+        engines = list(_engines.values())
+        _engines.clear()
+        _factories.clear()
+    for engine in engines:
+        await engine.dispose()
@@ -1,20 +1,70 @@
 import os
-from sqlalchemy import create_engine
+import threading
+from typing import Dict, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from core.settings import settings
 
-def init_engine(db_path: str = None):
+# One engine (and connection pool) per (process, database file)
+_engines: Dict[Tuple[int, str], Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, object] = None) -> None:
+    """
+    Run the configured PRAGMA profile on a raw sqlite3 connection.
     """
-    Initialize a SQLite engine, creating directories if necessary.
+    if pragmas is None:
+        pragmas = settings.SQLITE_PRAGMAS
+
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def init_engine(db_path: str = None) -> Engine:
+    """
+    Return the process-wide SQLite engine for `db_path`, creating it
+    (and its directory) on first use. Safe to call on every request.
     """
     if db_path is None:
         db_path = settings.DB_PATH
 
-    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    # keyed by pid too, so a forked child never reuses the parent's pool
+    key = (os.getpid(), os.path.abspath(db_path))
+    engine = _engines.get(key)
+    if engine is not None:
+        return engine
+
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+
+            engine = create_engine(
+                f"sqlite:///{db_path}",
+                connect_args={"check_same_thread": False},
+                echo=False,
+                future=True,
+                pool_size=settings.DB_POOL_SIZE,
+                max_overflow=settings.DB_MAX_OVERFLOW,
+                pool_timeout=settings.DB_POOL_TIMEOUT,
+                pool_recycle=settings.DB_POOL_RECYCLE,
+            )
+            event.listen(engine, "connect", lambda conn, _record: apply_sqlite_pragmas(conn))
+            _engines[key] = engine
+    return engine
 
-    engine = create_engine(
-        f"sqlite:///{db_path}",
-        connect_args={"check_same_thread": False},
-        echo=False,
-        future=True,
-    )
-    return engine
\ No newline at end of file
+
+def dispose_engines() -> None:
+    """
+    Close every cached engine's pool (shutdown, tests, benchmarks).
+    """
+    with _engines_lock:
+        for engine in _engines.values():
+            engine.dispose()
+        _engines.clear()
@@ -1,10 +1,93 @@
-# scripts/init_db.py
-import os
-from db.session import SessionLocal, engine
-from db.models import Base
-from db.migrations.init_db import run_migrations
-
-if __name__ == "__main__":
-    Base.metadata.create_all(bind=engine)
-    run_migrations()
-    print("[DB] Initialized & migrated.")
+import datetime as dt
+from typing import List, Optional
+
+from sqlalchemy import bindparam, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from db.engine import init_engine
+from db.models import Base, Blueprint, Task
+from core.logger import logger
+from core.text import text_fingerprint
+
+
+def _add_missing_columns(engine: Engine) -> List[str]:
+    """
+    ALTER TABLE ... ADD COLUMN for model columns an existing DB lacks.
+    create_all() only creates missing tables, never new columns.
+    """
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            present = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in present:
+                    continue
+                ddl = f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(engine.dialect)}"
+                if column.server_default is not None:
+                    ddl += f" DEFAULT {column.server_default.arg}"
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                conn.execute(text(ddl))
+                added.append(f"{table.name}.{column.name}")
+    return added
+
+
+def _create_missing_indexes(engine: Engine) -> None:
+    # like tables, create_all() skips indexes added to existing tables
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            for index in table.indexes:
+                index.create(bind=conn, checkfirst=True)
+
+
+def run_migrations(engine: Optional[Engine] = None) -> List[str]:
+    """
+    Bring an existing DB up to the current models (idempotent).
+    Returns the columns that were added.
+    """
+    engine = engine or init_engine()
+    existing_tables = set(inspect(engine).get_table_names())
+    Base.metadata.create_all(engine)
+
+    added = _add_missing_columns(engine)
+    _create_missing_indexes(engine)
+
+    if "tasks.next_attempt_at" in added:
+        # failed tasks from before retry scheduling: make them due now
+        with engine.begin() as conn:
+            conn.execute(
+                update(Task)
+                .where(Task.status == "failed", Task.next_attempt_at.is_(None))
+                .values(next_attempt_at=dt.datetime.utcnow())
+            )
+
+    if "blueprints.fingerprint" in added:
+        # existing blueprints take part in near-duplicate checks too
+        with engine.begin() as conn:
+            rows = conn.execute(select(Blueprint.id, Blueprint.title)).all()
+            if rows:
+                table = Blueprint.__table__
+                conn.execute(
+                    table.update().where(table.c.id == bindparam("bp_id")).values(fingerprint=bindparam("fp")),
+                    [{"bp_id": r.id, "fp": text_fingerprint(r.title)} for r in rows],
+                )
+
+    new_rollups = {"income_rollups", "income_rollups_hourly"} - existing_tables
+    if new_rollups and "income_records" in existing_tables:
+        # rollups start out empty on an existing DB; fill them from the records
+        from pipelines.income_pipeline import rebuild_income_rollups
+
+        with Session(engine) as session:
+            rows = rebuild_income_rollups(session)
+            session.commit()
+        logger.info(f"[DB] Built {rows} income rollup rows.")
+
+    if added:
+        logger.info(f"[DB] Migrated: added {', '.join(added)}")
+    return added
@@ -5,14 +5,18 @@ from sqlalchemy import (
     Integer,
     String,
     Float,
+    Date,
     DateTime,
     Text,
     Boolean,
     ForeignKey,
     JSON,
     Index,
+    event,
 )
 
+from core.text import text_fingerprint
+
 Base = declarative_base()
 
 # ---------------------------------------------------------
@@ -31,7 +35,7 @@ class Task(Base):
     category = Column(String(100), nullable=True)  # e.g. "income_scan", "platform_exec", "audit"
 
     # Execution-related
-    status = Column(String(50), default="pending", index=True)  # pending, running, completed, failed, cancelled
+    status = Column(String(50), default="pending", index=True)  # pending, queued, running, completed, failed, dead_letter, cancelled
     priority = Column(Integer, default=50, index=True)  # 1–100 (1=highest)
     importance = Column(Integer, default=50)  # 1–100 meaning level
 
@@ -46,9 +50,14 @@ class Task(Base):
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
     last_error_at = Column(DateTime, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)  # queued/running: reclaimed after this
 
     last_error_message = Column(Text, nullable=True)
 
+    # Retries (see pipelines/retry_policy.py)
+    attempts = Column(Integer, default=0, server_default="0", nullable=False)  # failed runs so far
+    next_attempt_at = Column(DateTime, nullable=True)  # failed tasks go back to pending after this
+
     blueprint = relationship("Blueprint", back_populates="tasks")
     worker = relationship("Worker", back_populates="tasks")
     agent = relationship("Agent", back_populates="tasks")
@@ -84,12 +93,42 @@ class Blueprint(Base):
 
     status = Column(String(50), default="new")  # new, approved, rejected, active, archived
 
+    # near-duplicate key of the title (core.text.text_fingerprint), set on insert
+    fingerprint = Column(String(40), nullable=True, index=True)
+
     tasks = relationship("Task", back_populates="blueprint")
 
     def __repr__(self):
         return f"<Blueprint #{self.id} {self.title} ROI={self.roi_score:.1f} AUTO={self.automation_score:.1f}>"
 
 
+@event.listens_for(Blueprint, "before_insert")
+def _set_blueprint_fingerprint(mapper, connection, target):
+    if target.fingerprint is None:
+        target.fingerprint = text_fingerprint(target.title)
+
+
+# ---------------------------------------------------------
+# DEAD LETTERS
+# ---------------------------------------------------------
+
+class DeadLetter(Base):
+    __tablename__ = "dead_letters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    task_id = Column(Integer, ForeignKey("tasks.id"), nullable=False, index=True)
+
+    category = Column(String(100), nullable=True)
+    attempts = Column(Integer, default=0)
+    last_error_message = Column(Text, nullable=True)
+    payload = Column(JSON, nullable=True)  # task payload at the time it gave up
+
+    created_at = Column(DateTime, default=dt.datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<DeadLetter #{self.id} task={self.task_id} attempts={self.attempts}>"
+
+
 # ---------------------------------------------------------
 # EVENT LOG
 # ---------------------------------------------------------
@@ -184,6 +223,64 @@ class IncomeRecord(Base):
         return f"<IncomeRecord #{self.id} {self.amount} {self.currency} via {self.platform}>"
 
 
+class IncomeRollup(Base):
+    """
+    Running totals per (platform, currency, UTC day), kept in step with
+    income_records by pipelines.income_pipeline.record_income() in the same
+    transaction; rebuild_income_rollups() recomputes them from scratch.
+    """
+    __tablename__ = "income_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    platform = Column(String(100), nullable=False)
+    currency = Column(String(10), nullable=False, default="USD")
+    day = Column(Date, nullable=False, index=True)
+
+    total = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+    first_at = Column(DateTime, nullable=True)   # earliest / latest received_at that day
+    last_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<IncomeRollup {self.platform} {self.day} {self.total} {self.currency} ({self.count})>"
+
+
+class IncomeRollupHourly(Base):
+    """
+    Same as IncomeRollup, per UTC hour (`hour` is truncated to :00:00);
+    backs hourly /income/series buckets.
+    """
+    __tablename__ = "income_rollups_hourly"
+
+    id = Column(Integer, primary_key=True, index=True)
+
+    platform = Column(String(100), nullable=False)
+    currency = Column(String(10), nullable=False, default="USD")
+    hour = Column(DateTime, nullable=False)
+
+    total = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<IncomeRollupHourly {self.platform} {self.hour} {self.total} {self.currency} ({self.count})>"
+
+
+class CurrencyRate(Base):
+    """
+    Conversion rates into INCOME_BASE_CURRENCY (1 unit of `currency` =
+    `rate` base units); overrides INCOME_CURRENCY_RATES.
+    """
+    __tablename__ = "currency_rates"
+
+    currency = Column(String(10), primary_key=True)
+    rate = Column(Float, nullable=False)
+    updated_at = Column(DateTime, default=dt.datetime.utcnow, onupdate=dt.datetime.utcnow)
+
+    def __repr__(self):
+        return f"<CurrencyRate {self.currency}={self.rate}>"
+
+
 # ---------------------------------------------------------
 # SCHEDULE JOB MIRROR (OPTIONAL)
 # ---------------------------------------------------------
@@ -205,6 +302,22 @@ class ScheduleJob(Base):
 
 # Useful indexes
 Index("idx_task_status_priority", Task.status, Task.priority)
+Index("idx_task_worker_status", Task.assigned_worker_id, Task.status)
+Index("idx_task_status_next_attempt", Task.status, Task.next_attempt_at)
+Index("idx_task_status_lease", Task.status, Task.lease_expires_at)
+Index("idx_task_pending_order", Task.status, Task.priority, Task.importance.desc(), Task.id)  # keyset pages of /tasks/pending
 Index("idx_blueprint_status_roi", Blueprint.status, Blueprint.roi_score)
+Index("idx_blueprint_status_id", Blueprint.status, Blueprint.id)  # blueprint pipeline chunks, /blueprints/list?status=
 Index("idx_event_type_category", EventLog.type, EventLog.category)
-Index("idx_income_platform_time", IncomeRecord.platform, IncomeRecord.received_at)
\ No newline at end of file
+Index("idx_income_platform_time", IncomeRecord.platform, IncomeRecord.received_at)
+Index("uq_income_rollup_key", IncomeRollup.platform, IncomeRollup.currency, IncomeRollup.day, unique=True)
+Index("uq_income_rollup_hourly_key", IncomeRollupHourly.platform, IncomeRollupHourly.currency, IncomeRollupHourly.hour, unique=True)
+# covers /income/series?bucket=hour: range scan on hour, no table lookups
+Index(
+    "idx_income_rollup_hourly_series",
+    IncomeRollupHourly.hour,
+    IncomeRollupHourly.platform,
+    IncomeRollupHourly.currency,
+    IncomeRollupHourly.total,
+    IncomeRollupHourly.count,
+)
\ No newline at end of file
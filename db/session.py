@@ -1,14 +1,70 @@
-from sqlalchemy.orm import sessionmaker, Session
+import threading
+from typing import Dict, Iterator
+
+from sqlalchemy.orm import sessionmaker, scoped_session, Session
 from sqlalchemy.engine import Engine
 
-SessionLocal = None
+from db.engine import init_engine
+
+SessionLocal = None  # first sessionmaker created (kept for older scripts)
+
+_factories: Dict[Engine, sessionmaker] = {}
+_factories_lock = threading.Lock()
+_scoped = None
+
+
+def get_sessionmaker(engine: Engine) -> sessionmaker:
+    """
+    Cached sessionmaker per engine.
+    """
+    factory = _factories.get(engine)
+    if factory is None:
+        with _factories_lock:
+            factory = _factories.get(engine)
+            if factory is None:
+                factory = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+                _factories[engine] = factory
+    return factory
+
 
 def create_session(engine: Engine) -> Session:
     """
     Create a new SQLAlchemy Session from an engine.
     """
     global SessionLocal
+    factory = get_sessionmaker(engine)
     if SessionLocal is None:
-        SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False, future=True)
+        SessionLocal = factory
+
+    return factory()
 
-    return SessionLocal()
\ No newline at end of file
+
+def get_scoped_session() -> Session:
+    """
+    Thread-local session on the default engine (scheduler jobs, workers).
+    Call `remove_scoped_session()` when the unit of work is done.
+    """
+    global _scoped
+    if _scoped is None:
+        # resolved before taking the lock: get_sessionmaker() takes it too
+        factory = get_sessionmaker(init_engine())
+        with _factories_lock:
+            if _scoped is None:
+                _scoped = scoped_session(factory)
+    return _scoped()
+
+
+def remove_scoped_session() -> None:
+    if _scoped is not None:
+        _scoped.remove()
+
+
+def get_session() -> Iterator[Session]:
+    """
+    FastAPI dependency: one session per request, always closed afterwards.
+    """
+    session = create_session(init_engine())
+    try:
+        yield session
+    finally:
+        session.close()
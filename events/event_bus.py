@@ -1,8 +1,119 @@
-from typing import Callable, List, Dict, Any, Optional
+from typing import Callable, List, Dict, Any, Iterable, Optional, Set, Tuple
+import itertools
+import queue
 import threading
 
+from core.settings import settings
 from events.event_definitions import make_event, EventCategory
 
+_STOP = object()
+_seq = itertools.count()
+
+
+class Subscription:
+    """
+    A registered subscriber callback plus its delivery counters.
+
+    Inline subscriptions are called in the publishing thread (after the bus
+    lock is released). Threaded subscriptions get their own bounded queue and
+    worker thread; when that queue is full the event is dropped and counted.
+
+    `types`, `categories` and `task_id` narrow which events are delivered;
+    None means "any".
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[Dict[str, Any]], None],
+        threaded: bool = False,
+        queue_size: int = 10000,
+        types: Optional[Iterable[str]] = None,
+        categories: Optional[Iterable[str]] = None,
+        task_id: Optional[int] = None,
+    ):
+        self.callback = callback
+        self.name = getattr(callback, "__qualname__", repr(callback))
+        self.threaded = threaded
+        self.seq = next(_seq)
+
+        self.types: Optional[frozenset] = frozenset(types) if types is not None else None
+        self.categories: Optional[frozenset] = frozenset(categories) if categories is not None else None
+        self.task_id = task_id
+
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_event_id = 0
+
+        self._queue: Optional["queue.Queue[Any]"] = queue.Queue(maxsize=queue_size) if threaded else None
+        self._thread: Optional[threading.Thread] = None
+
+    def matches(self, event: Dict[str, Any]) -> bool:
+        if self.types is not None and event["type"] not in self.types:
+            return False
+        if self.categories is not None and event["category"] not in self.categories:
+            return False
+        if self.task_id is not None and event["task_id"] != self.task_id:
+            return False
+        return True
+
+    def start(self) -> None:
+        if self._queue is None or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name=f"EventBusSub:{self.name}", daemon=True)
+        self._thread.start()
+
+    def enqueue(self, event: Dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def invoke(self, event: Dict[str, Any]) -> None:
+        try:
+            self.callback(event)
+        except Exception:
+            # We never want one bad subscriber to break the bus
+            self.errors += 1
+        self.delivered += 1
+        self.last_event_id = event["id"]
+
+    def _run(self) -> None:
+        while True:
+            event = self._queue.get()
+            if event is _STOP:
+                return
+            self.invoke(event)
+
+    def close(self, timeout: Optional[float] = 5.0) -> None:
+        if self._thread is None:
+            return
+        # blocking put: the stop marker must land behind everything queued
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+
+    @property
+    def lag(self) -> int:
+        """
+        Events accepted for this subscriber but not yet delivered.
+        """
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "threaded": self.threaded,
+            "types": sorted(self.types) if self.types is not None else None,
+            "categories": sorted(self.categories) if self.categories is not None else None,
+            "task_id": self.task_id,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "lag": self.lag,
+            "last_event_id": self.last_event_id,
+        }
+
 
 class EventBus:
     """
@@ -11,21 +122,115 @@ class EventBus:
     - Keeps a rolling buffer of events (default 1000)
     - Notifies subscribers when a new event is published
     - Designed to be combined with EventStore for persistence
+
+    The buffer is a fixed-size ring indexed by event id: event N lives in
+    slot N % buffer_size, so publishing is O(1) and id/recency queries only
+    touch the k events they return.
+
+    Publishers only hold the lock to assign the id, store the event and hand
+    it to threaded subscribers' queues (which keeps their delivery in id
+    order). Inline subscribers run after the lock is released, so a slow
+    subscriber never blocks other publishing threads. `dispatch` sets the
+    default mode for new subscriptions: "inline" or "threaded".
+
+    Subscriptions can filter on event type, category and task id. They are
+    indexed in dict-of-sets tables (by type, by category, by task id) and
+    the resolved subscriber tuple for each (type, category) pair is cached
+    until the next subscribe/unsubscribe, so publish only touches the
+    subscribers that actually match.
     """
 
-    def __init__(self, buffer_size: int = 1000):
-        self._events: List[Dict[str, Any]] = []
-        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+    def __init__(self, buffer_size: int = 1000, dispatch: Optional[str] = None):
+        self._ring: List[Optional[Dict[str, Any]]] = [None] * buffer_size
+        self._subscribers: Tuple[Subscription, ...] = ()
+        # routing index; the None key holds subscriptions without that filter
+        self._by_type: Dict[Optional[str], Set[Subscription]] = {}
+        self._by_category: Dict[Optional[str], Set[Subscription]] = {}
+        self._by_task: Dict[int, Tuple[Subscription, ...]] = {}
+        self._routes: Dict[Tuple[str, str], Tuple[Subscription, ...]] = {}
         self._buffer_size = buffer_size
         self._lock = threading.Lock()
         self._next_id = 1
+        self._first_id = 1  # oldest id still in the ring
+        self._dispatch = dispatch or settings.EVENT_BUS_DISPATCH
 
-    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> None:
+    def subscribe(
+        self,
+        callback: Callable[[Dict[str, Any]], None],
+        threaded: Optional[bool] = None,
+        queue_size: Optional[int] = None,
+        types: Optional[Iterable[str]] = None,
+        categories: Optional[Iterable[str]] = None,
+        task_id: Optional[int] = None,
+    ) -> Subscription:
         """
-        Register a callback that will be called with the event dict every time an event is published.
+        Register a callback that will be called with the event dict every time a matching event is published.
+
+        Filters are ANDed; e.g. types=[EventType.TASK_FAILED], task_id=42.
         """
+        if threaded is None:
+            threaded = self._dispatch == "threaded"
+
+        sub = Subscription(
+            callback,
+            threaded=threaded,
+            queue_size=queue_size or settings.EVENT_BUS_SUBSCRIBER_QUEUE,
+            types=types,
+            categories=categories,
+            task_id=task_id,
+        )
+        sub.start()
+
+        with self._lock:
+            # copy-on-write so stats()/close() can iterate without holding the lock
+            self._subscribers = self._subscribers + (sub,)
+            self._index(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
         with self._lock:
-            self._subscribers.append(callback)
+            self._subscribers = tuple(s for s in self._subscribers if s is not sub)
+            self._unindex(sub)
+        sub.close()
+
+    def _index(self, sub: Subscription) -> None:
+        if sub.task_id is not None:
+            self._by_task[sub.task_id] = self._by_task.get(sub.task_id, ()) + (sub,)
+        else:
+            for t in sub.types if sub.types is not None else (None,):
+                self._by_type.setdefault(t, set()).add(sub)
+            for c in sub.categories if sub.categories is not None else (None,):
+                self._by_category.setdefault(c, set()).add(sub)
+        self._routes = {}
+
+    def _unindex(self, sub: Subscription) -> None:
+        if sub.task_id is not None:
+            remaining = tuple(s for s in self._by_task.get(sub.task_id, ()) if s is not sub)
+            if remaining:
+                self._by_task[sub.task_id] = remaining
+            else:
+                self._by_task.pop(sub.task_id, None)
+        else:
+            for index in (self._by_type, self._by_category):
+                for key in [k for k, subs in index.items() if sub in subs]:
+                    index[key].discard(sub)
+                    if not index[key]:
+                        del index[key]
+        self._routes = {}
+
+    def _route(self, event_type: str, category: str) -> Tuple[Subscription, ...]:
+        """
+        Subscribers (without a task filter) for a (type, category) pair. Caller holds the lock.
+        """
+        key = (event_type, category)
+        route = self._routes.get(key)
+        if route is None:
+            empty: Set[Subscription] = set()
+            by_type = self._by_type.get(event_type, empty) | self._by_type.get(None, empty)
+            by_category = self._by_category.get(category, empty) | self._by_category.get(None, empty)
+            route = tuple(sorted(by_type & by_category, key=lambda s: s.seq))
+            self._routes[key] = route
+        return route
 
     def publish(
         self,
@@ -41,45 +246,110 @@ class EventBus:
         """
         Create an event, store it in memory, and notify subscribers.
         """
+        event = make_event(
+            event_type=event_type,
+            category=category,
+            message=message,
+            payload=payload,
+            task_id=task_id,
+            blueprint_id=blueprint_id,
+            worker_id=worker_id,
+            agent_id=agent_id,
+        )
+
         with self._lock:
-            event = make_event(
-                event_type=event_type,
-                category=category,
-                message=message,
-                payload=payload,
-                task_id=task_id,
-                blueprint_id=blueprint_id,
-                worker_id=worker_id,
-                agent_id=agent_id,
-            )
             event["id"] = self._next_id
             self._next_id += 1
 
-            self._events.append(event)
-            if len(self._events) > self._buffer_size:
-                # keep rolling buffer
-                self._events = self._events[-self._buffer_size :]
+            # overwrite the oldest slot once the ring is full
+            self._ring[event["id"] % self._buffer_size] = event
+            if event["id"] - self._first_id >= self._buffer_size:
+                self._first_id = event["id"] - self._buffer_size + 1
+
+            subscribers = self._route(event_type, category)
+            if task_id is not None and task_id in self._by_task:
+                subscribers = subscribers + tuple(
+                    s for s in self._by_task[task_id] if s.matches(event)
+                )
+
+            for sub in subscribers:
+                if sub.threaded:
+                    sub.enqueue(event)
+
+        # inline delivery happens outside the lock
+        for sub in subscribers:
+            if not sub.threaded:
+                sub.invoke(event)
+
+        return event
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Per-subscriber delivery/lag/drop counters.
+        """
+        with self._lock:
+            last_id = self._next_id - 1
+            subscribers = self._subscribers
+        return {
+            "last_event_id": last_id,
+            "subscribers": [s.stats() for s in subscribers],
+        }
+
+    def seed_ids(self, next_id: int) -> None:
+        """
+        Continue numbering at `next_id` (e.g. after the last persisted event id),
+        so in-memory ids and events-table ids are the same sequence.
+        Events already in the ring are forgotten if the sequence jumps.
+        """
+        with self._lock:
+            if next_id > self._next_id:
+                self._next_id = next_id
+                self._first_id = next_id
 
-            # notify subscribers
-            for cb in self._subscribers:
-                try:
-                    cb(event)
-                except Exception:
-                    # We never want one bad subscriber to break the bus
-                    pass
+    @property
+    def oldest_id(self) -> int:
+        """
+        Smallest event id still held in memory (== next id when empty).
+        """
+        with self._lock:
+            return self._first_id
 
-            return event
+    def close(self) -> None:
+        """
+        Stop threaded subscribers after they have drained their queues.
+        """
+        for sub in self._subscribers:
+            sub.close()
 
     def get_recent(self, limit: int = 100) -> List[Dict[str, Any]]:
         """
         Return the last N events (for APIs, dashboards, etc).
         """
         with self._lock:
-            return list(self._events[-limit:])
+            if limit <= 0:
+                return []
+            start = max(self._first_id, self._next_id - limit)
+            return self._slice(start, self._next_id)
 
     def get_events_since(self, last_id: int) -> List[Dict[str, Any]]:
         """
         Return all events with id > last_id.
         """
         with self._lock:
-            return [e for e in self._events if e["id"] > last_id]
\ No newline at end of file
+            start = max(self._first_id, last_id + 1)
+            return self._slice(start, self._next_id)
+
+    def _slice(self, start_id: int, end_id: int) -> List[Dict[str, Any]]:
+        """
+        Events with start_id <= id < end_id, oldest first. Caller holds the lock.
+        """
+        if start_id >= end_id:
+            return []
+
+        size = self._buffer_size
+        lo = start_id % size
+        hi = lo + (end_id - start_id)
+        if hi <= size:
+            return self._ring[lo:hi]
+        # range wraps around the end of the ring
+        return self._ring[lo:] + self._ring[: hi - size]
\ No newline at end of file
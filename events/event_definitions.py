@@ -21,10 +21,12 @@ class EventType:
 
     # Tasks
     TASK_CREATED = "task_created"
+    TASK_REQUEUED = "task_requeued"
     TASK_ASSIGNED = "task_assigned"
     TASK_STARTED = "task_started"
     TASK_COMPLETED = "task_completed"
     TASK_FAILED = "task_failed"
+    TASK_DEAD_LETTERED = "task_dead_lettered"
 
     # Blueprints
     BLUEPRINT_DISCOVERED = "blueprint_discovered"
@@ -1,8 +1,30 @@
-from typing import Dict, Any, List
+import datetime as dt
+import queue
+import threading
+import time
+from typing import Callable, Dict, Any, List, Optional
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from db.models import EventLog
+from events.payload_blobs import flush_payload_blobs, get_payload_blob_store
 from core.logger import logger
+from core.settings import settings
+
+
+class _FlushRequest:
+    """
+    Marker put on the write-behind queue; the writer sets `done` once everything
+    queued before it has been written.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
 
 
 class EventStore:
@@ -12,30 +34,309 @@ class EventStore:
     - Listens to EventBus events
     - Writes them to the events table
     - Can query recent events from DB (for history beyond RAM buffer)
+
+    In write-behind mode, events are put on a bounded queue and a background
+    writer thread inserts them in batches (one transaction per batch), flushing
+    when EVENT_STORE_BATCH_SIZE events are waiting or EVENT_STORE_FLUSH_INTERVAL
+    seconds have passed. When the queue is full, publishers either block for up
+    to EVENT_STORE_PUT_TIMEOUT (backpressure) or the event is dropped and counted.
+    The same writer commits the offloaded payload blobs (events.payload_blobs)
+    before each batch.
     """
 
-    def __init__(self, session: Session):
+    def __init__(
+        self,
+        session: Session,
+        write_behind: Optional[bool] = None,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        block_when_full: Optional[bool] = None,
+    ):
         self.session = session
 
+        self.write_behind = settings.EVENT_STORE_WRITE_BEHIND if write_behind is None else write_behind
+        self.batch_size = batch_size or settings.EVENT_STORE_BATCH_SIZE
+        self.flush_interval = flush_interval or settings.EVENT_STORE_FLUSH_INTERVAL
+        self.block_when_full = (
+            settings.EVENT_STORE_BLOCK_WHEN_FULL if block_when_full is None else block_when_full
+        )
+
+        self.skip_types = frozenset(settings.EVENT_STORE_SKIP_TYPES)
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size or settings.EVENT_STORE_QUEUE_SIZE)
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._closed = False
+
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.failed = 0
+
+        self._write_listeners: List[Callable[[int], None]] = []
+        self._bus = None
+
+    @staticmethod
+    def _row_from_event(event: Dict[str, Any]) -> Dict[str, Any]:
+        created_at = event.get("created_at")
+        if isinstance(created_at, str):
+            created_at = dt.datetime.fromisoformat(created_at)
+
+        row = {
+            "type": event.get("type"),
+            "category": event.get("category"),
+            "task_id": event.get("task_id"),
+            "blueprint_id": event.get("blueprint_id"),
+            "worker_id": event.get("worker_id"),
+            "agent_id": event.get("agent_id"),
+            "payload": event.get("payload"),
+            "created_at": created_at or dt.datetime.utcnow(),
+        }
+        # keep the bus id so SSE clients can resume from the DB with Last-Event-ID
+        if event.get("id") is not None:
+            row["id"] = event["id"]
+        return row
+
     def handle_event(self, event: Dict[str, Any]) -> None:
         """
-        Convert an in-memory event dict into a DB record.
+        Convert an in-memory event dict into a DB record
+        (or queue it for the background writer in write-behind mode).
         """
+        if event.get("type") in self.skip_types:
+            return
+
+        if self.write_behind:
+            self._enqueue(event)
+            return
+
         try:
-            record = EventLog(
-                type=event.get("type"),
-                category=event.get("category"),
-                task_id=event.get("task_id"),
-                blueprint_id=event.get("blueprint_id"),
-                worker_id=event.get("worker_id"),
-                agent_id=event.get("agent_id"),
-                payload=event.get("payload"),
-            )
+            record = EventLog(**self._row_from_event(event))
             self.session.add(record)
             self.session.commit()
+            self.written += 1
+            self._notify_written(1)
+        except IntegrityError as e:
+            self.session.rollback()
+            self.failed += 1
+            logger.error(f"[EventStore] Event id {event.get('id')} already stored: {e}")
+            self._reseed_bus(self.session.get_bind())
         except Exception as e:
             logger.error(f"[EventStore] Failed to store event: {e}")
             self.session.rollback()
+            self.failed += 1
+
+    # ---------- WRITE-BEHIND ----------
+
+    def start(self) -> None:
+        """
+        Start the background writer thread (no-op if already running).
+        """
+        with self._writer_lock:
+            if self._writer is not None and self._writer.is_alive():
+                return
+            self._closed = False
+            self._writer = threading.Thread(
+                target=self._run_writer,
+                name="EventStoreWriter",
+                daemon=True,
+            )
+            self._writer.start()
+        # offloaded payloads are written by this writer, ahead of the events using them
+        get_payload_blob_store().defer_writes(True)
+
+    def _enqueue(self, event: Dict[str, Any]) -> None:
+        if self._closed:
+            self.dropped += 1
+            return
+
+        if self._writer is None:
+            self.start()
+
+        try:
+            if self.block_when_full:
+                self._queue.put(event, timeout=settings.EVENT_STORE_PUT_TIMEOUT)
+            else:
+                self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning(f"[EventStore] Write-behind queue full, dropped {self.dropped} events so far.")
+
+    def _run_writer(self) -> None:
+        engine = self.session.get_bind()
+        stopping = False
+
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                # closed and drained: stop even if the _STOP marker never fit in the queue
+                stopping = self._closed
+                continue
+
+            rows: List[Dict[str, Any]] = []
+            flushes: List[_FlushRequest] = []
+            deadline = dt.datetime.utcnow() + dt.timedelta(seconds=self.flush_interval)
+
+            # Gather a batch: until size threshold, time threshold, flush or stop marker
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                if isinstance(item, _FlushRequest):
+                    flushes.append(item)
+                    break
+
+                rows.append(self._row_from_event(item))
+                if len(rows) >= self.batch_size:
+                    break
+
+                remaining = (deadline - dt.datetime.utcnow()).total_seconds()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+
+            if stopping:
+                # Drain whatever publishers managed to queue before close()
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if isinstance(item, _FlushRequest):
+                        flushes.append(item)
+                    elif item is not _STOP:
+                        rows.append(self._row_from_event(item))
+
+            if rows or flushes:
+                flush_payload_blobs()
+            if rows:
+                self._write_rows(engine, rows)
+
+            for f in flushes:
+                f.done.set()
+
+    def _write_rows(self, engine, rows: List[Dict[str, Any]]) -> None:
+        for start in range(0, len(rows), self.batch_size):
+            chunk = rows[start : start + self.batch_size]
+            try:
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(insert(EventLog), chunk)
+                    written = len(chunk)
+                except IntegrityError:
+                    # Ids already taken (another process writing with its own bus).
+                    # Never re-number: DB ids must stay equal to bus ids for
+                    # Last-Event-ID replay. Keep the rows that fit, count the rest
+                    # as failed and move the bus past the stored ids.
+                    with engine.begin() as conn:
+                        written = conn.execute(insert(EventLog).prefix_with("OR IGNORE"), chunk).rowcount
+                    self.failed += len(chunk) - written
+                    logger.error(f"[EventStore] {len(chunk) - written} events not stored: id already in use.")
+                    self._reseed_bus(engine)
+                self.written += written
+                self.batches += 1
+                self._notify_written(written)
+            except Exception as e:
+                self.failed += len(chunk)
+                logger.error(f"[EventStore] Failed to write batch of {len(chunk)} events: {e}")
+
+    def _reseed_bus(self, engine) -> None:
+        if self._bus is None:
+            return
+        with engine.connect() as conn:
+            last_id = conn.execute(select(func.max(EventLog.id))).scalar() or 0
+        self._bus.seed_ids(last_id + 1)
+
+    def add_write_listener(self, callback: Callable[[int], None]) -> None:
+        """
+        Call `callback(n)` after every commit of n events (e.g. to evict
+        cached responses that read the events table).
+        """
+        self._write_listeners.append(callback)
+
+    def _notify_written(self, count: int) -> None:
+        for callback in self._write_listeners:
+            try:
+                callback(count)
+            except Exception as e:
+                logger.warning(f"[EventStore] Write listener failed: {e}")
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every event queued so far has been written.
+        Returns False if the writer did not catch up within `timeout`, or
+        stopped before it did.
+        """
+        writer = self._writer
+        if not self.write_behind or writer is None or not writer.is_alive():
+            return True
+
+        # wait in slices so a writer that dies meanwhile cannot hang the caller
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def _slice() -> Optional[float]:
+            step = settings.EVENT_STORE_PUT_TIMEOUT
+            if deadline is None:
+                return step
+            left = deadline - time.monotonic()
+            return None if left <= 0 else min(step, left)
+
+        request = _FlushRequest()
+        while True:
+            wait = _slice()
+            if wait is None or not writer.is_alive():
+                logger.warning("[EventStore] Flush gave up: write-behind queue full.")
+                return False
+            try:
+                self._queue.put(request, timeout=wait)
+                break
+            except queue.Full:
+                continue
+
+        while not request.done.is_set():
+            wait = _slice()
+            if wait is None or not writer.is_alive():
+                logger.warning("[EventStore] Flush gave up: writer did not catch up.")
+                return False
+            request.done.wait(wait)
+        return True
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """
+        Stop accepting events, drain the queue and stop the writer thread.
+        """
+        if self._writer is None:
+            self._closed = True
+            return
+
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            # the writer also stops once it finds the closed store's queue empty
+            logger.warning("[EventStore] Write-behind queue full at close; waiting for the writer to drain it.")
+        self._writer.join(timeout)
+        if self._writer.is_alive():
+            logger.warning("[EventStore] Writer did not drain within timeout.")
+        else:
+            logger.info(f"[EventStore] Writer drained ({self.written} written, {self.dropped} dropped).")
+        self._writer = None
+        get_payload_blob_store().defer_writes(False)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "write_behind": self.write_behind,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "batches": self.batches,
+        }
 
     def attach_to_bus(self, bus) -> None:
         """
@@ -45,8 +346,16 @@ class EventStore:
         def _callback(event: Dict[str, Any]):
             self.handle_event(event)
 
-        bus.subscribe(_callback)
-        logger.info("[EventStore] Attached to EventBus.")
+        # the store writes bus ids as primary keys: continue after the last stored one
+        self._bus = bus
+        bus.seed_ids(self.get_last_event_id() + 1)
+
+        if self.write_behind:
+            self.start()
+
+        # synchronous commits must not run in the publisher's thread
+        bus.subscribe(_callback, threaded=not self.write_behind)
+        logger.info(f"[EventStore] Attached to EventBus (write_behind={self.write_behind}).")
 
     # ---------- NEW HELPERS FOR API LAYER ----------
 
@@ -125,4 +434,19 @@ class EventStore:
             .order_by(EventLog.id.desc())
             .limit(limit)
             .all()
-        )
\ No newline at end of file
+        )
+
+
+def prune_events(engine, older_than: dt.datetime, chunk: int = 5000) -> int:
+    """
+    Delete events created before `older_than`, `chunk` rows per transaction
+    so writers are not locked out for the whole sweep. Returns the count.
+    """
+    deleted = 0
+    while True:
+        with engine.begin() as conn:
+            ids = select(EventLog.id).where(EventLog.created_at < older_than).limit(chunk).scalar_subquery()
+            count = conn.execute(delete(EventLog).where(EventLog.id.in_(ids))).rowcount
+        deleted += count
+        if count < chunk:
+            return deleted
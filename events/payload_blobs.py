@@ -0,0 +1,263 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from core.logger import logger
+from core.settings import settings
+
+# how summarize_payload() shortens values
+_MAX_LIST_ITEMS = 3
+_MAX_STR_CHARS = 200
+# how often (seconds) a re-used blob's used_at is refreshed; prune() allows this much slack
+_TOUCH_EVERY = 3600
+
+
+def payload_json(payload: Any) -> str:
+    """
+    Canonical JSON for hashing/sizing (sorted keys, no whitespace).
+    """
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def summarize_payload(value: Any, depth: int = 0) -> Any:
+    """
+    Shrink a payload while keeping its shape readable: lists become
+    {"count", "items": first few}, long strings are cut, and anything
+    nested deeper than a few levels is replaced by its type name.
+    """
+    if depth > 3:
+        return f"<{type(value).__name__}>"
+    if isinstance(value, dict):
+        return {k: summarize_payload(v, depth + 1) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if len(value) <= _MAX_LIST_ITEMS and depth:
+            return [summarize_payload(v, depth + 1) for v in value]
+        return {
+            "count": len(value),
+            "items": [summarize_payload(v, depth + 1) for v in value[:_MAX_LIST_ITEMS]],
+        }
+    if isinstance(value, str) and len(value) > _MAX_STR_CHARS:
+        return value[:_MAX_STR_CHARS] + "..."
+    return value
+
+
+class PayloadBlobStore:
+    """
+    Content-addressed store for full event payloads that were too large to
+    keep inline: sha256(canonical JSON) -> JSON. Identical payloads are
+    stored once.
+
+    Uses its own SQLite file and connection, so writing a blob never
+    contends with (or commits) the caller's session on the main DB.
+
+    While an event store runs write-behind (see defer_writes()), new blobs
+    wait in memory and its writer thread commits them in one transaction
+    ahead of each event batch, so a blob is on disk no later than the
+    events that reference it. `used_at` is refreshed when a payload comes
+    back, so prune() only drops blobs no retained event can point to.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._known: Dict[str, float] = {}  # hash -> used_at written by this process
+        self._pending: Dict[str, Tuple[str, int, float]] = {}  # hash -> (body, size, used_at)
+        self.deferred = False
+
+        self.writes = 0
+        self.dedup_hits = 0
+        self.pruned = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS payload_blobs ("
+                "sha256 TEXT PRIMARY KEY, body TEXT NOT NULL, size INTEGER NOT NULL, created_at REAL NOT NULL, "
+                "used_at REAL)"
+            )
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(payload_blobs)")}
+            if "used_at" not in columns:
+                # blob files written before retention existed
+                self._conn.execute("ALTER TABLE payload_blobs ADD COLUMN used_at REAL")
+                self._conn.execute("UPDATE payload_blobs SET used_at = created_at")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_payload_blobs_used_at ON payload_blobs (used_at)")
+            self._conn.commit()
+        return self._conn
+
+    def put(self, payload: Any) -> Tuple[str, int]:
+        """
+        Store a payload (no-op if already present). Returns (sha256, size in bytes).
+        """
+        body = payload_json(payload)
+        size = len(body.encode("utf-8"))
+        sha = hashlib.sha256(body.encode("utf-8")).hexdigest()
+        now = time.time()
+
+        with self._lock:
+            used_at = self._known.get(sha)
+            if sha in self._pending or (used_at is not None and now - used_at < _TOUCH_EVERY):
+                self.dedup_hits += 1
+                return sha, size
+            self._pending[sha] = (body, size, now)
+            if not self.deferred or len(self._pending) >= settings.PAYLOAD_BLOB_MAX_PENDING:
+                self._write_pending()
+        return sha, size
+
+    def _write_pending(self) -> None:
+        # caller holds self._lock
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        try:
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO payload_blobs (sha256, body, size, created_at, used_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (sha256) DO UPDATE SET used_at = excluded.used_at",
+                    [(sha, body, size, used_at, used_at) for sha, (body, size, used_at) in pending.items()],
+                )
+            if len(self._known) >= 100_000:
+                self._known.clear()  # only a write shortcut; the upsert dedupes anyway
+            self._known.update((sha, used_at) for sha, (_, _, used_at) in pending.items())
+            self.writes += len(pending)
+        except sqlite3.Error as e:
+            # the events still go out with their summaries; only the full copies are lost
+            logger.warning(f"[PayloadBlobStore] Write of {len(pending)} blobs failed: {e}")
+
+    def flush(self) -> None:
+        """
+        Write every blob queued by put() so far.
+        """
+        with self._lock:
+            self._write_pending()
+
+    def defer_writes(self, deferred: bool) -> None:
+        """
+        Hold new blobs for flush() instead of committing each one in put()
+        (EventStore turns this on while its write-behind writer runs).
+        """
+        with self._lock:
+            self.deferred = deferred
+            if not deferred:
+                self._write_pending()
+
+    def prune(self, older_than: float) -> int:
+        """
+        Delete blobs no event newer than the `older_than` epoch timestamp
+        can reference.
+        """
+        # used_at lags the latest reference by up to _TOUCH_EVERY
+        cutoff = older_than - _TOUCH_EVERY
+        with self._lock:
+            if self._conn is None and not os.path.exists(self.db_path):
+                return 0
+            try:
+                conn = self._connect()
+                with conn:
+                    deleted = conn.execute("DELETE FROM payload_blobs WHERE used_at < ?", (cutoff,)).rowcount
+            except sqlite3.Error as e:
+                logger.warning(f"[PayloadBlobStore] Prune failed: {e}")
+                return 0
+            self._known.clear()
+            self.pruned += deleted
+        return deleted
+
+    def get(self, sha: str) -> Optional[Any]:
+        with self._lock:
+            if sha in self._pending:
+                return json.loads(self._pending[sha][0])
+            if self._conn is None and not os.path.exists(self.db_path):
+                return None
+            row = self._connect().execute("SELECT body FROM payload_blobs WHERE sha256 = ?", (sha,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def close(self) -> None:
+        with self._lock:
+            self._write_pending()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "path": self.db_path,
+                "writes": self.writes,
+                "dedup_hits": self.dedup_hits,
+                "pending": len(self._pending),
+                "pruned": self.pruned,
+            }
+
+
+_store: Optional[PayloadBlobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_payload_blob_store() -> PayloadBlobStore:
+    """
+    Process-wide blob store; defaults to "<DB_PATH stem>_blobs.sqlite".
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                path = settings.PAYLOAD_BLOB_PATH or os.path.splitext(settings.DB_PATH)[0] + "_blobs.sqlite"
+                _store = PayloadBlobStore(path)
+    return _store
+
+
+def flush_payload_blobs() -> None:
+    """
+    Write blobs still held for the event store's writer (no-op before the
+    process-wide store exists).
+    """
+    if _store is not None:
+        _store.flush()
+
+
+def slim_payload(
+    payload: Optional[Dict[str, Any]],
+    budget: int,
+    summarize: bool = True,
+    store: Optional[PayloadBlobStore] = None,
+) -> Dict[str, Any]:
+    """
+    Fit a payload into `budget` bytes of JSON without losing it.
+
+    Top-level values that get shortened (always when `summarize`, otherwise
+    only when the payload is over budget) are stored in the blob store and
+    replaced by their summary plus {"blob": sha256, "blob_bytes": size}.
+    Storing per value rather than per payload lets identical task lists
+    from different blueprints share one blob. If the result is still over
+    budget, the whole payload is stored and only its keys are kept.
+    """
+    if not payload:
+        return {}
+
+    if not summarize and len(payload_json(payload)) <= budget:
+        return payload
+
+    store = store or get_payload_blob_store()
+    slim: Dict[str, Any] = {}
+    for key, value in payload.items():
+        short = summarize_payload(value, 1)
+        if short == value:
+            slim[key] = value
+            continue
+        sha, size = store.put(value)
+        if not isinstance(short, dict):
+            short = {"value": short}
+        slim[key] = dict(short, blob=sha, blob_bytes=size)
+
+    if len(payload_json(slim)) > budget:
+        sha, size = store.put(payload)
+        slim = {"keys": sorted(payload), "blob": sha, "blob_bytes": size}
+    return slim
@@ -0,0 +1,39 @@
+# launcher/start_platform_workers.py
+
+import os
+import sys
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)
+
+from events.event_bus import EventBus
+from workers.platform_workers.hive_worker import HiveWorker
+from workers.platform_workers.remotasks_worker import RemotasksWorker
+from workers.platform_workers.toloka_worker import TolokaWorker
+
+
+def main():
+    bus = EventBus()
+    workers = [TolokaWorker(bus), HiveWorker(bus), RemotasksWorker(bus)]
+    threads = [
+        threading.Thread(target=w.run_forever, kwargs={"poll_interval": 2.0}, name=w.name, daemon=True)
+        for w in workers
+    ]
+    for t in threads:
+        t.start()
+
+    try:
+        for t in threads:
+            while t.is_alive():
+                t.join(1.0)
+    except KeyboardInterrupt:
+        for w in workers:
+            w.stop()
+        for t in threads:
+            t.join(10.0)
+
+
+if __name__ == "__main__":
+    main()
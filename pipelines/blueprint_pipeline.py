@@ -1,34 +1,53 @@
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session
 
+from core.settings import settings
 from db.models import Blueprint
 from events.event_bus import EventBus
 from events.event_definitions import EventType, EventCategory
-from pipelines.taskpipe import TaskPipe
+from pipelines.taskpipe import ACTIVATABLE_STATUSES, TaskPipe
 
 
-def process_new_blueprints(session: Session, event_bus: EventBus) -> int:
+def process_new_blueprints(
+    session: Session,
+    event_bus: EventBus,
+    chunk_size: Optional[int] = None,
+    max_blueprints: Optional[int] = None,
+) -> int:
     """
     Finds blueprints with status 'new' or 'approved' and generates tasks for them.
     Returns the number of blueprints processed.
-    """
-    to_process: List[Blueprint] = (
-        session.query(Blueprint)
-        .filter(Blueprint.status.in_(["new", "approved"]))
-        .order_by(Blueprint.id.asc())
-        .limit(10)
-        .all()
-    )
-
-    if not to_process:
-        return 0
 
-    tp = TaskPipe(session, event_bus)
+    Works through all of them (or up to `max_blueprints`) in chunks of
+    `chunk_size`, one batched TaskPipe call and commit per chunk. Chunks are
+    paged by id (id > last seen), so a blueprint that stays 'new' is never
+    fetched twice.
+    """
+    chunk_size = chunk_size or settings.TASKPIPE_CHUNK_SIZE
 
+    tp: Optional[TaskPipe] = None
     count = 0
-    for bp in to_process:
-        tp.create_tasks_for_blueprint(bp)
-        count += 1
+    last_id = 0
+
+    while max_blueprints is None or count < max_blueprints:
+        limit = chunk_size if max_blueprints is None else min(chunk_size, max_blueprints - count)
+        chunk: List[Blueprint] = (
+            session.query(Blueprint)
+            .filter(Blueprint.status.in_(ACTIVATABLE_STATUSES), Blueprint.id > last_id)
+            .order_by(Blueprint.id.asc())
+            .limit(limit)
+            .all()
+        )
+        if not chunk:
+            break
+
+        last_id = chunk[-1].id
+        tp = tp or TaskPipe(session, event_bus)
+        tp.create_tasks_for_blueprints(chunk)
+        count += len(chunk)
+
+    if not count:
+        return 0
 
     event_bus.publish(
         event_type=EventType.AGENT_DECISION,
@@ -37,4 +56,4 @@ def process_new_blueprints(session: Session, event_bus: EventBus) -> int:
         payload={"blueprints_processed": count},
     )
 
-    return count
\ No newline at end of file
+    return count
@@ -1,9 +1,19 @@
-from typing import List
+import collections
+import datetime as dt
+import time
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, bindparam, insert, or_, select, update
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session
 
-from db.models import Task, Worker
+from db.models import DeadLetter, Task, Worker
 from events.event_bus import EventBus
 from events.event_definitions import EventType, EventCategory
+from pipelines.retry_policy import next_attempt_at
+from pipelines.task_routing import accepts, category_clause
+from core.logger import logger
+from core.settings import settings
 
 
 def select_pending_tasks(session: Session, limit: int = 20) -> List[Task]:
@@ -20,13 +30,250 @@ def select_pending_tasks(session: Session, limit: int = 20) -> List[Task]:
     return tasks
 
 
-def assign_tasks_to_worker(session: Session, event_bus: EventBus, worker: Worker, tasks: List[Task]) -> None:
+def claim_tasks(
+    session: Session,
+    worker_id: int,
+    limit: int = 5,
+    event_bus: Optional[EventBus] = None,
+    retries: int = 5,
+    task_ids: Optional[Sequence[int]] = None,
+    capabilities: Optional[Iterable[str]] = None,
+) -> List[Task]:
+    """
+    Atomically move up to `limit` pending tasks to 'running' for `worker_id`,
+    stamping assigned_worker_id, started_at and a lease (TASK_LEASE_SECONDS,
+    extended by the worker's heartbeat) in a single UPDATE.
+
+    The UPDATE re-checks status='pending', so concurrent workers (threads or
+    processes) can never claim the same task. Uses UPDATE ... RETURNING when
+    the dialect supports it (SQLite >= 3.35); otherwise the claimed rows are
+    read back by (worker, started_at) stamp.
+
+    With `task_ids` (e.g. from a TaskDispatcher) only those ids are
+    candidates, by primary key and without the ORDER BY scan; ids that are
+    no longer pending are skipped. The result keeps the order of `task_ids`.
+
+    With `capabilities` only pending tasks whose category the worker can run
+    are candidates (see pipelines.task_routing). Tasks already routed to this
+    worker by assign_tasks_to_worker() ('queued', up to `limit` more) are always claimed
+    too. Pending tasks whose next_attempt_at is still in
+    the future are skipped.
+    """
+    now = dt.datetime.utcnow()
+
+    routed = (
+        select(Task.id)
+        .where(Task.status == "queued", Task.assigned_worker_id == worker_id)
+        .limit(limit)
+        .scalar_subquery()
+    )
+    due = or_(Task.next_attempt_at.is_(None), Task.next_attempt_at <= now)
+    claimable = or_(
+        and_(Task.status == "pending", due),
+        and_(Task.status == "queued", Task.assigned_worker_id == worker_id),
+    )
+
+    if task_ids is not None:
+        candidates = or_(Task.id.in_(list(task_ids)), Task.id.in_(routed))
+        order = {tid: i for i, tid in enumerate(task_ids)}
+        sort_key = lambda t: order.get(t.id, -1)
+    else:
+        pending = select(Task.id).where(Task.status == "pending", due)
+        if capabilities is not None:
+            pending = pending.where(category_clause(capabilities))
+        pending = pending.order_by(Task.priority.asc(), Task.importance.desc()).limit(limit).scalar_subquery()
+        candidates = or_(Task.id.in_(pending), Task.id.in_(routed))
+        sort_key = lambda t: (t.priority, -(t.importance or 0))
+    stmt = (
+        update(Task)
+        .where(candidates, claimable)
+        .values(
+            status="running",
+            assigned_worker_id=worker_id,
+            started_at=now,
+            lease_expires_at=now + dt.timedelta(seconds=settings.TASK_LEASE_SECONDS),
+        )
+    )
+    use_returning = getattr(session.get_bind().dialect, "update_returning", False)
+
+    for attempt in range(retries):
+        try:
+            if use_returning:
+                tasks = list(
+                    session.scalars(
+                        stmt.returning(Task),
+                        execution_options={"synchronize_session": False},
+                    )
+                )
+            else:
+                session.execute(stmt, execution_options={"synchronize_session": False})
+                tasks = list(
+                    session.scalars(
+                        select(Task).where(
+                            Task.status == "running",
+                            Task.assigned_worker_id == worker_id,
+                            Task.started_at == now,
+                        )
+                    )
+                )
+            tasks.sort(key=sort_key)
+            started = [(t.id, t.category, t.short_description) for t in tasks]
+            # hand back detached snapshots: commit() would otherwise expire them
+            # and every attribute access would cost a SELECT per task
+            for t in tasks:
+                session.expunge(t)
+            session.commit()
+            break
+        except OperationalError as e:
+            # another writer held the lock past busy_timeout (or our snapshot was stale)
+            session.rollback()
+            if attempt == retries - 1:
+                raise
+            logger.warning(f"[Execution] claim_tasks retry {attempt + 1} for worker #{worker_id}: {e}")
+            time.sleep(0.05 * (attempt + 1))
+
+    _publish_transition(event_bus, EventType.TASK_STARTED, f"claimed by worker #{worker_id}", started, worker_id=worker_id)
+
+    return tasks
+
+
+def release_tasks(session: Session, task_ids: List[int]) -> int:
+    """
+    Return claimed (running) tasks to 'pending', e.g. prefetched work a
+    stopping worker never started.
+    """
+    if not task_ids:
+        return 0
+
+    result = session.execute(
+        update(Task)
+        .where(Task.id.in_(task_ids), Task.status == "running")
+        .values(status="pending", assigned_worker_id=None, started_at=None, lease_expires_at=None),
+        execution_options={"synchronize_session": False},
+    )
+    session.commit()
+    return result.rowcount
+
+
+def reclaim_expired_tasks(
+    session: Session,
+    event_bus: Optional[EventBus] = None,
+    stale_after: Optional[float] = None,
+    limit: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Recover tasks held by dead or stuck workers, in bulk.
+
+    A task is reclaimed when its lease has expired, or when its worker has
+    not written a heartbeat for `stale_after` seconds:
+    - 'queued' tasks (routed, never started) go straight back to 'pending'
+    - 'running' tasks count as a failed attempt, so they are retried with
+      backoff or dead-lettered like any other failure
+    Stale workers are marked inactive so the router stops picking them.
+    """
+    now = dt.datetime.utcnow()
+    cutoff = now - dt.timedelta(seconds=stale_after or settings.WORKER_OFFLINE_AFTER)
+    limit = limit or settings.TASK_LEASE_SWEEP_BATCH
+
+    stale_workers = select(Worker.id).where(
+        or_(Worker.last_heartbeat_at < cutoff, Worker.last_heartbeat_at.is_(None))
+    )
+    expired = or_(Task.lease_expires_at < now, Task.assigned_worker_id.in_(stale_workers))
+
+    def _grab(status: str, values: Dict) -> List[int]:
+        # the UPDATE re-checks status, so a task finished meanwhile is left alone
+        candidates = select(Task.id).where(Task.status == status, expired).limit(limit).scalar_subquery()
+        stmt = update(Task).where(Task.id.in_(candidates), Task.status == status).values(**values)
+        if getattr(session.get_bind().dialect, "update_returning", False):
+            return list(session.scalars(stmt.returning(Task.id), execution_options={"synchronize_session": False}))
+        ids = list(session.scalars(select(Task.id).where(Task.status == status, expired).limit(limit)))
+        session.execute(
+            update(Task).where(Task.id.in_(ids), Task.status == status).values(**values),
+            execution_options={"synchronize_session": False},
+        )
+        return ids
+
+    requeued = _grab("queued", {"status": "pending", "assigned_worker_id": None, "lease_expires_at": None})
+    lost = _grab("running", {"lease_expires_at": None})
+
+    failures = {tid: "lease expired: worker stopped responding" for tid in lost}
+    failed, dead = _apply_failed(session, failures, now) if failures else ([], [])
+    requeued_rows = _transition_rows(session, requeued) if requeued else []
+
+    deactivated = session.execute(
+        update(Worker)
+        .where(Worker.is_active.is_(True), Worker.last_heartbeat_at < cutoff)
+        .values(is_active=False),
+        execution_options={"synchronize_session": False},
+    ).rowcount
+    session.commit()
+
+    _publish_transition(event_bus, EventType.TASK_REQUEUED, "re-queued (lease expired)", requeued_rows)
+    _publish_failed(event_bus, failed, dead, failures)
+
+    return {"requeued": len(requeued), "failed": len(failed), "dead_lettered": len(dead), "workers_deactivated": deactivated}
+
+
+def requeue_due_retries(
+    session: Session,
+    event_bus: Optional[EventBus] = None,
+    limit: Optional[int] = None,
+) -> int:
+    """
+    Move failed tasks whose backoff has elapsed back to 'pending', oldest
+    schedule first (idx_task_status_next_attempt), at most `limit`
+    (TASK_RETRY_BATCH_SIZE). Dead-lettered tasks never come back here.
+
+    The UPDATE re-checks status='failed' and only the ids it actually
+    changed are published, as one TASK_REQUEUED event after the commit.
+    Returns the number re-queued.
+    """
+    now = dt.datetime.utcnow()
+    limit = limit or settings.TASK_RETRY_BATCH_SIZE
+    due = (
+        select(Task.id)
+        .where(Task.status == "failed", Task.next_attempt_at <= now)
+        .order_by(Task.next_attempt_at.asc())
+        .limit(limit)
+    )
+    stmt = update(Task).where(Task.status == "failed").values(status="pending", next_attempt_at=None)
+
+    if getattr(session.get_bind().dialect, "update_returning", False):
+        ids = list(
+            session.scalars(
+                stmt.where(Task.id.in_(due.scalar_subquery())).returning(Task.id),
+                execution_options={"synchronize_session": False},
+            )
+        )
+    else:
+        ids = list(session.scalars(due))
+        session.execute(stmt.where(Task.id.in_(ids)), execution_options={"synchronize_session": False})
+    rows = _transition_rows(session, ids) if ids else []
+    session.commit()
+
+    _publish_transition(event_bus, EventType.TASK_REQUEUED, "re-queued for retry", rows)
+    return len(rows)
+
+
+def assign_tasks_to_worker(session: Session, event_bus: EventBus, worker: Worker, tasks: List[Task]) -> List[Task]:
     """
-    Naive assignment: attach tasks to a given worker and mark as 'queued'.
+    Attach tasks to a given worker and mark as 'queued'; the worker picks
+    them up on its next claim_tasks(). Tasks whose category the worker has
+    no capability for are skipped. Returns the tasks actually assigned.
     """
-    for t in tasks:
+    assigned = [t for t in tasks if accepts(worker.capabilities or [], t.category)]
+    if len(assigned) < len(tasks):
+        logger.warning(
+            f"[Execution] Worker #{worker.id} ({worker.name}) cannot run "
+            f"{len(tasks) - len(assigned)} of {len(tasks)} tasks; skipped."
+        )
+
+    # the worker gets one lease period to pick them up before they are reclaimed
+    lease_expires_at = dt.datetime.utcnow() + dt.timedelta(seconds=settings.TASK_LEASE_SECONDS)
+    for t in assigned:
         t.assigned_worker_id = worker.id
         t.status = "queued"
+        t.lease_expires_at = lease_expires_at
         session.add(t)
 
         event_bus.publish(
@@ -44,68 +291,284 @@ def assign_tasks_to_worker(session: Session, event_bus: EventBus, worker: Worker
         )
 
     session.commit()
+    return assigned
 
 
-def mark_task_started(session: Session, event_bus: EventBus, task: Task) -> None:
-    t = session.get(Task, task.id)
-    if not t:
+# ---------------------------------------------------------
+# STATE TRANSITIONS
+#
+# The batch functions write every row in one transaction and publish one
+# event per batch (a normal per-task event when the batch has one task).
+# ---------------------------------------------------------
+
+TransitionRow = Tuple[int, Optional[str], Optional[str]]  # (id, category, short_description)
+
+
+def _publish_transition(
+    event_bus: Optional[EventBus],
+    event_type: str,
+    verb: str,
+    rows: Sequence[TransitionRow],
+    worker_id: Optional[int] = None,
+    errors: Optional[Dict[int, str]] = None,
+) -> None:
+    if event_bus is None or not rows:
         return
 
-    t.status = "running"
-    session.add(t)
-    session.commit()
+    if len(rows) == 1:
+        task_id, category, short_description = rows[0]
+        payload = {"short_description": short_description, "category": category}
+        message = f"Task #{task_id} {verb}."
+        if errors:
+            payload["error"] = errors.get(task_id, "")
+            message = f"Task #{task_id} {verb}: {payload['error'][:120]}"
+
+        event_bus.publish(
+            event_type=event_type,
+            category=EventCategory.TASK,
+            message=message,
+            task_id=task_id,
+            worker_id=worker_id,
+            payload=payload,
+        )
+        return
+
+    payload = {
+        "task_ids": [r[0] for r in rows],
+        "count": len(rows),
+        "categories": dict(collections.Counter(r[1] for r in rows)),
+    }
+    if errors:
+        payload["errors"] = {str(tid): msg[:200] for tid, msg in errors.items()}
 
     event_bus.publish(
-        event_type=EventType.TASK_STARTED,
+        event_type=event_type,
         category=EventCategory.TASK,
-        message=f"Task #{t.id} started.",
-        task_id=t.id,
-        payload={
-            "short_description": t.short_description,
-            "category": t.category,
-        },
+        message=f"{len(rows)} tasks {verb}.",
+        worker_id=worker_id,
+        payload=payload,
     )
 
 
-def mark_task_completed(session: Session, event_bus: EventBus, task: Task) -> None:
-    t = session.get(Task, task.id)
-    if not t:
-        return
+def _transition_rows(session: Session, task_ids: Iterable[int]) -> List[TransitionRow]:
+    return [
+        tuple(r)
+        for r in session.execute(
+            select(Task.id, Task.category, Task.short_description)
+            .where(Task.id.in_(list(task_ids)))
+            .order_by(Task.id)
+        )
+    ]
 
-    t.status = "completed"
-    session.add(t)
-    session.commit()
 
-    event_bus.publish(
-        event_type=EventType.TASK_COMPLETED,
-        category=EventCategory.TASK,
-        message=f"Task #{t.id} completed.",
-        task_id=t.id,
-        payload={
-            "short_description": t.short_description,
-            "category": t.category,
-        },
+def _apply_started(session: Session, task_ids: List[int], now: dt.datetime, worker_id: Optional[int]) -> List[TransitionRow]:
+    values = {"status": "running", "started_at": now}
+    if worker_id is not None:
+        values["assigned_worker_id"] = worker_id
+    session.execute(
+        update(Task).where(Task.id.in_(task_ids)).values(**values),
+        execution_options={"synchronize_session": False},
     )
+    return _transition_rows(session, task_ids)
 
 
-def mark_task_failed(session: Session, event_bus: EventBus, task: Task, error_message: str) -> None:
-    t = session.get(Task, task.id)
-    if not t:
-        return
+def _held(worker_id: Optional[int]) -> List:
+    # a worker's finish only applies to tasks it still runs: one the lease
+    # sweep reclaimed meanwhile (maybe re-claimed by another worker) is skipped
+    if worker_id is None:
+        return []
+    return [Task.status == "running", Task.assigned_worker_id == worker_id]
+
+
+def _apply_completed(
+    session: Session,
+    task_ids: List[int],
+    now: dt.datetime,
+    worker_id: Optional[int] = None,
+) -> List[TransitionRow]:
+    stmt = (
+        update(Task)
+        .where(Task.id.in_(task_ids), *_held(worker_id))
+        .values(status="completed", completed_at=now, lease_expires_at=None)
+    )
+    if getattr(session.get_bind().dialect, "update_returning", False):
+        done = list(session.scalars(stmt.returning(Task.id), execution_options={"synchronize_session": False}))
+    else:
+        done = list(session.scalars(select(Task.id).where(Task.id.in_(task_ids), *_held(worker_id))))
+        session.execute(stmt, execution_options={"synchronize_session": False})
+    return _transition_rows(session, done) if done else []
+
+
+def _apply_failed(
+    session: Session,
+    failures: Dict[int, str],
+    now: dt.datetime,
+    worker_id: Optional[int] = None,
+) -> Tuple[List[TransitionRow], List[TransitionRow]]:
+    """
+    Count the failed attempt, then either schedule the retry (status stays
+    'failed' with next_attempt_at, see retry_policy) or, once the category's
+    max_attempts is used up, move the task to 'dead_letter' and copy it into
+    dead_letters. With `worker_id` only tasks still running for that worker
+    are touched. Returns (all failed rows, dead-lettered rows).
+    """
+    current = session.execute(
+        select(Task.id, Task.category, Task.short_description, Task.attempts, Task.payload)
+        .where(Task.id.in_(list(failures)), *_held(worker_id))
+        .order_by(Task.id)
+    ).all()
+    if not current:
+        return [], []
+
+    params = []
+    rows: List[TransitionRow] = []
+    dead: List[TransitionRow] = []
+    letters = []
+    for r in current:
+        attempts = (r.attempts or 0) + 1
+        retry_at = next_attempt_at(r.category, attempts, now)
+        params.append(
+            {
+                "task_id": r.id,
+                "error": failures[r.id],
+                "new_status": "failed" if retry_at else "dead_letter",
+                "new_attempts": attempts,
+                "retry_at": retry_at,
+            }
+        )
+        rows.append((r.id, r.category, r.short_description))
+        if retry_at is None:
+            dead.append(rows[-1])
+            letters.append(
+                {
+                    "task_id": r.id,
+                    "category": r.category,
+                    "attempts": attempts,
+                    "last_error_message": failures[r.id],
+                    "payload": r.payload,
+                    "created_at": now,
+                }
+            )
 
-    t.status = "failed"
-    t.last_error_message = error_message
-    session.add(t)
+    # executemany: one statement, per-row error / attempt / schedule
+    table = Task.__table__
+    session.execute(
+        table.update()
+        .where(table.c.id == bindparam("task_id"), *_held(worker_id))
+        .values(
+            status=bindparam("new_status"),
+            attempts=bindparam("new_attempts"),
+            next_attempt_at=bindparam("retry_at"),
+            last_error_message=bindparam("error"),
+            last_error_at=now,
+            lease_expires_at=None,
+        ),
+        params,
+    )
+    if letters:
+        session.execute(insert(DeadLetter), letters)
+    return rows, dead
+
+
+def _publish_failed(
+    event_bus: Optional[EventBus],
+    rows: List[TransitionRow],
+    dead: List[TransitionRow],
+    failures: Dict[int, str],
+    worker_id: Optional[int] = None,
+) -> None:
+    _publish_transition(event_bus, EventType.TASK_FAILED, "failed", rows, worker_id=worker_id, errors=failures)
+    _publish_transition(
+        event_bus,
+        EventType.TASK_DEAD_LETTERED,
+        "moved to dead letters",
+        dead,
+        worker_id=worker_id,
+        errors={r[0]: failures[r[0]] for r in dead},
+    )
+
+
+def mark_tasks_started(
+    session: Session,
+    event_bus: Optional[EventBus],
+    task_ids: List[int],
+    worker_id: Optional[int] = None,
+) -> int:
+    if not task_ids:
+        return 0
+
+    rows = _apply_started(session, task_ids, dt.datetime.utcnow(), worker_id)
     session.commit()
+    _publish_transition(event_bus, EventType.TASK_STARTED, "started", rows, worker_id=worker_id)
+    return len(rows)
 
-    event_bus.publish(
-        event_type=EventType.TASK_FAILED,
-        category=EventCategory.TASK,
-        message=f"Task #{t.id} failed: {error_message[:120]}",
-        task_id=t.id,
-        payload={
-            "short_description": t.short_description,
-            "category": t.category,
-            "error": error_message,
-        },
-    )
\ No newline at end of file
+
+def mark_tasks_completed(session: Session, event_bus: Optional[EventBus], task_ids: List[int]) -> int:
+    if not task_ids:
+        return 0
+
+    rows = _apply_completed(session, task_ids, dt.datetime.utcnow())
+    session.commit()
+    _publish_transition(event_bus, EventType.TASK_COMPLETED, "completed", rows)
+    return len(rows)
+
+
+def mark_tasks_failed(session: Session, event_bus: Optional[EventBus], failures: Dict[int, str]) -> int:
+    """
+    `failures` maps task id -> error message. Each task is either scheduled
+    for a retry or dead-lettered, per its category's retry policy.
+    """
+    if not failures:
+        return 0
+
+    rows, dead = _apply_failed(session, failures, dt.datetime.utcnow())
+    session.commit()
+    _publish_failed(event_bus, rows, dead, failures)
+    return len(rows)
+
+
+def mark_tasks_finished(
+    session: Session,
+    event_bus: Optional[EventBus],
+    completed_ids: List[int],
+    failures: Dict[int, str],
+    worker_id: Optional[int] = None,
+) -> int:
+    """
+    Record a whole batch's outcome (completed + failed) in one transaction.
+
+    With `worker_id` only tasks still running for that worker are updated;
+    tasks the lease sweep reclaimed in the meantime (and maybe handed to
+    another worker) are skipped with a warning. Returns the number recorded.
+    """
+    if not completed_ids and not failures:
+        return 0
+
+    now = dt.datetime.utcnow()
+    completed = _apply_completed(session, completed_ids, now, worker_id) if completed_ids else []
+    failed, dead = _apply_failed(session, failures, now, worker_id) if failures else ([], [])
+    session.commit()
+
+    recorded = {r[0] for r in completed} | {r[0] for r in failed}
+    skipped = sorted(set(completed_ids) - recorded) + sorted(set(failures) - recorded)
+    if skipped:
+        logger.warning(
+            f"[Execution] Worker #{worker_id}: {len(skipped)} finished task(s) no longer held "
+            f"(lease reclaimed), outcome dropped: {skipped[:20]}"
+        )
+
+    _publish_transition(event_bus, EventType.TASK_COMPLETED, "completed", completed, worker_id=worker_id)
+    _publish_failed(event_bus, failed, dead, failures, worker_id=worker_id)
+    return len(recorded)
+
+
+def mark_task_started(session: Session, event_bus: EventBus, task: Task) -> None:
+    mark_tasks_started(session, event_bus, [task.id])
+
+
+def mark_task_completed(session: Session, event_bus: EventBus, task: Task) -> None:
+    mark_tasks_completed(session, event_bus, [task.id])
+
+
+def mark_task_failed(session: Session, event_bus: EventBus, task: Task, error_message: str) -> None:
+    mark_tasks_failed(session, event_bus, {task.id: error_message})
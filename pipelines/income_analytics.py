@@ -0,0 +1,215 @@
+import datetime as dt
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import numpy as np
+from sqlalchemy import String, case, func, select, type_coerce
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from core.settings import settings
+from db.models import CurrencyRate, IncomeRollup, IncomeRollupHourly
+
+BUCKET_SECONDS = {"hour": 3600, "day": 86400, "week": 7 * 86400}
+_WEEK_OFFSET = 4 * 86400  # 1970-01-05 was a Monday; weeks start on Monday
+_EPOCH = dt.datetime(1970, 1, 1)
+
+_rates: Optional[Dict[str, float]] = None
+_rates_loaded_at = 0.0
+_rates_lock = threading.Lock()
+
+
+# ---------------------------------------------------------
+# Currency rates (cached)
+# ---------------------------------------------------------
+
+def get_currency_rates(session: Session) -> Dict[str, float]:
+    """
+    currency -> rate into INCOME_BASE_CURRENCY: INCOME_CURRENCY_RATES
+    overridden by the currency_rates table, cached for INCOME_RATE_CACHE_TTL.
+    """
+    global _rates, _rates_loaded_at
+    with _rates_lock:
+        if _rates is not None and time.monotonic() - _rates_loaded_at < settings.INCOME_RATE_CACHE_TTL:
+            return _rates
+
+    rates = dict(settings.INCOME_CURRENCY_RATES)
+    rates.update({c: float(r) for c, r in session.execute(select(CurrencyRate.currency, CurrencyRate.rate))})
+    rates[settings.INCOME_BASE_CURRENCY] = 1.0
+
+    with _rates_lock:
+        _rates, _rates_loaded_at = rates, time.monotonic()
+    return rates
+
+
+def set_currency_rate(session: Session, currency: str, rate: float) -> None:
+    """
+    Upsert a rate and drop the cache; the caller commits.
+    """
+    global _rates
+    stmt = sqlite_insert(CurrencyRate).values(currency=currency.upper(), rate=float(rate), updated_at=dt.datetime.utcnow())
+    session.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[CurrencyRate.currency],
+            set_={"rate": stmt.excluded.rate, "updated_at": stmt.excluded.updated_at},
+        )
+    )
+    with _rates_lock:
+        _rates = None
+
+
+# ---------------------------------------------------------
+# Time-bucketed series
+# ---------------------------------------------------------
+
+def _floor(ts, bucket: str):
+    # works on ints and numpy arrays of epoch seconds
+    size = BUCKET_SECONDS[bucket]
+    offset = _WEEK_OFFSET if bucket == "week" else 0
+    return ts - (ts - offset) % size
+
+
+def _epoch(ts: dt.datetime) -> int:
+    # naive datetimes are UTC (as stored); aware ones (?from=...+02:00) are converted
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return int((ts - _EPOCH).total_seconds())
+
+
+def _iso(starts: np.ndarray) -> list:
+    return np.datetime_as_string(starts.astype("datetime64[s]")).tolist()
+
+
+def get_income_series(
+    session: Session,
+    bucket: str = "day",
+    start: Optional[dt.datetime] = None,
+    end: Optional[dt.datetime] = None,
+    platform: Optional[str] = None,
+    currency: Optional[str] = None,
+    window: Optional[int] = None,
+    horizon: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Income per hour/day/week bucket from the bucket containing `start` to
+    the one containing `end` (UTC; weeks start on Monday), converted into
+    `currency`.
+
+    Read from the precomputed rollups (hourly table for "hour", daily for
+    "day"/"week"), so the cost depends on the number of buckets, not on the
+    number of income records. Also returns a trailing moving average over
+    `window` buckets, the current run rate (mean of the last `window`
+    complete buckets) and a linear-trend projection for the next `horizon`
+    buckets. Raises ValueError for bad arguments.
+    """
+    if bucket not in BUCKET_SECONDS:
+        raise ValueError(f"bucket must be one of {', '.join(BUCKET_SECONDS)}")
+    size = BUCKET_SECONDS[bucket]
+    window = max(1, window or settings.INCOME_SERIES_WINDOW[bucket])
+    horizon = max(0, window if horizon is None else horizon)
+    target = (currency or settings.INCOME_BASE_CURRENCY).upper()
+
+    now_ts = _epoch(dt.datetime.utcnow())
+    # the bucket containing `end` is included
+    end_edge = int(_floor(_epoch(end) if end else now_ts, bucket)) + size
+    start_edge = (
+        int(_floor(_epoch(start), bucket)) if start else end_edge - settings.INCOME_SERIES_DEFAULT_SPAN[bucket] * size
+    )
+    if start_edge >= end_edge:
+        raise ValueError("'from' must be before 'to'")
+    n = (end_edge - start_edge) // size
+    if n > settings.INCOME_SERIES_MAX_BUCKETS:
+        raise ValueError(f"{n} {bucket} buckets requested, max is {settings.INCOME_SERIES_MAX_BUCKETS}")
+
+    rates = get_currency_rates(session)
+    if target not in rates:
+        raise ValueError(f"no rate for currency {target}")
+
+    start_dt = _EPOCH + dt.timedelta(seconds=start_edge)
+    end_dt = _EPOCH + dt.timedelta(seconds=end_edge)
+    if bucket == "hour":
+        model, col, lo, hi = IncomeRollupHourly, IncomeRollupHourly.hour, start_dt, end_dt
+    else:
+        model, col, lo, hi = IncomeRollup, IncomeRollup.day, start_dt.date(), end_dt.date()
+
+    # One row per stored bucket: platforms summed and currencies converted in
+    # SQL. Buckets come back as raw text (parsed by numpy, not row by row) and
+    # the query goes through Core, skipping ORM result processing.
+    factors = {c: r / rates[target] for c, r in rates.items()}
+    converted = func.sum(model.total * case(factors, value=model.currency, else_=0.0))
+    missing = func.sum(case((model.currency.in_(list(factors)), 0.0), else_=model.total))
+    stmt = (
+        select(type_coerce(col, String), converted, func.sum(model.count), missing)
+        .where(col >= lo, col < hi)
+        .group_by(col)
+    )
+    if platform:
+        stmt = stmt.where(model.platform == platform)
+    rows = session.connection().execute(stmt).all()
+
+    amount = np.zeros(n)
+    count = np.zeros(n, dtype=np.int64)
+    unconverted: Dict[str, float] = {}
+
+    if rows:
+        stamps, totals, counts, skipped = zip(*rows)
+        ts = np.array(stamps, dtype="datetime64[s]").astype(np.int64)
+        idx = ((_floor(ts, bucket) - start_edge) // size).astype(np.intp)
+        amount = np.bincount(idx, weights=np.asarray(totals, dtype=np.float64), minlength=n)[:n]
+        count = np.bincount(idx, weights=np.asarray(counts, dtype=np.float64), minlength=n)[:n].astype(np.int64)
+
+        if any(skipped):
+            # currencies without a rate are left out of `amount`; say which
+            leftover = (
+                select(model.currency, func.sum(model.total))
+                .where(col >= lo, col < hi, model.currency.notin_(list(factors)))
+                .group_by(model.currency)
+            )
+            if platform:
+                leftover = leftover.where(model.platform == platform)
+            unconverted = {c: float(t) for c, t in session.connection().execute(leftover)}
+
+    # trailing moving average (shorter window at the start of the series)
+    csum = np.concatenate(([0.0], np.cumsum(amount)))
+    i = np.arange(n)
+    lo_i = np.maximum(0, i + 1 - window)
+    moving_average = (csum[i + 1] - csum[lo_i]) / (i + 1 - lo_i)
+
+    # run rate / projection from complete buckets only
+    complete = n - 1 if end_edge > now_ts else n
+    tail = amount[max(0, complete - window):complete]
+    per_bucket = float(tail.mean()) if len(tail) else 0.0
+    if len(tail) >= 2:
+        slope, intercept = np.polyfit(np.arange(len(tail)), tail, 1)
+    else:
+        slope, intercept = 0.0, per_bucket
+    projected = np.maximum(0.0, intercept + slope * (len(tail) + np.arange(horizon)))
+
+    starts = start_edge + np.arange(n, dtype=np.int64) * size
+    projected_starts = start_edge + (complete + np.arange(horizon, dtype=np.int64)) * size
+
+    return {
+        "bucket": bucket,
+        "from": _iso(np.array([start_edge]))[0],
+        "to": _iso(np.array([end_edge]))[0],
+        "platform": platform,
+        "currency": target,
+        "buckets": _iso(starts),
+        "amount": np.round(amount, 4).tolist(),
+        "count": count.tolist(),
+        "moving_average": np.round(moving_average, 4).tolist(),
+        "window": window,
+        "total": round(float(amount.sum()), 4),
+        "run_rate": {
+            "per_bucket": round(per_bucket, 4),
+            "per_day": round(per_bucket * 86400 / size, 4),
+            "per_30_days": round(per_bucket * 30 * 86400 / size, 4),
+            "trend_per_bucket": round(float(slope), 4),
+        },
+        "projection": {
+            "buckets": _iso(projected_starts),
+            "amount": np.round(projected, 4).tolist(),
+        },
+        "unconverted": unconverted,
+    }
@@ -1,23 +1,187 @@
-from typing import Dict, Any, List
+import collections
+import datetime as dt
+from typing import Dict, Any, Iterable, List, Optional
+
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from db.models import IncomeRecord, IncomeRollup, IncomeRollupHourly
+
+_UPSERT_CHUNK = 1000  # rollup keys per INSERT .. ON CONFLICT statement
+
+
+# ---------------------------------------------------------
+# WRITES: records + rollups in one transaction
+# ---------------------------------------------------------
+
+def _hour(ts: dt.datetime) -> dt.datetime:
+    return ts.replace(minute=0, second=0, microsecond=0)
+
+
+def _upsert(session: Session, model, bucket: str, rows: List[Dict[str, Any]]) -> None:
+    # multi-row VALUES; chunked to stay under SQLite's bound-parameter limit
+    table = model.__table__
+    for start in range(0, len(rows), _UPSERT_CHUNK):
+        stmt = sqlite_insert(model).values(rows[start : start + _UPSERT_CHUNK])
+        update = {
+            "total": table.c.total + stmt.excluded.total,
+            "count": table.c.count + stmt.excluded.count,
+        }
+        if "first_at" in table.c:
+            update["first_at"] = func.min(func.coalesce(table.c.first_at, stmt.excluded.first_at), stmt.excluded.first_at)
+            update["last_at"] = func.max(func.coalesce(table.c.last_at, stmt.excluded.last_at), stmt.excluded.last_at)
+        session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[table.c.platform, table.c.currency, table.c[bucket]],
+                set_=update,
+            )
+        )
+
+
+def _bump_rollups(session: Session, records: Iterable[IncomeRecord]) -> None:
+    """
+    Add records to their daily and hourly rollup rows, one upsert per key.
+    """
+    days: Dict[tuple, Dict[str, Any]] = {}
+    hours: Dict[tuple, Dict[str, Any]] = {}
+    for r in records:
+        amount = float(r.amount)
+
+        key = (r.platform, r.currency, r.received_at.date())
+        row = days.get(key)
+        if row is None:
+            days[key] = {
+                "platform": r.platform,
+                "currency": r.currency,
+                "day": key[2],
+                "total": amount,
+                "count": 1,
+                "first_at": r.received_at,
+                "last_at": r.received_at,
+            }
+        else:
+            row["total"] += amount
+            row["count"] += 1
+            row["first_at"] = min(row["first_at"], r.received_at)
+            row["last_at"] = max(row["last_at"], r.received_at)
+
+        key = (r.platform, r.currency, _hour(r.received_at))
+        row = hours.get(key)
+        if row is None:
+            hours[key] = {"platform": r.platform, "currency": r.currency, "hour": key[2], "total": amount, "count": 1}
+        else:
+            row["total"] += amount
+            row["count"] += 1
+
+    if days:
+        _upsert(session, IncomeRollup, "day", list(days.values()))
+        _upsert(session, IncomeRollupHourly, "hour", list(hours.values()))
+
+
+def record_income(
+    session: Session,
+    platform: str,
+    amount: float,
+    currency: str = "USD",
+    received_at: Optional[dt.datetime] = None,
+    **fields: Any,
+) -> IncomeRecord:
+    """
+    Add an IncomeRecord and its rollup increment to the session's current
+    transaction; the caller commits (both land, or neither does).
+    Extra keyword arguments (reference, task_id, notes, ...) go on the record.
+    """
+    record = IncomeRecord(
+        platform=platform,
+        amount=amount,
+        currency=currency,
+        received_at=received_at or dt.datetime.utcnow(),
+        **fields,
+    )
+    session.add(record)
+    _bump_rollups(session, [record])
+    return record
+
+
+def record_income_batch(session: Session, records: List[IncomeRecord]) -> List[IncomeRecord]:
+    """
+    Bulk form of record_income() for already-built IncomeRecord objects.
+    """
+    for r in records:
+        if r.received_at is None:
+            r.received_at = dt.datetime.utcnow()
+        if r.currency is None:
+            r.currency = "USD"
+    session.add_all(records)
+    _bump_rollups(session, records)
+    return records
 
-from db.models import IncomeRecord
 
+def rebuild_income_rollups(session: Session) -> int:
+    """
+    Recompute every rollup row (daily and hourly) from income_records
+    (after bulk imports, manual edits, or to repair drift). Returns the
+    number of daily rollup rows. The caller commits.
+    """
+    day = func.date(IncomeRecord.received_at)
+    # same text format SQLAlchemy stores DateTime values in, so the unique
+    # key matches rows later written by record_income()
+    hour = func.strftime("%Y-%m-%d %H:00:00.000000", IncomeRecord.received_at)
+
+    session.execute(delete(IncomeRollupHourly))
+    session.execute(
+        insert(IncomeRollupHourly).from_select(
+            ["platform", "currency", "hour", "total", "count"],
+            select(
+                IncomeRecord.platform,
+                IncomeRecord.currency,
+                hour,
+                func.sum(IncomeRecord.amount),
+                func.count(IncomeRecord.id),
+            )
+            .where(IncomeRecord.received_at.isnot(None))
+            .group_by(IncomeRecord.platform, IncomeRecord.currency, hour),
+        )
+    )
+
+    session.execute(delete(IncomeRollup))
+    session.execute(
+        insert(IncomeRollup).from_select(
+            ["platform", "currency", "day", "total", "count", "first_at", "last_at"],
+            select(
+                IncomeRecord.platform,
+                IncomeRecord.currency,
+                day,
+                func.sum(IncomeRecord.amount),
+                func.count(IncomeRecord.id),
+                func.min(IncomeRecord.received_at),
+                func.max(IncomeRecord.received_at),
+            )
+            .where(IncomeRecord.received_at.isnot(None))
+            .group_by(IncomeRecord.platform, IncomeRecord.currency, day),
+        )
+    )
+    return session.query(func.count(IncomeRollup.id)).scalar() or 0
+
+
+# ---------------------------------------------------------
+# READS: served from the rollups
+# ---------------------------------------------------------
 
 def get_total_income(session: Session) -> Dict[str, Any]:
-    total = session.query(func.coalesce(func.sum(IncomeRecord.amount), 0.0)).scalar()
+    total = session.query(func.coalesce(func.sum(IncomeRollup.total), 0.0)).scalar()
     return {"total_income": float(total or 0.0)}
 
 
 def get_income_by_platform(session: Session) -> List[Dict[str, Any]]:
     rows = (
         session.query(
-            IncomeRecord.platform,
-            func.coalesce(func.sum(IncomeRecord.amount), 0.0).label("total"),
-            func.count(IncomeRecord.id).label("count"),
+            IncomeRollup.platform,
+            func.coalesce(func.sum(IncomeRollup.total), 0.0).label("total"),
+            func.coalesce(func.sum(IncomeRollup.count), 0).label("count"),
         )
-        .group_by(IncomeRecord.platform)
+        .group_by(IncomeRollup.platform)
         .all()
     )
 
@@ -31,6 +195,42 @@ def get_income_by_platform(session: Session) -> List[Dict[str, Any]]:
     ]
 
 
+def get_income_since(session: Session, since: dt.datetime) -> Dict[str, Any]:
+    """
+    Total / count of income received at or after `since`, per currency too.
+
+    Whole days after `since` come from the rollups; only the partial first
+    day is summed from income_records (via the received_at index).
+    """
+    first_day = since.date()
+    next_midnight = dt.datetime.combine(first_day + dt.timedelta(days=1), dt.time())
+
+    by_currency: Dict[str, float] = collections.defaultdict(float)
+    count = 0
+
+    partial = (
+        session.query(IncomeRecord.currency, func.sum(IncomeRecord.amount), func.count(IncomeRecord.id))
+        .filter(IncomeRecord.received_at >= since, IncomeRecord.received_at < next_midnight)
+        .group_by(IncomeRecord.currency)
+        .all()
+    )
+    full_days = (
+        session.query(IncomeRollup.currency, func.sum(IncomeRollup.total), func.sum(IncomeRollup.count))
+        .filter(IncomeRollup.day > first_day)
+        .group_by(IncomeRollup.currency)
+        .all()
+    )
+    for currency, total, n in list(partial) + list(full_days):
+        by_currency[currency] += float(total or 0.0)
+        count += int(n or 0)
+
+    return {
+        "total": sum(by_currency.values()),
+        "count": count,
+        "by_currency": dict(by_currency),
+    }
+
+
 def get_recent_income(session: Session, limit: int = 20) -> List[Dict[str, Any]]:
     rows = (
         session.query(IncomeRecord)
@@ -48,4 +248,4 @@ def get_recent_income(session: Session, limit: int = 20) -> List[Dict[str, Any]]
             "received_at": r.received_at.isoformat() if r.received_at else None,
         }
         for r in rows
-    ]
\ No newline at end of file
+    ]
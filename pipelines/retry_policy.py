@@ -0,0 +1,37 @@
+import datetime as dt
+import random
+from typing import Any, Dict, Optional
+
+from core.settings import settings
+
+
+def policy_for(category: Optional[str]) -> Dict[str, Any]:
+    """
+    Retry policy for a task category (TASK_RETRY_POLICIES, falling back to "default").
+    """
+    policies = settings.TASK_RETRY_POLICIES
+    policy = dict(policies["default"])
+    policy.update(policies.get(category) or {})
+    return policy
+
+
+def retry_delay(category: Optional[str], attempts: int) -> float:
+    """
+    Seconds to wait before retry number `attempts` (1-based): capped
+    exponential backoff with "equal jitter", i.e. a random delay between
+    half and all of base_delay * 2^(attempts-1), so failures from one batch
+    do not all come back at the same instant.
+    """
+    policy = policy_for(category)
+    ceiling = min(policy["max_delay"], policy["base_delay"] * (2 ** max(0, attempts - 1)))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def next_attempt_at(category: Optional[str], attempts: int, now: dt.datetime) -> Optional[dt.datetime]:
+    """
+    When a task that has now failed `attempts` times may run again,
+    or None once the category's max_attempts is used up (dead letter).
+    """
+    if attempts >= policy_for(category)["max_attempts"]:
+        return None
+    return now + dt.timedelta(seconds=retry_delay(category, attempts))
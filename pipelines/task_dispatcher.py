@@ -0,0 +1,370 @@
+import datetime as dt
+import heapq
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, or_, select
+from sqlalchemy.engine import Engine
+
+from db.engine import init_engine
+from db.models import Task
+from events.event_bus import EventBus, Subscription
+from events.event_definitions import EventType
+from pipelines.task_routing import accepts, category_clause
+from core.logger import logger
+from core.settings import settings
+
+# (aged priority, -importance, task id); compared as a tuple
+HeapEntry = Tuple[float, int, int]
+
+_ENQUEUE_TYPES = (EventType.TASK_CREATED, EventType.TASK_REQUEUED)
+_DEQUEUE_TYPES = (
+    EventType.TASK_ASSIGNED,
+    EventType.TASK_STARTED,
+    EventType.TASK_COMPLETED,
+    EventType.TASK_FAILED,
+)
+
+
+def _enqueued_at(created_at: Optional[dt.datetime]) -> float:
+    # aging always counts from the task's created_at (naive UTC), whether the
+    # entry comes from a rebuild, an event lookup or a requeue
+    if created_at is None:
+        return time.time()
+    return created_at.replace(tzinfo=dt.timezone.utc).timestamp()
+
+
+def _event_task_ids(event: Dict[str, Any]) -> List[int]:
+    # per-task events carry task_id, batch events payload["task_ids"]
+    if event.get("task_id") is not None:
+        return [event["task_id"]]
+    return list((event.get("payload") or {}).get("task_ids") or [])
+
+
+class TaskDispatcher:
+    """
+    In-memory priority queue of pending task ids, so workers get their next
+    batch without an ORDER BY over the tasks table on every poll.
+
+    - one binary heap per category; take() merges the heads of the
+      categories the calling worker has capabilities for
+    - aging: a task's effective priority drops by `aging_rate` points per
+      second waited. The heap key is priority + aging_rate * enqueued_at,
+      which orders exactly like (priority - aging_rate * waited) but never
+      changes, so the heaps stay valid without re-keying.
+    - rebuilt from the pending rows (idx_task_status_priority) on start and
+      every `resync_interval` seconds, the periodic rebuild on a background
+      thread so take() never waits for the scan; kept current in between
+      from TASK_* events on the EventBus, or, in a process whose bus never
+      sees them (a standalone worker), from load_new()
+    - aging counts from created_at for every entry, however it got queued
+    - `capabilities` scopes the queue to the categories a worker can run
+      (a worker's own dispatcher); None keeps every category
+    - removal is lazy: stale heap entries are skipped when popped
+
+    take() only hands out candidate ids; claim_tasks(task_ids=...) still
+    re-checks status='pending', so a stale entry can never be double-run.
+    """
+
+    def __init__(
+        self,
+        aging_rate: Optional[float] = None,
+        resync_interval: Optional[float] = None,
+        engine: Optional[Engine] = None,
+        capabilities: Optional[Iterable[str]] = None,
+    ):
+        self.aging_rate = settings.TASK_DISPATCH_AGING_RATE if aging_rate is None else aging_rate
+        self.resync_interval = resync_interval or settings.TASK_DISPATCH_RESYNC_INTERVAL
+        self._engine = engine
+        self.capabilities = None if capabilities is None else set(capabilities)
+
+        self._lock = threading.Lock()
+        self._heaps: Dict[Optional[str], List[HeapEntry]] = {}
+        self._live: Dict[int, Tuple[Optional[str], HeapEntry]] = {}
+        self._unresolved: Set[int] = set()
+        self._max_id = 0  # highest task id queued so far, for load_new()
+        self._epoch = time.time()
+
+        # events seen while a rebuild query is in flight, replayed onto its result
+        self._rebuilding = False
+        self._pending_ops: List[Tuple[str, Any]] = []
+
+        self._subscription: Optional[Subscription] = None
+        self._bus: Optional[EventBus] = None
+        self._last_rebuild = 0.0
+        self._last_resync = 0.0  # last background rebuild started (ok or not)
+        self._resync_thread: Optional[threading.Thread] = None
+
+        self._taken = 0
+        self._rebuilds = 0
+
+    # -----------------------------------------------------
+    # keys / heap housekeeping
+    # -----------------------------------------------------
+
+    def _key(self, task_id: int, priority: Optional[int], importance: Optional[int], enqueued_at: float) -> HeapEntry:
+        aged = (priority if priority is not None else 50) + self.aging_rate * (enqueued_at - self._epoch)
+        return (aged, -(importance or 0), task_id)
+
+    def _push_locked(self, task_id: int, category: Optional[str], entry: HeapEntry) -> None:
+        self._live[task_id] = (category, entry)
+        self._max_id = max(self._max_id, task_id)
+        heapq.heappush(self._heaps.setdefault(category, []), entry)
+
+    def _discard_locked(self, task_ids: Iterable[int]) -> None:
+        for task_id in task_ids:
+            self._live.pop(task_id, None)
+            self._unresolved.discard(task_id)
+
+    def _head(self, category: Optional[str]) -> Optional[HeapEntry]:
+        heap = self._heaps[category]
+        while heap:
+            entry = heap[0]
+            live = self._live.get(entry[2])
+            if live is not None and live[1] is entry:
+                return entry
+            heapq.heappop(heap)  # stale: taken, discarded or re-pushed
+        return None
+
+    # -----------------------------------------------------
+    # public API
+    # -----------------------------------------------------
+
+    def push(
+        self,
+        task_id: int,
+        priority: Optional[int] = None,
+        importance: Optional[int] = None,
+        category: Optional[str] = None,
+        enqueued_at: Optional[float] = None,
+    ) -> None:
+        if self.capabilities is not None and not accepts(self.capabilities, category):
+            return
+        entry = self._key(task_id, priority, importance, enqueued_at or time.time())
+        with self._lock:
+            if self._rebuilding:
+                self._pending_ops.append(("push", (task_id, category, entry)))
+            self._push_locked(task_id, category, entry)
+
+    def discard(self, task_ids: Iterable[int]) -> None:
+        task_ids = list(task_ids)
+        with self._lock:
+            if self._rebuilding:
+                self._pending_ops.append(("discard", task_ids))
+            self._discard_locked(task_ids)
+
+    def requeue(self, tasks: Iterable[Task]) -> None:
+        """
+        Put released tasks back (e.g. a stopping worker's prefetched batch).
+        """
+        for t in tasks:
+            self.push(t.id, t.priority, t.importance, t.category, _enqueued_at(t.created_at))
+
+    def take(self, limit: int, capabilities: Optional[Iterable[str]] = None) -> List[int]:
+        """
+        Pop up to `limit` task ids in aged-priority order, only from
+        categories a worker with `capabilities` can run (all if None).
+        """
+        self._maybe_resync()
+        self._resolve()
+
+        taken: List[int] = []
+        with self._lock:
+            if capabilities is None:
+                categories = list(self._heaps)
+            else:
+                capabilities = set(capabilities)
+                categories = [c for c in self._heaps if accepts(capabilities, c)]
+
+            while len(taken) < limit:
+                best: Optional[HeapEntry] = None
+                best_category = None
+                for category in categories:
+                    head = self._head(category)
+                    if head is not None and (best is None or head < best):
+                        best, best_category = head, category
+                if best is None:
+                    break
+                heapq.heappop(self._heaps[best_category])
+                del self._live[best[2]]
+                taken.append(best[2])
+            if self._rebuilding and taken:
+                # the rebuild's snapshot may still list them as pending
+                self._pending_ops.append(("discard", taken))
+            self._taken += len(taken)
+        return taken
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    # -----------------------------------------------------
+    # DB sync
+    # -----------------------------------------------------
+
+    def _get_engine(self) -> Engine:
+        return self._engine or init_engine()
+
+    def rebuild(self) -> int:
+        """
+        Reload every pending task from the DB (status/priority index scan).
+        """
+        with self._lock:
+            self._rebuilding = True
+            self._pending_ops = []
+
+        try:
+            stmt = (
+                select(Task.id, Task.priority, Task.importance, Task.category, Task.created_at)
+                .where(
+                    Task.status == "pending",
+                    or_(Task.next_attempt_at.is_(None), Task.next_attempt_at <= dt.datetime.utcnow()),
+                )
+                .order_by(Task.priority.asc())
+            )
+            if self.capabilities is not None:
+                stmt = stmt.where(category_clause(self.capabilities))
+            with self._get_engine().connect() as conn:
+                rows = conn.execute(stmt).all()
+        except Exception:
+            with self._lock:
+                self._rebuilding = False
+                self._pending_ops = []
+            raise
+
+        heaps: Dict[Optional[str], List[HeapEntry]] = {}
+        live: Dict[int, Tuple[Optional[str], HeapEntry]] = {}
+        for r in rows:
+            entry = self._key(r.id, r.priority, r.importance, _enqueued_at(r.created_at))
+            live[r.id] = (r.category, entry)
+            heaps.setdefault(r.category, []).append(entry)
+        for heap in heaps.values():
+            heapq.heapify(heap)
+
+        with self._lock:
+            self._heaps, self._live = heaps, live
+            self._max_id = max([self._max_id, *live])
+            for op, arg in self._pending_ops:
+                if op == "push":
+                    self._push_locked(*arg)
+                else:
+                    self._discard_locked(arg)
+            self._rebuilding = False
+            self._pending_ops = []
+            self._unresolved.difference_update(live)
+            self._last_rebuild = time.monotonic()
+            self._rebuilds += 1
+            size = len(self._live)
+
+        logger.info(f"[Dispatcher] Rebuilt queue: {size} pending tasks.")
+        return size
+
+    def _maybe_resync(self) -> None:
+        age = time.monotonic() - max(self._last_rebuild, self._last_resync)
+        # an empty queue may just mean tasks arrived from another process
+        if age < self.resync_interval and (self._live or age < settings.TASK_DISPATCH_EMPTY_RESYNC):
+            return
+        with self._lock:
+            if self._resync_thread is not None and self._resync_thread.is_alive():
+                return
+            self._last_resync = time.monotonic()
+            self._resync_thread = threading.Thread(target=self._resync, name="DispatcherResync", daemon=True)
+            self._resync_thread.start()
+
+    def _resync(self) -> None:
+        try:
+            self.rebuild()
+        except Exception as e:
+            logger.error(f"[Dispatcher] Rebuild failed: {e}")
+
+    def _resolve(self) -> None:
+        """
+        Fetch priority/category for TASK_CREATED/TASK_REQUEUED events that did not carry them.
+        """
+        with self._lock:
+            if not self._unresolved:
+                return
+            ids, self._unresolved = list(self._unresolved), set()
+
+        stmt = select(Task.id, Task.priority, Task.importance, Task.category, Task.created_at).where(
+            Task.id.in_(ids), Task.status == "pending"
+        )
+        with self._get_engine().connect() as conn:
+            rows = conn.execute(stmt).all()
+        for r in rows:
+            self.push(r.id, r.priority, r.importance, r.category, _enqueued_at(r.created_at))
+
+    def load_new(self) -> int:
+        """
+        Queue pending tasks with an id above any seen so far (primary key
+        range scan). Lets a dispatcher in a process whose EventBus never sees
+        TASK_CREATED (a standalone worker) pick up new work between rebuilds;
+        re-queued old ids still arrive with the periodic rebuild.
+        """
+        with self._get_engine().connect() as conn:
+            # one read transaction: everything up to `top` is seen now, so
+            # tasks outside the capabilities are not rescanned next time
+            top = conn.execute(select(func.max(Task.id))).scalar() or 0
+            stmt = select(Task.id, Task.priority, Task.importance, Task.category, Task.created_at).where(
+                Task.id > self._max_id,
+                Task.id <= top,
+                Task.status == "pending",
+                or_(Task.next_attempt_at.is_(None), Task.next_attempt_at <= dt.datetime.utcnow()),
+            )
+            if self.capabilities is not None:
+                stmt = stmt.where(category_clause(self.capabilities))
+            rows = conn.execute(stmt).all()
+        with self._lock:
+            self._max_id = max(self._max_id, top)
+        for r in rows:
+            self.push(r.id, r.priority, r.importance, r.category, _enqueued_at(r.created_at))
+        return len(rows)
+
+    # -----------------------------------------------------
+    # EventBus integration
+    # -----------------------------------------------------
+
+    def handle_event(self, event: Dict[str, Any]) -> None:
+        task_ids = _event_task_ids(event)
+        if not task_ids:
+            return
+
+        if event["type"] in _DEQUEUE_TYPES:
+            self.discard(task_ids)
+            return
+
+        payload = event.get("payload") or {}
+        if event["type"] == EventType.TASK_CREATED and len(task_ids) == 1 and "priority" in payload:
+            # just inserted: created_at is "now", no lookup needed
+            self.push(task_ids[0], payload.get("priority"), payload.get("importance"), payload.get("category"))
+        else:
+            with self._lock:
+                self._unresolved.update(task_ids)
+
+    def attach_to_bus(self, bus: EventBus) -> None:
+        self._bus = bus
+        # inline: handlers only touch the heaps, and workers should see new ids immediately
+        self._subscription = bus.subscribe(
+            self.handle_event,
+            threaded=False,
+            types=_ENQUEUE_TYPES + _DEQUEUE_TYPES,
+        )
+
+    def close(self) -> None:
+        if self._bus is not None and self._subscription is not None:
+            self._bus.unsubscribe(self._subscription)
+            self._subscription = None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            by_category: Dict[Optional[str], int] = {}
+            for category, _ in self._live.values():
+                by_category[category] = by_category.get(category, 0) + 1
+            return {
+                "pending": len(self._live),
+                "by_category": {str(k): v for k, v in by_category.items()},
+                "unresolved": len(self._unresolved),
+                "taken": self._taken,
+                "rebuilds": self._rebuilds,
+                "heap_entries": sum(len(h) for h in self._heaps.values()),
+            }
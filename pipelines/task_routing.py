@@ -0,0 +1,50 @@
+from typing import Iterable, Optional
+
+from sqlalchemy import and_, not_, or_
+
+from db.models import Task
+from core.settings import settings
+
+PLATFORM_PREFIX = "platform:"  # "platform:toloka" -> only the toloka worker(s)
+
+
+def capability_for(category: Optional[str]) -> str:
+    """
+    Capability a worker needs to run a task of `category`.
+
+    - categories listed in TASK_CATEGORY_CAPABILITIES map to that capability
+    - "platform:<name>" categories need the "platform:<name>" capability
+    - anything else (including no category) goes to TASK_DEFAULT_CAPABILITY
+    """
+    if category in settings.TASK_CATEGORY_CAPABILITIES:
+        return settings.TASK_CATEGORY_CAPABILITIES[category]
+    if category and category.startswith(PLATFORM_PREFIX):
+        return category
+    return settings.TASK_DEFAULT_CAPABILITY
+
+
+def accepts(capabilities: Iterable[str], category: Optional[str]) -> bool:
+    return capability_for(category) in set(capabilities)
+
+
+def category_clause(capabilities: Iterable[str]):
+    """
+    SQL filter on Task.category matching exactly the tasks accepts() allows.
+    """
+    caps = set(capabilities)
+    mapped = [c for c, cap in settings.TASK_CATEGORY_CAPABILITIES.items() if cap in caps]
+    mapped += [c for c in caps if c.startswith(PLATFORM_PREFIX)]
+    clause = Task.category.in_(mapped)
+
+    if settings.TASK_DEFAULT_CAPABILITY in caps:
+        # catch-all: uncategorised tasks and categories nobody claims explicitly
+        clause = or_(
+            clause,
+            Task.category.is_(None),
+            and_(
+                Task.category.notin_(list(settings.TASK_CATEGORY_CAPABILITIES)),
+                not_(Task.category.startswith(PLATFORM_PREFIX)),
+            ),
+        )
+    return clause
+
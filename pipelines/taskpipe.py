@@ -1,4 +1,8 @@
-from typing import List, Dict, Any
+import collections
+import contextlib
+from typing import List, Dict, Any, Sequence
+
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
 
 from db.models import Task, Blueprint
@@ -8,6 +12,10 @@ from agents.workflow_planner import WorkflowPlannerAgent
 from agents.human_step_mapper import HumanStepMapperAgent
 from agents.autofill_agent import AutofillAgent
 from agents.optimization_agent import OptimizationAgent
+from workers.wakeup import notify_workers
+
+# blueprint statuses that get flipped to "active" once their tasks exist
+ACTIVATABLE_STATUSES = ("new", "approved")
 
 
 class TaskPipe:
@@ -24,7 +32,10 @@ class TaskPipe:
         self.autofill_agent = AutofillAgent(session, event_bus)
         self.optimizer = OptimizationAgent(session, event_bus)
 
-    def create_tasks_for_blueprint(self, blueprint: Blueprint) -> List[Task]:
+    def _plan(self, blueprint: Blueprint) -> List[Dict[str, Any]]:
+        """
+        Run the agent chain for one blueprint; returns Task column values.
+        """
         strategy = blueprint.strategy or {}
         blueprint_id = blueprint.id
 
@@ -40,46 +51,71 @@ class TaskPipe:
         # 4. Optimization pass (for future merging / tuning)
         optimized = self.optimizer.optimize(blueprint_id, enriched, strategy)
 
-        # 5. Persist to DB as Task rows
-        created_tasks: List[Task] = []
-
-        for t in optimized:
-            task = Task(
-                blueprint_id=blueprint_id,
-                name=t.get("name", "Unnamed task"),
-                short_description=t.get("short_description", ""),
-                category=t.get("category"),
-                importance=t.get("importance", 50),
-                priority=t.get("priority", 50),
-                status="pending",
-                payload={
+        return [
+            {
+                "blueprint_id": blueprint_id,
+                "name": t.get("name", "Unnamed task"),
+                "short_description": t.get("short_description", ""),
+                "category": t.get("category"),
+                "importance": t.get("importance", 50),
+                "priority": t.get("priority", 50),
+                "status": "pending",
+                "payload": {
                     "requires_human": t.get("requires_human", False),
                     "autofill": t.get("autofill"),
                 },
-            )
+            }
+            for t in optimized
+        ]
+
+    def create_tasks_for_blueprint(self, blueprint: Blueprint) -> List[Task]:
+        blueprint_id = blueprint.id
+
+        # 1-4. Agent chain
+        planned = self._plan(blueprint)
+
+        # 5. Persist to DB as Task rows
+        created_tasks: List[Task] = []
+
+        for values in planned:
+            task = Task(**values)
             self.session.add(task)
-            self.session.flush()  # get id
+            created_tasks.append(task)
 
-            self.event_bus.publish(
-                event_type=EventType.TASK_CREATED,
-                category=EventCategory.TASK,
-                message=f"Task #{task.id} created for blueprint #{blueprint_id}: {task.name}",
-                task_id=task.id,
-                blueprint_id=blueprint_id,
-                payload={
+        self.session.flush()  # get ids
+        announcements = [
+            (
+                task.id,
+                f"Task #{task.id} created for blueprint #{blueprint_id}: {task.name}",
+                {
                     "short_description": task.short_description,
                     "category": task.category,
                     "importance": task.importance,
                     "priority": task.priority,
                 },
             )
+            for task in created_tasks
+        ]
+        self.session.commit()
 
-            created_tasks.append(task)
+        # publish only once the rows are committed: the task dispatcher may
+        # hand these ids to a worker as soon as it sees the event
+        for task_id, message, payload in announcements:
+            self.event_bus.publish(
+                event_type=EventType.TASK_CREATED,
+                category=EventCategory.TASK,
+                message=message,
+                task_id=task_id,
+                blueprint_id=blueprint_id,
+                payload=payload,
+            )
 
-        self.session.commit()
+        # wake idle worker processes now that the tasks are visible
+        if created_tasks:
+            notify_workers()
 
         # Mark blueprint as active if not already
-        if blueprint.status in ("new", "approved"):
+        if blueprint.status in ACTIVATABLE_STATUSES:
             blueprint.status = "active"
             self.session.add(blueprint)
             self.session.commit()
@@ -91,4 +127,68 @@ class TaskPipe:
                 blueprint_id=blueprint.id,
             )
 
-        return created_tasks
\ No newline at end of file
+        return created_tasks
+
+    def create_tasks_for_blueprints(self, blueprints: Sequence[Blueprint]) -> List[int]:
+        """
+        Batch form of create_tasks_for_blueprint() for many blueprints:
+        - plans every blueprint first, with one summary decision per agent
+        - inserts all tasks in one INSERT .. RETURNING id
+        - activates the blueprints in one UPDATE, and commits once
+        - publishes one TASK_CREATED and one BLUEPRINT_ACTIVATED event
+          for the whole batch (payload lists the ids)
+
+        Returns the new task ids.
+        """
+        if not blueprints:
+            return []
+
+        agents = (self.workflow_planner, self.human_mapper, self.autofill_agent, self.optimizer)
+        with contextlib.ExitStack() as stack:
+            for agent in agents:
+                stack.enter_context(agent.batch_decisions())
+            rows = [values for bp in blueprints for values in self._plan(bp)]
+
+        task_ids: List[int] = []
+        if rows:
+            # batched multi-row INSERT .. RETURNING. Asking for the ids in
+            # row order would make SQLite fall back to one INSERT per row,
+            # and only the set of ids is needed here
+            task_ids = sorted(self.session.scalars(insert(Task).returning(Task.id), rows))
+
+        activated = list(self.session.scalars(
+            update(Blueprint)
+            .where(
+                Blueprint.id.in_([bp.id for bp in blueprints]),
+                Blueprint.status.in_(ACTIVATABLE_STATUSES),
+            )
+            .values(status="active")
+            .returning(Blueprint.id),
+            execution_options={"synchronize_session": False},
+        ))
+        self.session.commit()
+
+        # as above: announce only committed rows
+        if task_ids:
+            self.event_bus.publish(
+                event_type=EventType.TASK_CREATED,
+                category=EventCategory.TASK,
+                message=f"{len(task_ids)} tasks created for {len(blueprints)} blueprints.",
+                payload={
+                    "task_ids": task_ids,
+                    "count": len(task_ids),
+                    "categories": dict(collections.Counter(r["category"] for r in rows)),
+                    "blueprint_ids": sorted({r["blueprint_id"] for r in rows}),
+                },
+            )
+            notify_workers()
+
+        if activated:
+            self.event_bus.publish(
+                event_type=EventType.BLUEPRINT_ACTIVATED,
+                category=EventCategory.BLUEPRINT,
+                message=f"{len(activated)} blueprints activated with {len(task_ids)} tasks.",
+                payload={"blueprint_ids": activated, "count": len(activated), "tasks": len(task_ids)},
+            )
+
+        return task_ids
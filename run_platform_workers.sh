@@ -0,0 +1,3 @@
+#!/usr/bin/env bash
+cd "$(dirname "$0")"
+python launcher/start_platform_workers.py
\ No newline at end of file
@@ -1,4 +1,5 @@
 from typing import Optional
 from events.event_bus import EventBus
 
-event_bus: Optional[EventBus] = None
\ No newline at end of file
+event_bus: Optional[EventBus] = None
+dispatcher = None  # Optional[pipelines.task_dispatcher.TaskDispatcher], set by bootstrap
@@ -1,6 +1,5 @@
 from sqlalchemy.orm import Session
-from db.engine import init_engine
-from db.session import create_session
+from db.session import get_scoped_session, remove_scoped_session
 from db.models import Blueprint
 
 from scheduler import context
@@ -10,6 +9,8 @@ from events.event_definitions import EventType, EventCategory
 from agents.opportunity_classifier import OpportunityClassifierAgent
 from agents.roi_ranker import ROIRankerAgent
 from agents.strategy_builder import StrategyBuilderAgent
+from core.logger import logger
+from core.text import text_fingerprint
 import random
 
 
@@ -24,13 +25,16 @@ SAMPLE_OPPORTUNITIES = [
 
 def alpha_scan_job():
     """
-    Every scan produces ONE new blueprint from random sample.
+    Every scan produces at most ONE new blueprint from random sample.
     Later replaced with real scrapers / APIs.
+
+    Near-duplicates of an existing blueprint (same title fingerprint) are
+    skipped before any agent runs, so a repeat costs one indexed lookup
+    instead of classifier -> ranker -> strategy builder and their events.
     """
 
-    # Build local session
-    engine = init_engine()
-    session: Session = create_session(engine)
+    # Thread-local session from the shared pool
+    session: Session = get_scoped_session()
 
     try:
         event_bus: EventBus = context.event_bus
@@ -40,13 +44,19 @@ def alpha_scan_job():
 
         title = random.choice(SAMPLE_OPPORTUNITIES)
 
+        fingerprint = text_fingerprint(title)
+        duplicate = session.query(Blueprint.id).filter(Blueprint.fingerprint == fingerprint).first()
+        if duplicate is not None:
+            logger.info(f"[AlphaScan] '{title}' duplicates blueprint #{duplicate.id}; skipped.")
+            return
+
         # Agents
         classifier = OpportunityClassifierAgent(session, event_bus)
         ranker = ROIRankerAgent(session, event_bus)
         strategist = StrategyBuilderAgent(session, event_bus)
 
         scores = classifier.classify(title, source="alpha_scan")
-        ranked = ranker.rank([scores])
+        ranker.rank([scores])
         strategy = strategist.build_strategy(title, scores, source="alpha_scan")
 
         bp = Blueprint(
@@ -58,6 +68,7 @@ def alpha_scan_job():
             risk_score=scores["risk_score"],
             strategy=strategy,
             status="new",
+            fingerprint=fingerprint,
         )
         session.add(bp)
         session.commit()
@@ -70,4 +81,4 @@ def alpha_scan_job():
             payload=strategy,
         )
     finally:
-        session.close()
\ No newline at end of file
+        remove_scoped_session()
\ No newline at end of file
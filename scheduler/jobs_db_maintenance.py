@@ -0,0 +1,56 @@
+import datetime as dt
+import time
+
+from sqlalchemy import text
+
+from core.settings import settings
+from db.engine import init_engine
+from events.event_store import prune_events
+from events.payload_blobs import get_payload_blob_store
+
+from scheduler import context
+from events.event_bus import EventBus
+from events.event_definitions import EventType, EventCategory
+from core.logger import logger
+
+
+def db_maintenance_job():
+    """
+    Keeps the WAL file from growing without bound and lets SQLite refresh
+    query-planner statistics. Events older than EVENT_RETENTION_DAYS are
+    dropped first, together with the payload blobs only they referenced.
+    """
+    engine = init_engine()
+
+    events_pruned = blobs_pruned = 0
+    if settings.EVENT_RETENTION_DAYS:
+        days = settings.EVENT_RETENTION_DAYS
+        events_pruned = prune_events(engine, dt.datetime.utcnow() - dt.timedelta(days=days))
+        blobs_pruned = get_payload_blob_store().prune(time.time() - days * 86400)
+
+    with engine.connect() as conn:
+        busy, wal_pages, checkpointed = conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)")).one()
+        conn.execute(text("PRAGMA optimize"))
+        conn.commit()
+
+    logger.info(
+        f"[Scheduler] DB maintenance: pruned {events_pruned} events / {blobs_pruned} blobs, "
+        f"checkpoint busy={busy} wal_pages={wal_pages} checkpointed={checkpointed}"
+    )
+
+    event_bus: EventBus = context.event_bus
+    if event_bus is None:
+        return
+
+    event_bus.publish(
+        event_type=EventType.SCHEDULER_JOB_RUN,
+        category=EventCategory.SCHEDULER,
+        message="SQLite maintenance (retention + wal_checkpoint + optimize) done",
+        payload={
+            "events_pruned": events_pruned,
+            "blobs_pruned": blobs_pruned,
+            "busy": busy,
+            "wal_pages": wal_pages,
+            "checkpointed": checkpointed,
+        },
+    )
@@ -1,7 +1,6 @@
 from sqlalchemy.orm import Session
-from db.engine import init_engine
-from db.session import create_session
-from db.models import IncomeRecord
+from db.session import get_scoped_session, remove_scoped_session
+from pipelines.income_pipeline import record_income
 
 from scheduler import context
 from events.event_bus import EventBus
@@ -16,8 +15,7 @@ def income_scan_job():
     Later replaced with Toloka/Hive/Remotasks API queries.
     """
 
-    engine = init_engine()
-    session: Session = create_session(engine)
+    session: Session = get_scoped_session()
 
     try:
         event_bus: EventBus = context.event_bus
@@ -25,12 +23,7 @@ def income_scan_job():
             return
 
         amount = round(random.uniform(0.25, 2.5), 2)
-        rec = IncomeRecord(
-            platform="simulated",
-            amount=amount,
-            currency="USD",
-        )
-        session.add(rec)
+        record_income(session, platform="simulated", amount=amount, currency="USD")
         session.commit()
 
         event_bus.publish(
@@ -40,4 +33,4 @@ def income_scan_job():
             payload={"amount": amount},
         )
     finally:
-        session.close()
\ No newline at end of file
+        remove_scoped_session()
\ No newline at end of file
@@ -0,0 +1,36 @@
+from sqlalchemy.orm import Session
+from db.session import get_scoped_session, remove_scoped_session
+
+from scheduler import context
+from events.event_bus import EventBus
+from events.event_definitions import EventType, EventCategory
+from pipelines.execution_pipeline import reclaim_expired_tasks
+from core.logger import logger
+from workers.wakeup import notify_workers
+
+
+def lease_sweep_job():
+    """
+    Reclaim tasks whose lease expired or whose worker went offline.
+    """
+    session: Session = get_scoped_session()
+
+    try:
+        event_bus: EventBus = context.event_bus
+        result = reclaim_expired_tasks(session, event_bus)
+        if not any(result.values()):
+            return
+
+        logger.warning(f"[LeaseSweep] Reclaimed tasks: {result}")
+        if result["requeued"]:
+            notify_workers()
+
+        if event_bus is not None:
+            event_bus.publish(
+                event_type=EventType.SCHEDULER_JOB_RUN,
+                category=EventCategory.SCHEDULER,
+                message=f"Lease sweep reclaimed {result['requeued'] + result['failed']} tasks.",
+                payload=result,
+            )
+    finally:
+        remove_scoped_session()
@@ -1,40 +1,26 @@
 from sqlalchemy.orm import Session
-from db.engine import init_engine
-from db.session import create_session
-from db.models import Task
+from db.session import get_scoped_session, remove_scoped_session
 
 from scheduler import context
 from events.event_bus import EventBus
-from events.event_definitions import EventType, EventCategory
+from pipelines.execution_pipeline import requeue_due_retries
+from workers.wakeup import notify_workers
 
 
 def retry_failed_tasks_job():
-    engine = init_engine()
-    session: Session = create_session(engine)
+    """
+    Move failed tasks whose backoff has elapsed back to 'pending'
+    (see requeue_due_retries). Runs every TASK_RETRY_SWEEP_SECONDS, no
+    coarser than the shortest backoff.
+    """
+    session: Session = get_scoped_session()
 
     try:
         event_bus: EventBus = context.event_bus
         if event_bus is None:
             return
 
-        failed = (
-            session.query(Task)
-            .filter(Task.status == "failed")
-            .limit(10)
-            .all()
-        )
-
-        for t in failed:
-            t.status = "pending"
-            session.add(t)
-
-            event_bus.publish(
-                event_type=EventType.TASK_CREATED,
-                category=EventCategory.TASK,
-                message=f"Retrying failed task #{t.id}",
-                task_id=t.id,
-            )
-
-        session.commit()
+        if requeue_due_retries(session, event_bus):
+            notify_workers()
     finally:
-        session.close()
\ No newline at end of file
+        remove_scoped_session()
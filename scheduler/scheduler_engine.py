@@ -12,6 +12,8 @@ from scheduler.jobs_income_scan import income_scan_job
 from scheduler.jobs_health import health_check_job
 from scheduler.jobs_retry import retry_failed_tasks_job
 from scheduler.jobs_reconnect import reconnect_workers_job
+from scheduler.jobs_db_maintenance import db_maintenance_job
+from scheduler.jobs_lease_sweep import lease_sweep_job
 from scheduler import context
 
 
@@ -91,7 +93,7 @@ def start_scheduler_engine(event_bus: EventBus):
     scheduler.add_job(
         retry_failed_tasks_job,
         trigger="interval",
-        minutes=5,
+        seconds=settings.TASK_RETRY_SWEEP_SECONDS,
         id="retry_failed",
         replace_existing=True,
     )
@@ -104,6 +106,22 @@ def start_scheduler_engine(event_bus: EventBus):
         replace_existing=True,
     )
 
+    scheduler.add_job(
+        lease_sweep_job,
+        trigger="interval",
+        seconds=settings.TASK_LEASE_SWEEP_SECONDS,
+        id="lease_sweep",
+        replace_existing=True,
+    )
+
+    scheduler.add_job(
+        db_maintenance_job,
+        trigger="interval",
+        minutes=settings.SQLITE_MAINTENANCE_MINUTES,
+        id="db_maintenance",
+        replace_existing=True,
+    )
+
     scheduler.start()
 
     # Emit event
@@ -116,4 +134,16 @@ def start_scheduler_engine(event_bus: EventBus):
     logger.info("[Scheduler] Full scheduler engine started.")
     print("[Scheduler] Full scheduler engine started.")
 
-    return scheduler
\ No newline at end of file
+    return scheduler
+
+def stop_scheduler_engine(wait: bool = True) -> None:
+    """
+    Shut the scheduler down (waiting for running jobs by default).
+    """
+    global scheduler
+    if scheduler is None:
+        return
+
+    scheduler.shutdown(wait=wait)
+    scheduler = None
+    logger.info("[Scheduler] Scheduler engine stopped.")
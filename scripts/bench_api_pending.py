@@ -0,0 +1,71 @@
+"""
+Requests/sec benchmark for GET /tasks/pending.
+
+Usage (from project root):
+    PYTHONPATH=$(pwd) python scripts/bench_api_pending.py [--requests 2000] [--tasks 5000]
+
+Runs against a throwaway SQLite DB seeded with pending tasks, in-process via
+FastAPI's TestClient (needs `httpx`). Two modes are measured:
+- fresh:  every request disposes the engine registry first, which is what
+          calling init_engine() per request used to cost (new engine + pool)
+- cached: the process-wide engine/session pool
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from core.paths import ensure_sys_path
+ensure_sys_path()
+
+from core.settings import settings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--tasks", type=int, default=5000)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="nomad_bench_")
+    settings.DB_PATH = os.path.join(tmp, "bench.db")
+
+    from fastapi.testclient import TestClient
+
+    from api.server import app
+    from db.engine import init_engine, dispose_engines
+    from db.models import Base, Task
+    from db.session import create_session
+
+    engine = init_engine()
+    Base.metadata.create_all(engine)
+    session = create_session(engine)
+    session.add_all(
+        Task(name=f"bench task {i}", status="pending", priority=i % 100, importance=50)
+        for i in range(args.tasks)
+    )
+    session.commit()
+    session.close()
+
+    client = TestClient(app)
+
+    for mode in ("fresh", "cached"):
+        dispose_engines()
+        client.get("/tasks/pending")  # warm-up
+
+        t0 = time.perf_counter()
+        for _ in range(args.requests):
+            if mode == "fresh":
+                dispose_engines()
+            resp = client.get("/tasks/pending")
+            assert resp.status_code == 200
+        elapsed = time.perf_counter() - t0
+
+        print(f"{mode:<7} {args.requests / elapsed:>9.1f} req/s  ({elapsed / args.requests * 1000:.2f} ms/req)")
+
+    dispose_engines()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Agent decision event volume per processed blueprint: everything published
+in full (the old behaviour) vs the configured verbosity / sampling /
+payload budget.
+
+Usage (from project root):
+    PYTHONPATH=$(pwd) python scripts/bench_decision_events.py [--blueprints 500]
+
+Each run uses a throwaway SQLite DB with a synchronous EventStore attached
+to the bus, and processes blueprints one by one through TaskPipe (the
+batched pipeline already folds decisions into one summary per agent).
+Reports stored decision events and payload bytes per blueprint, and the
+size of the payload blob store.
+"""
+
+import argparse
+import os
+import tempfile
+
+from core.paths import ensure_sys_path
+ensure_sys_path()
+
+from core.settings import settings
+
+STRATEGY = {
+    "execution_flow": ["APIConnector", "NodeWorker", "ManualStepPrep", "PythonWorker"],
+    "recommended_priority": 40,
+}
+
+FULL = {
+    "AGENT_DECISION_VERBOSITY": {"default": "full"},
+    "AGENT_DECISION_SAMPLE_RATES": {"default": 1.0},
+    "AGENT_DECISION_PAYLOAD_BUDGET": 1 << 30,
+}
+
+
+def run(n: int, overrides: dict, tag: str) -> dict:
+    import events.payload_blobs as payload_blobs
+
+    tmp = tempfile.mkdtemp(prefix="nomad_decisions_")
+    settings.DB_PATH = os.path.join(tmp, f"{tag}.db")
+    settings.PAYLOAD_BLOB_PATH = os.path.join(tmp, f"{tag}_blobs.sqlite")
+    saved = {k: getattr(settings, k) for k in overrides}
+    for k, v in overrides.items():
+        setattr(settings, k, v)
+    payload_blobs._store = None
+
+    from sqlalchemy import func
+
+    from db.engine import init_engine, dispose_engines
+    from db.models import Base, Blueprint, EventLog
+    from db.session import create_session
+    from events.event_bus import EventBus
+    from events.event_store import EventStore
+    from pipelines.taskpipe import TaskPipe
+
+    try:
+        engine = init_engine()
+        Base.metadata.create_all(engine)
+        session = create_session(engine)
+        session.add_all(
+            Blueprint(title=f"Label data for LLM training, batch {i}", source="bench", status="new", strategy=STRATEGY)
+            for i in range(n)
+        )
+        session.commit()
+
+        bus = EventBus(buffer_size=1000)
+        store = EventStore(create_session(engine), write_behind=False)
+        store.attach_to_bus(bus)
+
+        tp = TaskPipe(session, bus)
+        for bp in session.query(Blueprint).order_by(Blueprint.id.asc()).all():
+            tp.create_tasks_for_blueprint(bp)
+
+        q = session.query(func.count(EventLog.id), func.coalesce(func.sum(func.length(EventLog.payload)), 0))
+        events, payload_bytes = q.filter(EventLog.type == "agent_decision").one()
+        blob_stats = payload_blobs.get_payload_blob_store().stats()
+
+        session.close()
+        store.close()
+        payload_blobs.get_payload_blob_store().close()  # checkpoints the WAL
+        dispose_engines()
+        blob_path = settings.PAYLOAD_BLOB_PATH
+        blob_bytes = os.path.getsize(blob_path) if os.path.exists(blob_path) else 0
+    finally:
+        for k, v in saved.items():
+            setattr(settings, k, v)
+
+    return {
+        "events": events,
+        "payload_bytes": payload_bytes,
+        "blob_bytes": blob_bytes,
+        "blob_writes": blob_stats["writes"],
+        "blob_dedup_hits": blob_stats["dedup_hits"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blueprints", type=int, default=500)
+    args = parser.parse_args()
+    n = args.blueprints
+
+    full = run(n, FULL, "full")
+    slim = run(n, {}, "configured")
+
+    print(f"{n} blueprints, decision events stored per blueprint:")
+    print(f"{'':>12}  {'events/bp':>10}  {'payload B/bp':>13}  {'blob writes':>11}  {'blob dedup':>10}")
+    for label, r in (("full", full), ("configured", slim)):
+        print(
+            f"{label:>12}  {r['events'] / n:>10.2f}  {r['payload_bytes'] / n:>13,.0f}  "
+            f"{r['blob_writes']:>11}  {r['blob_dedup_hits']:>10}"
+        )
+    print(
+        f"events -{100 * (1 - slim['events'] / full['events']):.0f}%, "
+        f"payload bytes -{100 * (1 - slim['payload_bytes'] / full['payload_bytes']):.0f}% "
+        f"(blob store file: {slim['blob_bytes'] / 1024:.0f} KiB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Microbenchmark for the in-memory EventBus.
+
+Usage (from project root):
+    PYTHONPATH=$(pwd) python scripts/bench_event_bus.py [--sizes 10000,100000,1000000]
+
+For each size N this publishes N events into a bus (default 1000-slot ring)
+and then measures:
+- publish throughput (events/sec)
+- get_events_since() for a client that is 100 events behind
+- get_recent(100)
+
+The old list-slicing buffer is benchmarked alongside for comparison.
+Finally it reports publisher p50/p99 latency with a subscriber that costs
+1ms per event, delivered inline vs on its own thread.
+"""
+
+import argparse
+import statistics
+import time
+from typing import Any, Dict, List
+
+from core.paths import ensure_sys_path
+ensure_sys_path()
+
+from events.event_bus import EventBus
+
+
+class ListBufferBus:
+    """
+    Previous EventBus storage strategy (list + slice trim + linear scan),
+    kept here only as a baseline.
+    """
+
+    def __init__(self, buffer_size: int = 1000):
+        self._events: List[Dict[str, Any]] = []
+        self._buffer_size = buffer_size
+        self._next_id = 1
+
+    def publish(self, event_type: str, **kwargs) -> Dict[str, Any]:
+        event = {"id": self._next_id, "type": event_type, **kwargs}
+        self._next_id += 1
+        self._events.append(event)
+        if len(self._events) > self._buffer_size:
+            self._events = self._events[-self._buffer_size :]
+        return event
+
+    def get_recent(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return list(self._events[-limit:])
+
+    def get_events_since(self, last_id: int) -> List[Dict[str, Any]]:
+        return [e for e in self._events if e["id"] > last_id]
+
+
+def bench(bus, n: int, queries: int = 10000) -> Dict[str, float]:
+    t0 = time.perf_counter()
+    for i in range(n):
+        bus.publish("bench_event", message="bench")
+    publish_s = time.perf_counter() - t0
+
+    last_id = n - 100
+    t0 = time.perf_counter()
+    for _ in range(queries):
+        bus.get_events_since(last_id)
+    since_s = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for _ in range(queries):
+        bus.get_recent(100)
+    recent_s = time.perf_counter() - t0
+
+    return {
+        "publish_per_sec": n / publish_s,
+        "since_us": since_s / queries * 1e6,
+        "recent_us": recent_s / queries * 1e6,
+    }
+
+
+def publish_latency(threaded: bool, n: int = 2000, cost_s: float = 0.001) -> Dict[str, float]:
+    bus = EventBus()
+    bus.subscribe(lambda e: time.sleep(cost_s), threaded=threaded, queue_size=n)
+
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        bus.publish("bench_event", message="bench")
+        samples.append(time.perf_counter() - t0)
+
+    bus.close()
+    cuts = statistics.quantiles(samples, n=100)
+    return {"p50_us": cuts[49] * 1e6, "p99_us": cuts[98] * 1e6}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--buffer", type=int, default=1000)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    print(f"{'impl':<8} {'events':>9} {'publish/s':>12} {'since(100) us':>14} {'recent(100) us':>15}")
+    for n in sizes:
+        for label, bus in (("ring", EventBus(args.buffer)), ("list", ListBufferBus(args.buffer))):
+            r = bench(bus, n)
+            print(
+                f"{label:<8} {n:>9} {r['publish_per_sec']:>12,.0f} "
+                f"{r['since_us']:>14.1f} {r['recent_us']:>15.1f}"
+            )
+
+    print()
+    print("publish latency with a 1ms subscriber")
+    for label, threaded in (("inline", False), ("threaded", True)):
+        r = publish_latency(threaded)
+        print(f"  {label:<9} p50={r['p50_us']:>9.1f}us  p99={r['p99_us']:>9.1f}us")
+
+
+if __name__ == "__main__":
+    main()
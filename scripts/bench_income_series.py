@@ -0,0 +1,113 @@
+"""
+/income/series latency over a year of simulated per-minute income.
+
+Usage (from project root):
+    PYTHONPATH=$(pwd) python scripts/bench_income_series.py [--days 365] [--platforms 4] [--repeat 20]
+
+Seeds a throwaway SQLite DB with one income record per minute per platform
+(mixed currencies), builds the rollups, then times get_income_series() for
+a full-range hour/day/week series, all platforms and one platform. Also
+times the same hourly series computed straight from income_records, which
+is what the endpoint would cost without the rollups.
+"""
+
+import argparse
+import datetime as dt
+import os
+import statistics
+import tempfile
+import time
+
+from core.paths import ensure_sys_path
+ensure_sys_path()
+
+import numpy as np
+
+from core.settings import settings
+
+CURRENCIES = ["USD", "EUR", "GBP"]
+
+
+def _seed(session, days: int, platforms: int) -> int:
+    from sqlalchemy import insert
+
+    from db.models import IncomeRecord
+    from pipelines.income_pipeline import rebuild_income_rollups
+
+    rng = np.random.default_rng(7)
+    start = dt.datetime.utcnow().replace(second=0, microsecond=0) - dt.timedelta(days=days)
+    minutes = days * 24 * 60
+    total = 0
+    for p in range(platforms):
+        currency = CURRENCIES[p % len(CURRENCIES)]
+        amounts = rng.gamma(2.0, 0.05, minutes) * (1 + np.arange(minutes) / minutes)  # slow upward trend
+        for lo in range(0, minutes, 50_000):
+            hi = min(minutes, lo + 50_000)
+            session.execute(insert(IncomeRecord), [
+                {"platform": f"platform_{p}", "amount": float(amounts[i]), "currency": currency,
+                 "received_at": start + dt.timedelta(minutes=i)}
+                for i in range(lo, hi)
+            ])
+        total += minutes
+    rebuild_income_rollups(session)
+    session.commit()
+    return total
+
+
+def _time(fn, repeat: int) -> float:
+    fn()  # warm caches
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--platforms", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    settings.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="nomad_series_"), "series.db")
+
+    from sqlalchemy import func
+
+    from db.engine import init_engine
+    from db.migrations.init_db import run_migrations
+    from db.models import IncomeRecord
+    from db.session import create_session
+    from pipelines.income_analytics import get_income_series
+
+    engine = init_engine()
+    run_migrations(engine)
+    session = create_session(engine)
+
+    t0 = time.perf_counter()
+    records = _seed(session, args.days, args.platforms)
+    print(f"seeded {records:,} income records in {time.perf_counter() - t0:.1f}s")
+
+    end = dt.datetime.utcnow()
+    start = end - dt.timedelta(days=args.days)
+
+    print(f"{'series':<28}  {'buckets':>8}  {'median ms':>10}")
+    for bucket in ("hour", "day", "week"):
+        for platform in (None, "platform_0"):
+            result = get_income_series(session, bucket, start, end, platform)
+            ms = _time(lambda: get_income_series(session, bucket, start, end, platform), args.repeat)
+            label = f"{bucket} / {platform or 'all platforms'}"
+            print(f"{label:<28}  {len(result['buckets']):>8,}  {ms:>10.1f}")
+
+    hour = func.strftime("%Y-%m-%d %H", IncomeRecord.received_at)
+    raw = lambda: session.query(hour, IncomeRecord.currency, func.sum(IncomeRecord.amount)).filter(
+        IncomeRecord.received_at >= start
+    ).group_by(hour, IncomeRecord.currency).all()
+    print(f"{'hour / raw income_records':<28}  {'':>8}  {_time(raw, max(1, args.repeat // 10)):>10.1f}")
+
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Latency of the polled dashboard routes with and without the response cache.
+
+Usage (from project root):
+    PYTHONPATH=$(pwd) python scripts/bench_response_cache.py [--requests 500] [--shared]
+
+Runs the API app in-process (httpx ASGI transport, no network) on a
+throwaway SQLite DB seeded with tasks, blueprints, events and income, and
+times --requests GETs per route: once with API_CACHE_ENABLED off, once
+with it on (first request a miss, the rest hits). Also times a bare
+ResponseCache.get() hit. --shared adds a shared SQLite tier and reports a
+second, cold process-local cache served from it.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+from core.paths import ensure_sys_path
+ensure_sys_path()
+
+from core.settings import settings
+
+ROUTES = [
+    "/system/status",
+    "/events/recent?limit=50",
+    "/tasks/pending?limit=50",
+    "/blueprints/list?limit=100",
+    "/income/total",
+    "/income/platforms",
+    "/income/series?bucket=day",
+]
+
+
+def _seed(tasks: int, events: int, income: int) -> None:
+    import datetime as dt
+    import random
+
+    from sqlalchemy import insert
+
+    from db.engine import init_engine
+    from db.migrations.init_db import run_migrations
+    from db.models import Blueprint, EventLog, IncomeRecord, Task
+    from db.session import create_session
+    from pipelines.income_pipeline import rebuild_income_rollups
+
+    engine = init_engine()
+    run_migrations(engine)
+    rng = random.Random(5)
+    now = dt.datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Task), [
+            {"name": f"task {i}", "status": "pending", "priority": rng.randint(1, 100), "importance": rng.randint(1, 100)}
+            for i in range(tasks)
+        ])
+        conn.execute(insert(Blueprint), [
+            {"title": f"blueprint {i}", "source": "bench", "status": "new"} for i in range(tasks // 10)
+        ])
+        conn.execute(insert(EventLog), [
+            {"type": "task_created", "category": "task", "payload": {"i": i}} for i in range(events)
+        ])
+        conn.execute(insert(IncomeRecord), [
+            {"platform": rng.choice(["toloka", "clickworker", "prolific"]), "amount": rng.random() * 5,
+             "currency": rng.choice(["USD", "EUR"]), "received_at": now - dt.timedelta(minutes=7 * i)}
+            for i in range(income)
+        ])
+    session = create_session(engine)
+    rebuild_income_rollups(session)
+    session.commit()
+    session.close()
+
+
+async def _time_routes(app, requests: int):
+    import httpx
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for route in ROUTES:
+            samples = []
+            for _ in range(requests):
+                t0 = time.perf_counter()
+                resp = await client.get(route)
+                samples.append((time.perf_counter() - t0) * 1e6)
+                if resp.status_code != 200:
+                    raise SystemExit(f"{route}: HTTP {resp.status_code}")
+            results[route] = statistics.median(samples[1:] or samples)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--shared", action="store_true", help="also use a shared SQLite tier")
+    parser.add_argument("--tasks", type=int, default=50_000)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--income", type=int, default=50_000)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="nomad_cache_")
+    settings.DB_PATH = os.path.join(tmp, "cache.db")
+    if args.shared:
+        settings.API_CACHE_PATH = os.path.join(tmp, "api_cache.sqlite")
+    _seed(args.tasks, args.events, args.income)
+
+    from api.cache import ResponseCache, cache_key, get_response_cache
+    from api.server import app
+
+    settings.API_CACHE_ENABLED = False
+    uncached = asyncio.run(_time_routes(app, max(2, args.requests // 10)))
+    settings.API_CACHE_ENABLED = True
+    cached = asyncio.run(_time_routes(app, args.requests))
+
+    print(f"{'route':<28}  {'uncached us':>12}  {'cached us':>10}  {'speedup':>8}")
+    for route in ROUTES:
+        print(f"{route:<28}  {uncached[route]:>12,.0f}  {cached[route]:>10,.0f}  {uncached[route] / cached[route]:>7.0f}x")
+
+    cache = get_response_cache()
+    key = "/income/total"
+    n = 100_000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        cache.get(key, "/income/")
+    print(f"\nResponseCache.get() hit: {(time.perf_counter() - t0) / n * 1e6:.2f} us")
+
+    if args.shared:
+        other = ResponseCache(db_path=settings.API_CACHE_PATH)  # a second worker with a cold memory tier
+        t0 = time.perf_counter()
+        found = 0
+        for route in ROUTES:
+            path, _, query = route.partition("?")
+            found += other.get(cache_key(path, query.encode())) is not None
+        print(f"cold worker via shared tier: {found}/{len(ROUTES)} hits, "
+              f"{(time.perf_counter() - t0) / len(ROUTES) * 1e6:.0f} us per lookup")
+        other.close()
+
+    stats = cache.stats()
+    print(f"hits={stats['hits']} misses={stats['misses']} hit_rate={stats['hit_rate']}")
+
+
+if __name__ == "__main__":
+    main()
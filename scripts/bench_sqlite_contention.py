@@ -0,0 +1,108 @@
+"""
+Write/read contention benchmark for the SQLite PRAGMA profile.
+
+Usage (from project root):
+    PYTHONPATH=$(pwd) python scripts/bench_sqlite_contention.py [--writers 1,2,4,8] [--seconds 3]
+
+For each writer count N it starts N writer processes (small insert + commit
+loop, like workers/scheduler/API writing events and task updates) and two
+reader processes, against a fresh DB file, first with SQLite defaults and
+then with settings.SQLITE_PRAGMAS. Reports commits/sec, reads/sec and how
+many operations failed with "database is locked".
+"""
+
+import argparse
+import multiprocessing as mp
+import os
+import tempfile
+import time
+
+from core.paths import ensure_sys_path
+ensure_sys_path()
+
+from core.settings import settings
+
+DEFAULT_PROFILE = {"journal_mode": "DELETE", "synchronous": "FULL", "busy_timeout": 0}
+
+
+def _worker(role: str, db_path: str, pragmas: dict, seconds: float, results) -> None:
+    from sqlalchemy import text
+
+    settings.SQLITE_PRAGMAS = pragmas
+    from db.engine import init_engine
+
+    engine = init_engine(db_path)
+    ok = locked = 0
+    deadline = time.time() + seconds
+
+    while time.time() < deadline:
+        try:
+            with engine.begin() as conn:
+                if role == "writer":
+                    conn.execute(
+                        text("INSERT INTO bench (worker, payload) VALUES (:w, :p)"),
+                        {"w": os.getpid(), "p": "x" * 200},
+                    )
+                else:
+                    conn.execute(text("SELECT count(*), max(id) FROM bench")).one()
+            ok += 1
+        except Exception as e:
+            if "locked" in str(e):
+                locked += 1
+            else:
+                raise
+
+    results.put((role, ok, locked))
+
+
+def run(writers: int, pragmas: dict, seconds: float) -> dict:
+    from sqlalchemy import create_engine, text
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="nomad_contention_"), "bench.db")
+    setup = create_engine(f"sqlite:///{db_path}")
+    with setup.begin() as conn:
+        conn.execute(text("CREATE TABLE bench (id INTEGER PRIMARY KEY, worker INTEGER, payload TEXT)"))
+    setup.dispose()
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(role, db_path, pragmas, seconds, results))
+        for role in ["writer"] * writers + ["reader"] * 2
+    ]
+    for p in procs:
+        p.start()
+
+    totals = {"writer": 0, "reader": 0, "locked": 0}
+    for _ in procs:
+        role, ok, locked = results.get()
+        totals[role] += ok
+        totals["locked"] += locked
+    for p in procs:
+        p.join()
+
+    return {
+        "writes_per_sec": totals["writer"] / seconds,
+        "reads_per_sec": totals["reader"] / seconds,
+        "locked": totals["locked"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", default="1,2,4,8")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    print(f"{'profile':<8} {'writers':>7} {'writes/s':>10} {'reads/s':>10} {'locked':>7}")
+    for n in (int(w) for w in args.writers.split(",")):
+        for label, pragmas in (("default", DEFAULT_PROFILE), ("tuned", settings.SQLITE_PRAGMAS)):
+            r = run(n, pragmas, args.seconds)
+            print(
+                f"{label:<8} {n:>7} {r['writes_per_sec']:>10.0f} "
+                f"{r['reads_per_sec']:>10.0f} {r['locked']:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
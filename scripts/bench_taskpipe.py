@@ -0,0 +1,119 @@
+"""
+Blueprints/sec for the batched blueprint -> task pipeline vs the
+per-blueprint TaskPipe loop.
+
+Usage (from project root):
+    PYTHONPATH=$(pwd) python scripts/bench_taskpipe.py [--sizes 10,1000,100000] [--chunk 500] [--legacy-max 1000]
+
+For each size a throwaway SQLite DB is seeded with that many 'new'
+blueprints (4 planned tasks each), then drained by:
+- batched:    process_new_blueprints() (chunked, one INSERT .. RETURNING
+              and one commit per chunk)
+- one-by-one: create_tasks_for_blueprint() per blueprint, as the pipeline
+              used to; only timed up to --legacy-max blueprints (it is slow)
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from core.paths import ensure_sys_path
+ensure_sys_path()
+
+from core.settings import settings
+
+STRATEGY = {
+    "execution_flow": ["APIConnector", "NodeWorker", "ManualStepPrep", "PythonWorker"],
+    "recommended_priority": 40,
+}
+
+
+def _seed(n: int, tag: str):
+    settings.DB_PATH = os.path.join(tempfile.mkdtemp(prefix="nomad_taskpipe_"), f"{tag}.db")
+
+    from sqlalchemy import insert
+
+    from db.engine import init_engine
+    from db.models import Base, Blueprint
+    from db.session import create_session
+
+    engine = init_engine()
+    Base.metadata.create_all(engine)
+    session = create_session(engine)
+    session.execute(
+        insert(Blueprint),
+        [{"title": f"Bench blueprint {i}", "source": "bench", "status": "new", "strategy": STRATEGY} for i in range(n)],
+    )
+    session.commit()
+    return session
+
+
+def _check(session, n: int) -> None:
+    from db.models import Blueprint, Task
+
+    tasks = session.query(Task).count()
+    active = session.query(Blueprint).filter(Blueprint.status == "active").count()
+    assert tasks == 4 * n and active == n, (n, tasks, active)
+
+
+def run_batched(n: int, chunk: int) -> float:
+    from db.engine import dispose_engines
+    from events.event_bus import EventBus
+    from pipelines.blueprint_pipeline import process_new_blueprints
+
+    session = _seed(n, f"batched_{n}")
+    bus = EventBus(buffer_size=1000)
+
+    t0 = time.perf_counter()
+    processed = process_new_blueprints(session, bus, chunk_size=chunk)
+    elapsed = time.perf_counter() - t0
+
+    assert processed == n, (processed, n)
+    _check(session, n)
+    session.close()
+    dispose_engines()
+    return elapsed
+
+
+def run_one_by_one(n: int) -> float:
+    from db.engine import dispose_engines
+    from db.models import Blueprint
+    from events.event_bus import EventBus
+    from pipelines.taskpipe import TaskPipe
+
+    session = _seed(n, f"single_{n}")
+    bus = EventBus(buffer_size=1000)
+
+    t0 = time.perf_counter()
+    tp = TaskPipe(session, bus)
+    for bp in session.query(Blueprint).order_by(Blueprint.id.asc()).all():
+        tp.create_tasks_for_blueprint(bp)
+    elapsed = time.perf_counter() - t0
+
+    _check(session, n)
+    session.close()
+    dispose_engines()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10,1000,100000")
+    parser.add_argument("--chunk", type=int, default=settings.TASKPIPE_CHUNK_SIZE)
+    parser.add_argument("--legacy-max", type=int, default=1000)
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    print(f"{'blueprints':>10}  {'batched bp/s':>14}  {'one-by-one bp/s':>16}")
+    for n in sizes:
+        batched = run_batched(n, args.chunk)
+        single = run_one_by_one(n) if n <= args.legacy_max else None
+        print(
+            f"{n:>10}  {n / batched:>14,.0f}  "
+            + (f"{n / single:>16,.0f}  ({single / batched:.1f}x)" if single else f"{'-':>16}")
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Tasks/sec vs concurrency for the PythonWorker TaskExecutor.
+
+Usage (from project root):
+    PYTHONPATH=$(pwd) python scripts/bench_worker_concurrency.py [--tasks 200] [--io-ms 50] [--cpu-ms 5]
+
+Synthetic workload per task: `io-ms` of sleeping (API call stand-in) plus
+`cpu-ms` of pure-Python busy work. Each mode (thread / process / async) is
+run at several max_in_flight levels, without category limits, so only the
+executor is measured (no DB).
+"""
+
+import argparse
+import asyncio
+import time
+
+from core.paths import ensure_sys_path
+ensure_sys_path()
+
+from workers.task_executor import TaskExecutor
+
+
+def _burn(seconds: float) -> None:
+    end = time.perf_counter() + seconds
+    x = 0
+    while time.perf_counter() < end:
+        x += 1
+
+
+def synthetic_task(task: dict) -> None:
+    time.sleep(task["io_s"])
+    _burn(task["cpu_s"])
+
+
+async def synthetic_task_async(task: dict) -> None:
+    await asyncio.sleep(task["io_s"])
+    _burn(task["cpu_s"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--io-ms", type=float, default=50)
+    parser.add_argument("--cpu-ms", type=float, default=5)
+    parser.add_argument("--levels", default="1,2,4,8,16,32")
+    args = parser.parse_args()
+
+    tasks = [
+        {"id": i, "category": "platform_exec", "io_s": args.io_ms / 1000, "cpu_s": args.cpu_ms / 1000}
+        for i in range(args.tasks)
+    ]
+
+    print(f"{args.tasks} tasks, {args.io_ms}ms I/O + {args.cpu_ms}ms CPU each")
+    print(f"{'mode':<8} {'in-flight':>9} {'tasks/s':>9}")
+    for mode in TaskExecutor.MODES:
+        for level in (int(n) for n in args.levels.split(",")):
+            executor = TaskExecutor(
+                mode=mode,
+                max_in_flight=level,
+                category_limits={},
+                run=synthetic_task,
+                run_async=synthetic_task_async,
+            )
+            t0 = time.perf_counter()
+            completed, failures = executor.run_batch(tasks)
+            elapsed = time.perf_counter() - t0
+            executor.shutdown()
+            assert len(completed) == len(tasks) and not failures
+            print(f"{mode:<8} {level:>9} {len(tasks) / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ from db.engine import init_engine
 from db.session import create_session
 from db.models import IncomeRecord, Task, Blueprint
 from events.event_store import EventStore
+from pipelines.income_pipeline import get_income_since
 
 
 def main(hours: int = 24) -> None:
@@ -25,17 +26,17 @@ def main(hours: int = 24) -> None:
 
     since = dt.datetime.utcnow() - dt.timedelta(hours=hours)
 
-    # Income summary
-    income_rows = (
+    # Income summary (daily rollups + the partial first day)
+    income = get_income_since(session, since)
+    total_income = income["total"]
+    income_count = income["count"]
+    latest = (
         session.query(IncomeRecord)
         .filter(IncomeRecord.received_at >= since)
         .order_by(IncomeRecord.received_at.desc())
-        .all()
+        .first()
     )
 
-    total_income = sum(r.amount for r in income_rows)
-    income_count = len(income_rows)
-
     # Task activity
     completed_tasks = (
         session.query(Task)
@@ -72,8 +73,10 @@ def main(hours: int = 24) -> None:
     print(">> Income")
     print(f"  Records: {income_count}")
     print(f"  Total:   {total_income:.2f} (raw sum of amount)")
-    if income_rows:
-        latest = income_rows[0]
+    if len(income["by_currency"]) > 1:
+        for currency, amount in sorted(income["by_currency"].items()):
+            print(f"    {currency}: {amount:.2f}")
+    if latest is not None:
         print(
             f"  Latest:  {latest.amount:.2f} {latest.currency} via {latest.platform} "
             f"at {latest.received_at.isoformat()}"
@@ -1,10 +1,10 @@
 # scripts/init_db.py
-import os
-from db.session import SessionLocal, engine
-from db.models import Base
+from core.paths import ensure_sys_path
+ensure_sys_path()
+
+from db.engine import init_engine
 from db.migrations.init_db import run_migrations
 
 if __name__ == "__main__":
-    Base.metadata.create_all(bind=engine)
-    run_migrations()
-    print("[DB] Initialized & migrated.")
\ No newline at end of file
+    run_migrations(init_engine())
+    print("[DB] Initialized & migrated.")
@@ -0,0 +1,193 @@
+"""
+Concurrent-request latency for the API's hot routes.
+
+Usage (from project root):
+    PYTHONPATH=$(pwd) python scripts/loadtest_api.py [--connections 10,100,1000] [--requests 5] [--streams 0]
+
+Starts uvicorn (one process, one event loop) on a throwaway SQLite DB seeded
+with tasks, events and income records, then for each connection count opens
+that many concurrent HTTP clients. Each client sends --requests requests,
+rotating through the routes below. Prints throughput and latency
+percentiles per level. --streams keeps that many /events/stream (SSE)
+connections open for the whole run, the load that used to pin threadpool
+threads.
+"""
+
+import argparse
+import asyncio
+import collections
+import multiprocessing as mp
+import os
+import socket
+import statistics
+import tempfile
+import time
+
+from core.paths import ensure_sys_path
+ensure_sys_path()
+
+from core.settings import settings
+
+ROUTES = [
+    "/tasks/pending?limit=50",
+    "/events/recent?limit=50",
+    "/income/total",
+    "/income/platforms",
+    "/system/status",
+    "/system/timeline?limit=20",
+]
+
+
+def _seed(db_path: str, tasks: int, events: int, income: int) -> None:
+    import datetime as dt
+    import random
+
+    from sqlalchemy import insert
+
+    from db.engine import init_engine, dispose_engines
+    from db.migrations.init_db import run_migrations
+    from db.models import EventLog, IncomeRecord, Task
+    from db.session import create_session
+    from pipelines.income_pipeline import rebuild_income_rollups
+
+    settings.DB_PATH = db_path
+    engine = init_engine()
+    run_migrations(engine)
+    rng = random.Random(3)
+    now = dt.datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(Task), [
+            {"name": f"load task {i}", "status": "pending", "priority": rng.randint(1, 100), "importance": rng.randint(1, 100)}
+            for i in range(tasks)
+        ])
+        conn.execute(insert(EventLog), [
+            {"type": "task_created", "category": "task", "payload": {"i": i}} for i in range(events)
+        ])
+        conn.execute(insert(IncomeRecord), [
+            {"platform": rng.choice(["toloka", "clickworker", "prolific"]), "amount": rng.random() * 5,
+             "currency": "USD", "received_at": now - dt.timedelta(minutes=i)}
+            for i in range(income)
+        ])
+    session = create_session(engine)
+    rebuild_income_rollups(session)
+    session.commit()
+    session.close()
+    dispose_engines()
+
+
+def _serve(db_path: str, port: int) -> None:
+    import uvicorn
+
+    settings.DB_PATH = db_path
+    from api.server import app
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(values, pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def _hold_stream(client, base: str, stop: asyncio.Event) -> None:
+    try:
+        async with client.stream("GET", f"{base}/events/stream") as resp:
+            async for _ in resp.aiter_raw():
+                if stop.is_set():
+                    return
+    except Exception:
+        pass
+
+
+async def _level(base: str, connections: int, per_conn: int, streams: int):
+    import httpx
+
+    limits = httpx.Limits(max_connections=connections + streams, max_keepalive_connections=connections + streams)
+    latencies = []
+    errors: "collections.Counter[str]" = collections.Counter()
+
+    async with httpx.AsyncClient(limits=limits, timeout=60.0) as client:
+        stop = asyncio.Event()
+        holders = [asyncio.create_task(_hold_stream(client, base, stop)) for _ in range(streams)]
+        await asyncio.sleep(0.2 if streams else 0)
+
+        async def one_client(n: int) -> None:
+            for i in range(per_conn):
+                route = ROUTES[(n + i) % len(ROUTES)]
+                t0 = time.perf_counter()
+                try:
+                    resp = await client.get(base + route)
+                    if resp.status_code != 200:
+                        errors[f"HTTP {resp.status_code}"] += 1
+                except httpx.HTTPError as e:
+                    errors[type(e).__name__] += 1
+                    continue
+                latencies.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        await asyncio.gather(*(one_client(n) for n in range(connections)))
+        elapsed = time.perf_counter() - t0
+
+        stop.set()
+        for h in holders:
+            h.cancel()
+        await asyncio.gather(*holders, return_exceptions=True)
+
+    return latencies, errors, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--connections", default="10,100,1000")
+    parser.add_argument("--requests", type=int, default=5, help="requests per connection")
+    parser.add_argument("--streams", type=int, default=0, help="SSE connections held open meanwhile")
+    parser.add_argument("--tasks", type=int, default=50_000)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--income", type=int, default=20_000)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="nomad_load_"), "load.db")
+    _seed(db_path, args.tasks, args.events, args.income)
+
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    server = mp.Process(target=_serve, args=(db_path, port), daemon=True)
+    server.start()
+
+    import httpx
+
+    deadline = time.time() + 30
+    while True:
+        try:
+            if httpx.get(f"{base}/system/health", timeout=1.0).status_code == 200:
+                break
+        except httpx.HTTPError:
+            pass
+        if time.time() > deadline:
+            raise SystemExit("API did not come up")
+        time.sleep(0.1)
+
+    try:
+        print(f"{'conns':>6}  {'reqs':>6}  {'req/s':>8}  {'p50 ms':>8}  {'p95 ms':>8}  {'p99 ms':>8}  {'max ms':>8}  {'errors':>6}")
+        for connections in [int(c) for c in args.connections.split(",") if c.strip()]:
+            latencies, errors, elapsed = asyncio.run(_level(base, connections, args.requests, args.streams))
+            ms = [v * 1000 for v in latencies] or [0.0]
+            print(
+                f"{connections:>6}  {len(latencies):>6}  {len(latencies) / elapsed:>8,.0f}  "
+                f"{statistics.median(ms):>8.1f}  {_percentile(ms, 0.95):>8.1f}  "
+                f"{_percentile(ms, 0.99):>8.1f}  {max(ms):>8.1f}  {sum(errors.values()):>6}"
+                + (f"  {dict(errors)}" if errors else "")
+            )
+    finally:
+        server.terminate()
+        server.join(5)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Recompute income_rollups / income_rollups_hourly from income_records.
+
+Usage (from project root):
+    PYTHONPATH=$(pwd) python scripts/rebuild_income_rollups.py [--check]
+
+Run after bulk-importing income rows without record_income(), or editing
+records by hand. --check only reports whether the rollups match the
+records (per platform/currency) and exits non-zero if they do not.
+"""
+
+import argparse
+import sys
+
+from core.paths import ensure_sys_path
+ensure_sys_path()
+
+from sqlalchemy import func
+
+from db.engine import init_engine
+from db.migrations.init_db import run_migrations
+from db.models import IncomeRecord, IncomeRollup, IncomeRollupHourly
+from db.session import create_session
+from pipelines.income_pipeline import rebuild_income_rollups
+
+
+def _drift(session) -> dict:
+    records = {
+        (p, c): (round(t or 0.0, 6), n)
+        for p, c, t, n in session.query(
+            IncomeRecord.platform, IncomeRecord.currency, func.sum(IncomeRecord.amount), func.count(IncomeRecord.id)
+        ).group_by(IncomeRecord.platform, IncomeRecord.currency)
+    }
+    drift = {}
+    for model in (IncomeRollup, IncomeRollupHourly):
+        rollups = {
+            (model.__tablename__, p, c): (round(t or 0.0, 6), int(n or 0))
+            for p, c, t, n in session.query(
+                model.platform, model.currency, func.sum(model.total), func.sum(model.count)
+            ).group_by(model.platform, model.currency)
+        }
+        expected = {(model.__tablename__, p, c): v for (p, c), v in records.items()}
+        drift.update({
+            k: (expected.get(k), rollups.get(k))
+            for k in set(expected) | set(rollups)
+            if expected.get(k) != rollups.get(k)
+        })
+    return drift
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--check", action="store_true", help="compare only, do not rebuild")
+    args = parser.parse_args()
+
+    engine = init_engine()
+    run_migrations(engine)
+    session = create_session(engine)
+    try:
+        if args.check:
+            drift = _drift(session)
+            for (table, platform, currency), (records, rollups) in sorted(drift.items(), key=str):
+                print(f"[Rollups] {table} {platform}/{currency}: records={records} rollups={rollups}")
+            print(f"[Rollups] {'OK' if not drift else f'{len(drift)} table/platform/currency entries differ'}")
+            return 1 if drift else 0
+
+        rows = rebuild_income_rollups(session)
+        session.commit()
+        print(f"[Rollups] Rebuilt {rows} rollup rows.")
+        return 0
+    finally:
+        session.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""
+Multi-process stress test for claim_tasks(): proves exactly-once claiming.
+
+Usage (from project root):
+    PYTHONPATH=$(pwd) python scripts/stress_claim_tasks.py [--tasks 5000] [--workers 8] [--batch 5]
+
+Seeds a throwaway DB with pending tasks, then starts N worker processes that
+call claim_tasks() in a loop until nothing is left. Exits non-zero if any
+task was claimed twice, never claimed, or ended up owned by a different
+worker than the one that claimed it.
+"""
+
+import argparse
+import collections
+import multiprocessing as mp
+import os
+import sys
+import tempfile
+import time
+
+from core.paths import ensure_sys_path
+ensure_sys_path()
+
+from core.settings import settings
+
+
+def _claimer(worker_id: int, db_path: str, batch: int, results) -> None:
+    settings.DB_PATH = db_path
+    from db.engine import init_engine
+    from db.session import create_session
+    from pipelines.execution_pipeline import claim_tasks
+
+    session = create_session(init_engine())
+    claimed = []
+    empty_rounds = 0
+    while empty_rounds < 3:
+        tasks = claim_tasks(session, worker_id, limit=batch)
+        if not tasks:
+            empty_rounds += 1
+            time.sleep(0.01)
+            continue
+        empty_rounds = 0
+        claimed.extend(t.id for t in tasks)
+    session.close()
+    results.put((worker_id, claimed))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--batch", type=int, default=5)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="nomad_claim_"), "claim.db")
+    settings.DB_PATH = db_path
+
+    from db.engine import init_engine, dispose_engines
+    from db.models import Base, Task, Worker
+    from db.session import create_session
+
+    engine = init_engine()
+    Base.metadata.create_all(engine)
+    session = create_session(engine)
+    session.add_all(Worker(name=f"stress_{i}", kind="python") for i in range(args.workers))
+    session.add_all(
+        Task(name=f"stress task {i}", status="pending", priority=i % 100, importance=i % 7)
+        for i in range(args.tasks)
+    )
+    session.commit()
+    worker_ids = [w.id for w in session.query(Worker).all()]
+    session.close()
+    dispose_engines()
+
+    ctx = mp.get_context("spawn")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_claimer, args=(wid, db_path, args.batch, results)) for wid in worker_ids]
+
+    t0 = time.perf_counter()
+    for p in procs:
+        p.start()
+    claims = dict(results.get() for _ in procs)
+    for p in procs:
+        p.join()
+    elapsed = time.perf_counter() - t0
+
+    counts = collections.Counter(tid for ids in claims.values() for tid in ids)
+    duplicates = [tid for tid, n in counts.items() if n > 1]
+    owner = {tid: wid for wid, ids in claims.items() for tid in ids}
+
+    session = create_session(init_engine())
+    rows = session.query(Task.id, Task.status, Task.assigned_worker_id, Task.started_at).all()
+    session.close()
+
+    unclaimed = [r.id for r in rows if r.status != "running"]
+    wrong_owner = [r.id for r in rows if owner.get(r.id) != r.assigned_worker_id]
+    unstamped = [r.id for r in rows if r.started_at is None]
+
+    print(f"tasks={args.tasks} workers={args.workers} batch={args.batch} in {elapsed:.2f}s "
+          f"({args.tasks / elapsed:,.0f} claims/s)")
+    print("per worker:", {wid: len(ids) for wid, ids in sorted(claims.items())})
+    print(f"duplicates={len(duplicates)} unclaimed={len(unclaimed)} "
+          f"wrong_owner={len(wrong_owner)} missing_started_at={len(unstamped)}")
+
+    ok = not (duplicates or unclaimed or wrong_owner or unstamped)
+    print("EXACTLY-ONCE: OK" if ok else "EXACTLY-ONCE: FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,7 @@
 import yt_dlp
 from db.engine import init_engine
 from db.session import create_session
-from db.models import IncomeRecord
+from pipelines.income_pipeline import record_income
 from events.event_bus import EventBus
 from common.timestamps import now_utc
 
@@ -21,14 +21,14 @@ def run(url):
 
     session = create_session(init_engine())
 
-    record = IncomeRecord(
+    record_income(
+        session,
         platform="youtube-automation",
         amount=1.0,
         currency="USD",
         received_at=now_utc(),
         notes=f"Test income for video: {url}",
     )
-    session.add(record)
     session.commit()
 
     EventBus().publish(
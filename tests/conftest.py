@@ -0,0 +1,67 @@
+import os
+import sys
+
+import pytest
+
+# make the project root importable when pytest is run from anywhere
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    """
+    Migrated SQLite DB in a temp dir (settings.DB_PATH points at it).
+    """
+    from core.settings import settings
+    from db.engine import init_engine
+    from db.migrations.init_db import run_migrations
+
+    import db.session
+
+    monkeypatch.setattr(settings, "DB_PATH", os.path.join(str(tmp_path), "nomad.db"))
+    monkeypatch.setattr(db.session, "_scoped", None)  # scheduler jobs bind to this DB too
+    engine = init_engine()
+    run_migrations(engine)
+    return engine
+
+
+@pytest.fixture
+def session(engine):
+    from db.session import create_session
+
+    session = create_session(engine)
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def api(engine, tmp_path, monkeypatch):
+    """
+    run(fn): `await fn(client)` against the API app in-process, on a fresh
+    event loop. The response cache is off unless a test turns it back on.
+    """
+    import asyncio
+
+    import httpx
+
+    from api.server import app
+    from core.settings import settings
+    from db.async_engine import dispose_async_engines
+
+    monkeypatch.setattr(settings, "API_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "WORKER_WAKEUP_DIR", os.path.join(str(tmp_path), "wakeup"))
+
+    def run(fn):
+        async def main():
+            transport = httpx.ASGITransport(app=app)
+            try:
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    return await fn(client)
+            finally:
+                await dispose_async_engines()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,22 @@
+from core.text import text_fingerprint
+from db.models import Blueprint
+from events.event_bus import EventBus
+from scheduler import context
+from scheduler import jobs_alpha_scan
+
+
+def test_fingerprint_ignores_order_case_stopwords_and_plurals():
+    assert text_fingerprint("Get paid to label AI datasets") == text_fingerprint("get paid for labels: AI dataset")
+    assert text_fingerprint("Get paid to label AI datasets") != text_fingerprint("Get paid to label audio")
+
+
+def test_alpha_scan_skips_near_duplicates(session, monkeypatch):
+    monkeypatch.setattr(context, "event_bus", EventBus())
+    monkeypatch.setattr(jobs_alpha_scan, "SAMPLE_OPPORTUNITIES", ["Moderate AI-generated images"])
+
+    for _ in range(3):
+        jobs_alpha_scan.alpha_scan_job()
+    monkeypatch.setattr(jobs_alpha_scan, "SAMPLE_OPPORTUNITIES", ["moderate AI generated image"])
+    jobs_alpha_scan.alpha_scan_job()
+
+    assert session.query(Blueprint).count() == 1
@@ -0,0 +1,45 @@
+from sqlalchemy import insert
+
+from db.models import EventLog, Task
+
+
+def test_pending_tasks_page_with_cursor_fields_and_etag(api, engine):
+    with engine.begin() as conn:
+        conn.execute(insert(Task), [
+            {"name": f"t{i}", "status": "pending" if i != 2 else "running", "priority": 10 - i, "importance": 1}
+            for i in range(5)
+        ])
+
+    async def calls(client):
+        first = await client.get("/tasks/pending", params={"limit": 2, "fields": "name"})
+        second = await client.get("/tasks/pending", params={"limit": 2, "cursor": first.headers["x-next-cursor"]})
+        again = await client.get(
+            "/tasks/pending", params={"limit": 2, "fields": "name"}, headers={"If-None-Match": first.headers["etag"]}
+        )
+        bad = await client.get("/tasks/pending", params={"fields": "nope"})
+        return first, second, again, bad
+
+    first, second, again, bad = api(calls)
+
+    assert first.json() == [{"id": 5, "name": "t4"}, {"id": 4, "name": "t3"}]
+    assert [r["id"] for r in second.json()] == [2, 1]
+    assert "x-next-cursor" not in second.headers
+    assert again.status_code == 304
+    assert bad.status_code == 400
+
+
+def test_added_task_is_listed_and_status_reads_events(api, engine):
+    with engine.begin() as conn:
+        conn.execute(insert(EventLog), [{"id": 7, "type": "task_created", "category": "task"}])
+
+    async def calls(client):
+        added = await client.post("/tasks/add", json={"name": "from api"})
+        pending = await client.get("/tasks/pending")
+        status = await client.get("/system/status")
+        return added.json(), pending.json(), status.json()
+
+    added, pending, status = api(calls)
+
+    assert added["status"] == "ok"
+    assert [(r["id"], r["name"]) for r in pending] == [(added["task_id"], "from api")]
+    assert status["events_last_id"] == 7
@@ -0,0 +1,58 @@
+import collections
+import multiprocessing as mp
+import time
+
+from sqlalchemy import insert
+
+from db.models import Task, Worker
+
+TASKS = 120
+PROCESSES = 4
+
+
+def _claimer(worker_id, results):
+    # forked: settings.DB_PATH already points at the test DB, engines are per pid
+    from db.engine import init_engine
+    from db.session import create_session
+    from pipelines.execution_pipeline import claim_tasks
+
+    session = create_session(init_engine())
+    claimed, empty_rounds = [], 0
+    while empty_rounds < 3:
+        tasks = claim_tasks(session, worker_id, limit=3)
+        if not tasks:
+            empty_rounds += 1
+            time.sleep(0.01)
+            continue
+        empty_rounds = 0
+        claimed.extend(t.id for t in tasks)
+    session.close()
+    results.put((worker_id, claimed))
+
+
+def test_processes_claim_every_task_exactly_once(engine, session):
+    with engine.begin() as conn:
+        conn.execute(insert(Worker), [{"name": f"w{i}", "kind": "python"} for i in range(PROCESSES)])
+        conn.execute(insert(Task), [
+            {"name": f"t{i}", "status": "pending", "priority": i % 10, "importance": 1} for i in range(TASKS)
+        ])
+    worker_ids = [w.id for w in session.query(Worker)]
+    session.rollback()
+
+    ctx = mp.get_context("fork")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=_claimer, args=(wid, results)) for wid in worker_ids]
+    for p in procs:
+        p.start()
+    claims = dict(results.get(timeout=60) for _ in procs)
+    for p in procs:
+        p.join(10)
+
+    counts = collections.Counter(tid for ids in claims.values() for tid in ids)
+    assert [tid for tid, n in counts.items() if n > 1] == []
+    assert len(counts) == TASKS
+
+    owner = {tid: wid for wid, ids in claims.items() for tid in ids}
+    rows = session.query(Task.id, Task.status, Task.assigned_worker_id).all()
+    assert {r.status for r in rows} == {"running"}
+    assert all(owner[r.id] == r.assigned_worker_id for r in rows)
@@ -0,0 +1,48 @@
+import os
+import threading
+
+from sqlalchemy import text
+
+from core.settings import settings
+
+
+def test_pooled_connections_share_the_cache_budget(engine):
+    with engine.connect() as conn:
+        cache_kib = -conn.execute(text("PRAGMA cache_size")).scalar()
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+
+    assert cache_kib == -settings.SQLITE_PRAGMAS["cache_size"]
+    full_pool = settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+    assert cache_kib * full_pool <= max(settings.SQLITE_CACHE_KIB_PER_POOL, 2000 * full_pool)
+
+
+def test_engine_and_sessionmaker_are_cached_per_database(engine, tmp_path):
+    from db.engine import init_engine
+    from db.session import get_sessionmaker
+
+    assert init_engine() is engine
+    assert init_engine(settings.DB_PATH) is engine
+    other = init_engine(os.path.join(str(tmp_path), "other.db"))
+    assert other is not engine
+    assert get_sessionmaker(engine) is get_sessionmaker(engine)
+    assert get_sessionmaker(other) is not get_sessionmaker(engine)
+
+
+def test_request_sessions_are_closed_and_scoped_sessions_are_per_thread(engine):
+    from db.session import get_scoped_session, get_session, remove_scoped_session
+
+    dependency = get_session()
+    session = next(dependency)
+    session.execute(text("SELECT 1"))
+    assert session.in_transaction()
+    dependency.close()  # FastAPI finalizes the generator after the response
+    assert not session.in_transaction()
+
+    main = get_scoped_session()
+    assert get_scoped_session() is main
+    other = []
+    thread = threading.Thread(target=lambda: (other.append(get_scoped_session()), remove_scoped_session()))
+    thread.start()
+    thread.join()
+    assert other[0] is not main and other[0].get_bind() is engine
+    remove_scoped_session()
@@ -0,0 +1,123 @@
+import threading
+import time
+
+from events.event_bus import EventBus
+
+
+def _publish(bus, n, **kwargs):
+    return [bus.publish(event_type="task_created", category="task", **kwargs)["id"] for _ in range(n)]
+
+
+def _ids(events):
+    return [e["id"] for e in events]
+
+
+def test_ring_keeps_the_newest_events_across_wraparound():
+    bus = EventBus(buffer_size=4)
+    _publish(bus, 10)
+
+    assert bus.oldest_id == 7
+    assert _ids(bus.get_recent(3)) == [8, 9, 10]
+    assert _ids(bus.get_recent(100)) == [7, 8, 9, 10]
+    assert _ids(bus.get_events_since(0)) == [7, 8, 9, 10]
+    assert _ids(bus.get_events_since(8)) == [9, 10]
+    assert bus.get_events_since(10) == []
+    assert bus.get_recent(0) == []
+
+
+def test_seed_ids_continues_the_stored_sequence():
+    bus = EventBus(buffer_size=4)
+    _publish(bus, 2)
+    bus.seed_ids(50)
+
+    assert bus.get_events_since(0) == []
+    assert _publish(bus, 2) == [50, 51]
+    assert bus.oldest_id == 50
+    bus.seed_ids(10)  # never moves backwards
+    assert _publish(bus, 1) == [52]
+
+
+def test_inline_subscribers_run_outside_the_lock():
+    bus = EventBus(dispatch="inline")
+    seen = []
+
+    def react(event):
+        seen.append(event["id"])
+        if event["type"] == "task_created":
+            # would deadlock if subscribers ran under the publish lock
+            bus.publish(event_type="task_started", category="task")
+
+    bus.subscribe(react)
+    _publish(bus, 1)
+    assert seen == [1, 2]
+
+
+def test_slow_inline_subscriber_does_not_block_other_publishers():
+    bus = EventBus(dispatch="inline")
+    entered, release = threading.Event(), threading.Event()
+
+    def slow(event):
+        if event["id"] == 1:
+            entered.set()
+            release.wait(5)
+
+    bus.subscribe(slow)
+    first = threading.Thread(target=_publish, args=(bus, 1))
+    first.start()
+    assert entered.wait(5)
+
+    t0 = time.monotonic()
+    assert _publish(bus, 1) == [2]
+    assert time.monotonic() - t0 < 1
+    release.set()
+    first.join(5)
+
+
+def test_threaded_subscriber_gets_events_in_order_and_drops_when_full():
+    bus = EventBus()
+    picked, gate = threading.Event(), threading.Event()
+    seen = []
+
+    def slow(event):
+        picked.set()
+        gate.wait(5)
+        seen.append(event["id"])
+
+    sub = bus.subscribe(slow, threaded=True, queue_size=3)
+    failing = bus.subscribe(lambda e: 1 / 0, threaded=False)
+
+    _publish(bus, 1)
+    assert picked.wait(5)  # the worker thread holds event 1 at the gate
+    _publish(bus, 5)
+    gate.set()
+    bus.close()
+
+    assert seen == [1, 2, 3, 4]
+    assert sub.dropped == 2
+    assert failing.errors == 6 and failing.delivered == 6
+
+
+def test_filtered_subscriptions_only_see_matching_events():
+    bus = EventBus(dispatch="inline")
+    seen = {name: [] for name in ("all", "types", "category", "task", "both")}
+    bus.subscribe(lambda e: seen["all"].append(e["id"]))
+    bus.subscribe(lambda e: seen["types"].append(e["id"]), types=["task_failed", "task_completed"])
+    bus.subscribe(lambda e: seen["category"].append(e["id"]), categories=["worker"])
+    bus.subscribe(lambda e: seen["task"].append(e["id"]), task_id=7)
+    both = bus.subscribe(lambda e: seen["both"].append(e["id"]), types=["task_failed"], task_id=7)
+
+    bus.publish(event_type="task_failed", category="task", task_id=7)        # 1
+    bus.publish(event_type="task_failed", category="task", task_id=8)        # 2
+    bus.publish(event_type="task_completed", category="task", task_id=7)     # 3
+    bus.publish(event_type="worker_registered", category="worker")          # 4
+
+    bus.unsubscribe(both)
+    bus.publish(event_type="task_failed", category="task", task_id=7)        # 5
+
+    assert seen == {
+        "all": [1, 2, 3, 4, 5],
+        "types": [1, 2, 3, 5],
+        "category": [4],
+        "task": [1, 3, 5],
+        "both": [1],
+    }
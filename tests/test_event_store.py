@@ -0,0 +1,76 @@
+import threading
+import time
+
+from db.models import EventLog
+from events.event_bus import EventBus
+from events.event_store import EventStore
+
+
+def _publish(bus, n):
+    for i in range(n):
+        bus.publish(event_type="task_created", category="task", payload={"i": i})
+
+
+def test_write_behind_batches_keep_bus_ids(session):
+    store = EventStore(session, write_behind=True, batch_size=4, flush_interval=0.05)
+    bus = EventBus()
+    store.attach_to_bus(bus)
+    _publish(bus, 10)
+
+    assert store.flush(timeout=5)
+    assert [r.id for r in session.query(EventLog.id).order_by(EventLog.id)] == list(range(1, 11))
+    assert store.batches >= 3
+    store.close()
+
+
+def test_new_bus_continues_after_stored_ids(session):
+    first = EventStore(session, write_behind=True, flush_interval=0.05)
+    bus = EventBus()
+    first.attach_to_bus(bus)
+    _publish(bus, 3)
+    first.close()
+
+    second = EventStore(session, write_behind=True, flush_interval=0.05)
+    restarted = EventBus()
+    second.attach_to_bus(restarted)
+    _publish(restarted, 2)
+    second.close()
+
+    session.rollback()  # drop the snapshot taken by get_last_event_id
+    assert [r.id for r in session.query(EventLog.id).order_by(EventLog.id)] == [1, 2, 3, 4, 5]
+    assert second.failed == 0
+
+
+def _stuck_store(session):
+    # a full queue and a writer that never drains it
+    store = EventStore(session, write_behind=True, queue_size=1)
+    store._queue.put({"type": "x"})
+    release = threading.Event()
+    store._writer = threading.Thread(target=release.wait, daemon=True)
+    store._writer.start()
+    return store, release
+
+
+def test_flush_gives_up_on_a_full_queue(session):
+    store, release = _stuck_store(session)
+    t0 = time.monotonic()
+    assert store.flush(timeout=0.2) is False
+    assert time.monotonic() - t0 < 2
+    release.set()
+
+
+def test_close_does_not_hang_on_a_full_queue(session):
+    store, release = _stuck_store(session)
+    t0 = time.monotonic()
+    store.close(timeout=0.2)
+    assert time.monotonic() - t0 < 2
+    release.set()
+
+
+def test_writer_stops_when_closed_without_a_stop_marker(session):
+    store = EventStore(session, write_behind=True, flush_interval=0.05)
+    store.start()
+    writer = store._writer
+    store._closed = True
+    writer.join(2)
+    assert not writer.is_alive()
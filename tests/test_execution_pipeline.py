@@ -0,0 +1,114 @@
+import datetime as dt
+
+import sqlalchemy
+
+from db.models import Task, Worker
+from events.event_bus import EventBus
+from events.event_definitions import EventType
+from pipelines.execution_pipeline import (
+    claim_tasks,
+    mark_tasks_finished,
+    mark_tasks_started,
+    reclaim_expired_tasks,
+)
+
+
+def _workers(session, *names):
+    workers = [Worker(name=n, kind="python", capabilities=["compute"], is_active=True) for n in names]
+    session.add_all(workers)
+    session.commit()
+    return [w.id for w in workers]
+
+
+def test_finish_skips_tasks_reclaimed_by_another_worker(session):
+    first, second = _workers(session, "w1", "w2")
+    session.add_all([Task(name=f"t{i}", status="pending", priority=i, importance=1) for i in range(2)])
+    session.commit()
+
+    held = [t.id for t in claim_tasks(session, first, limit=2)]
+    # the sweep gave the second task to another worker while `first` was busy
+    session.query(Task).filter(Task.id == held[1]).update({"assigned_worker_id": second})
+    session.commit()
+
+    recorded = mark_tasks_finished(session, None, [held[0]], {held[1]: "boom"}, worker_id=first)
+
+    assert recorded == 1
+    statuses = dict(session.query(Task.id, Task.status))
+    assert statuses == {held[0]: "completed", held[1]: "running"}
+    assert session.get(Task, held[1]).attempts in (0, None)
+
+
+def test_reclaim_publishes_requeued(session):
+    (worker,) = _workers(session, "w1")
+    session.add(Task(name="t", status="queued", assigned_worker_id=worker, priority=1, importance=1))
+    session.commit()
+
+    bus = EventBus()
+    seen = []
+    bus.subscribe(lambda e: seen.append(e["type"]), threaded=False)
+
+    result = reclaim_expired_tasks(session, bus, stale_after=-1)
+
+    assert result["requeued"] == 1
+    assert seen == [EventType.TASK_REQUEUED]
+
+
+def test_batch_transitions_commit_once_and_publish_one_event(engine, session):
+    (worker,) = _workers(session, "w1")
+    session.add_all([Task(name=f"t{i}", status="pending", priority=1, importance=1, category="compute") for i in range(5)])
+    session.commit()
+    ids = [t.id for t in session.query(Task).order_by(Task.id)]
+
+    bus = EventBus()
+    seen = []
+    bus.subscribe(lambda e: seen.append((e["type"], e["task_id"], e["payload"])), threaded=False)
+    commits = []
+    sqlalchemy.event.listen(engine, "commit", lambda conn: commits.append(1))
+
+    assert mark_tasks_started(session, bus, ids, worker_id=worker) == 5
+    assert mark_tasks_finished(session, bus, ids[:4], {ids[4]: "boom"}, worker_id=worker) == 5
+
+    assert len(commits) == 2
+    assert [(t, tid) for t, tid, _ in seen] == [
+        (EventType.TASK_STARTED, None),
+        (EventType.TASK_COMPLETED, None),
+        (EventType.TASK_FAILED, ids[4]),
+    ]
+    assert seen[0][2] == {"task_ids": ids, "count": 5, "categories": {"compute": 5}}
+    assert seen[1][2]["task_ids"] == ids[:4]
+    session.expire_all()
+    assert dict(session.query(Task.id, Task.status)) == {**{i: "completed" for i in ids[:4]}, ids[4]: "failed"}
+
+
+def test_reclaim_fails_expired_running_tasks_and_keeps_live_ones(session):
+    live, dead = _workers(session, "live", "dead")
+    now = dt.datetime.utcnow()
+    session.query(Worker).filter(Worker.id == live).update({"last_heartbeat_at": now})
+    session.query(Worker).filter(Worker.id == dead).update({"last_heartbeat_at": now - dt.timedelta(hours=1)})
+    session.add_all([
+        Task(name="leased", status="running", assigned_worker_id=live, lease_expires_at=now + dt.timedelta(minutes=5)),
+        Task(name="expired", status="running", assigned_worker_id=live, lease_expires_at=now - dt.timedelta(seconds=1)),
+        Task(name="orphaned", status="running", assigned_worker_id=dead, lease_expires_at=now + dt.timedelta(minutes=5)),
+    ])
+    session.commit()
+
+    result = reclaim_expired_tasks(session, None, stale_after=60)
+
+    assert result == {"requeued": 0, "failed": 2, "dead_lettered": 0, "workers_deactivated": 1}
+    session.expire_all()
+    tasks = {t.name: t for t in session.query(Task)}
+    assert tasks["leased"].status == "running"
+    for name in ("expired", "orphaned"):
+        assert tasks[name].status == "failed"
+        assert tasks[name].attempts == 1 and tasks[name].next_attempt_at is not None
+    assert not session.get(Worker, dead).is_active and session.get(Worker, live).is_active
+
+
+def test_claim_stamps_a_lease(session):
+    (worker,) = _workers(session, "w1")
+    session.add(Task(name="t", status="pending", priority=1, importance=1))
+    session.commit()
+
+    (task,) = claim_tasks(session, worker, limit=1)
+
+    assert task.lease_expires_at > dt.datetime.utcnow()
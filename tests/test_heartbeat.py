@@ -0,0 +1,55 @@
+import datetime as dt
+import time
+
+from db.models import Task, Worker
+from events.event_bus import EventBus
+from events.event_definitions import EventType
+from workers.heartbeat import HeartbeatThread
+
+
+def test_beat_records_liveness_and_extends_only_own_leases(session):
+    mine, other = Worker(name="w1", kind="python"), Worker(name="w2", kind="python")
+    session.add_all([mine, other])
+    session.commit()
+    old = dt.datetime.utcnow() - dt.timedelta(hours=1)
+    session.add_all([
+        Task(name="running", status="running", assigned_worker_id=mine.id, lease_expires_at=old),
+        Task(name="done", status="completed", assigned_worker_id=mine.id, lease_expires_at=old),
+        Task(name="theirs", status="running", assigned_worker_id=other.id, lease_expires_at=old),
+    ])
+    session.commit()
+
+    bus = EventBus()
+    seen = []
+    bus.subscribe(lambda e: seen.append(e["type"]), threaded=False)
+    HeartbeatThread(mine.id, "w1", event_bus=bus, publish_events=False).beat()
+    assert seen == []
+    HeartbeatThread(mine.id, "w1", event_bus=bus, publish_events=True).beat()
+    assert seen == [EventType.WORKER_HEARTBEAT]
+
+    session.expire_all()
+    assert session.get(Worker, mine.id).last_heartbeat_at is not None
+    assert session.get(Worker, other.id).last_heartbeat_at is None
+    leases = dict(session.query(Task.name, Task.lease_expires_at))
+    assert leases["running"] > dt.datetime.utcnow()
+    assert leases["done"] == old and leases["theirs"] == old
+
+
+def test_touches_are_coalesced_into_timed_beats(session, monkeypatch):
+    worker = Worker(name="w1", kind="python")
+    session.add(worker)
+    session.commit()
+
+    heartbeat = HeartbeatThread(worker.id, "w1", interval=0.1)
+    beats = []
+    real_beat = heartbeat.beat
+    monkeypatch.setattr(heartbeat, "beat", lambda: (beats.append(1), real_beat()))
+
+    heartbeat.start()
+    deadline = time.monotonic() + 0.35
+    while time.monotonic() < deadline:
+        heartbeat.touch()
+    heartbeat.stop()
+
+    # one beat on start plus one per interval, however often the loop touched
+    assert 2 <= len(beats) <= 6
@@ -0,0 +1,67 @@
+import datetime as dt
+
+import pytest
+
+from pipelines import income_analytics
+from pipelines.income_analytics import _epoch, get_income_series
+from pipelines.income_pipeline import record_income
+
+
+def test_epoch_converts_aware_datetimes_to_utc():
+    naive = dt.datetime(2026, 1, 1, 0, 0)
+    aware = dt.datetime(2026, 1, 1, 2, 0, tzinfo=dt.timezone(dt.timedelta(hours=2)))
+
+    assert _epoch(aware) == _epoch(naive)
+    assert _epoch(naive.replace(tzinfo=dt.timezone.utc)) == _epoch(naive)
+
+
+MONDAY = dt.datetime(2026, 3, 2, 10, 0)
+
+
+def _series_data(session, monkeypatch):
+    monkeypatch.setattr(income_analytics, "_rates", None)
+    record_income(session, "toloka", 10.0, received_at=MONDAY)
+    record_income(session, "hive", 10.0, currency="EUR", received_at=MONDAY + dt.timedelta(days=1, hours=-5))
+    record_income(session, "toloka", 5.0, currency="XYZ", received_at=MONDAY + dt.timedelta(days=2))
+    record_income(session, "toloka", 2.0, received_at=MONDAY + dt.timedelta(days=8))
+    session.commit()
+
+
+def test_daily_series_converts_currencies_and_averages(session, monkeypatch):
+    _series_data(session, monkeypatch)
+    end = MONDAY + dt.timedelta(days=2)
+
+    series = get_income_series(session, "day", MONDAY, end, window=2)
+
+    assert series["buckets"] == ["2026-03-02T00:00:00", "2026-03-03T00:00:00", "2026-03-04T00:00:00"]
+    assert series["amount"] == [10.0, 10.8, 0.0]
+    assert series["count"] == [1, 1, 1]
+    assert series["moving_average"] == [10.0, 10.4, 5.4]
+    assert series["unconverted"] == {"XYZ": 5.0}
+
+    in_eur = get_income_series(session, "day", MONDAY, end, currency="eur")
+    assert in_eur["amount"] == [round(10 / 1.08, 4), 10.0, 0.0]
+    assert get_income_series(session, "day", MONDAY, end, platform="toloka")["amount"] == [10.0, 0.0, 0.0]
+
+
+def test_weekly_and_hourly_buckets(session, monkeypatch):
+    _series_data(session, monkeypatch)
+
+    weekly = get_income_series(session, "week", MONDAY + dt.timedelta(days=3), MONDAY + dt.timedelta(days=8))
+    assert weekly["buckets"] == ["2026-03-02T00:00:00", "2026-03-09T00:00:00"]
+    assert weekly["amount"] == [20.8, 2.0]
+
+    hourly = get_income_series(session, "hour", MONDAY, MONDAY + dt.timedelta(minutes=90))
+    assert hourly["buckets"] == ["2026-03-02T10:00:00", "2026-03-02T11:00:00"]
+    assert hourly["amount"] == [10.0, 0.0]
+
+
+def test_series_rejects_bad_arguments(session, monkeypatch):
+    monkeypatch.setattr(income_analytics, "_rates", None)
+    for kwargs in (
+        {"bucket": "month"},
+        {"bucket": "day", "start": MONDAY, "end": MONDAY - dt.timedelta(days=2)},
+        {"bucket": "day", "currency": "XYZ"},
+    ):
+        with pytest.raises(ValueError):
+            get_income_series(session, **kwargs)
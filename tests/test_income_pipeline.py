@@ -0,0 +1,57 @@
+import datetime as dt
+
+from db.models import IncomeRecord, IncomeRollup, IncomeRollupHourly
+from pipelines.income_pipeline import (
+    get_income_by_platform,
+    get_income_since,
+    get_total_income,
+    rebuild_income_rollups,
+    record_income,
+    record_income_batch,
+)
+
+T0 = dt.datetime(2026, 3, 1, 9, 30)
+
+
+def _rollups(session):
+    daily = sorted(
+        (r.platform, r.currency, r.day, round(r.total, 6), r.count, r.first_at, r.last_at)
+        for r in session.query(IncomeRollup)
+    )
+    hourly = sorted((r.platform, r.currency, r.hour, round(r.total, 6), r.count) for r in session.query(IncomeRollupHourly))
+    return daily, hourly
+
+
+def _record(session):
+    record_income(session, "toloka", 1.5, received_at=T0)
+    record_income(session, "toloka", 2.0, received_at=T0 + dt.timedelta(minutes=10))
+    record_income(session, "hive", 3.0, currency="EUR", received_at=T0 + dt.timedelta(hours=2))
+    session.commit()
+    record_income_batch(session, [
+        IncomeRecord(platform="toloka", amount=4.0, received_at=T0 + dt.timedelta(days=1)),
+        IncomeRecord(platform="hive", amount=0.5, currency="EUR", received_at=T0 + dt.timedelta(days=2, hours=1)),
+    ])
+    session.commit()
+
+
+def test_incremental_rollups_match_a_rebuild(session):
+    _record(session)
+    incremental = _rollups(session)
+
+    assert rebuild_income_rollups(session) == 4
+    session.commit()
+    assert _rollups(session) == incremental
+    assert incremental[0][0] == ("hive", "EUR", T0.date(), 3.0, 1, T0 + dt.timedelta(hours=2), T0 + dt.timedelta(hours=2))
+
+
+def test_reads_come_from_the_rollups(session):
+    _record(session)
+
+    assert get_total_income(session) == {"total_income": 11.0}
+    assert sorted(get_income_by_platform(session), key=lambda r: r["platform"]) == [
+        {"platform": "hive", "total": 3.5, "count": 2},
+        {"platform": "toloka", "total": 7.5, "count": 3},
+    ]
+    # partial first day from the records, whole days after it from the rollups
+    since = get_income_since(session, T0 + dt.timedelta(minutes=5))
+    assert since == {"total": 9.5, "count": 4, "by_currency": {"USD": 6.0, "EUR": 3.5}}
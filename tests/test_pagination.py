@@ -0,0 +1,39 @@
+from sqlalchemy import insert
+
+from api.pagination import keyset_page
+from db.models import Task
+
+_COLUMNS = {c.name: c for c in Task.__table__.columns}
+
+
+def _walk(session, order, limit):
+    ids, cursor = [], None
+    while True:
+        rows, cursor = keyset_page(session, _COLUMNS, ["id"], order, cursor=cursor, limit=limit)
+        ids.extend(r["id"] for r in rows)
+        if cursor is None:
+            return ids
+
+
+def test_pages_cover_rows_with_null_sort_values(engine, session):
+    rows = [
+        {"priority": 10, "importance": 1},
+        {"priority": None, "importance": 2},
+        {"priority": 10, "importance": None},
+        {"priority": None, "importance": None},
+        {"priority": 5, "importance": 3},
+        {"priority": 10, "importance": 1},
+        {"priority": None, "importance": 2},
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(Task), [{"name": "t", "status": "pending", **r} for r in rows])
+
+    for order in (
+        [("priority", False), ("importance", True), ("id", False)],
+        [("priority", True), ("importance", False), ("id", True)],
+    ):
+        full, _ = keyset_page(session, _COLUMNS, ["id"], order, limit=100)
+        expected = [r["id"] for r in full]
+        assert len(expected) == len(rows)
+        for limit in (1, 2, 3):
+            assert _walk(session, order, limit) == expected
@@ -0,0 +1,78 @@
+import datetime as dt
+import os
+import sqlite3
+import time
+
+from sqlalchemy import insert
+
+import events.payload_blobs as payload_blobs
+from db.models import EventLog
+from events.event_bus import EventBus
+from events.event_store import EventStore
+from events.payload_blobs import PayloadBlobStore, slim_payload
+from scheduler.jobs_db_maintenance import db_maintenance_job
+
+BIG = {"tasks": [{"step": i, "text": "x" * 50} for i in range(40)]}
+
+
+def _stored(path):
+    if not os.path.exists(path):
+        return set()
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT sha256 FROM payload_blobs")}
+
+
+def _blob_store(tmp_path, monkeypatch):
+    store = PayloadBlobStore(os.path.join(str(tmp_path), "blobs.sqlite"))
+    monkeypatch.setattr(payload_blobs, "_store", store)
+    return store
+
+
+def test_blobs_are_written_by_the_event_store_writer(session, tmp_path, monkeypatch):
+    blobs = _blob_store(tmp_path, monkeypatch)
+    store = EventStore(session, write_behind=True, flush_interval=60)
+    bus = EventBus()
+    store.attach_to_bus(bus)
+
+    payload = slim_payload(BIG, budget=512)
+    sha = payload["tasks"]["blob"]
+    bus.publish(event_type="agent_decision", category="agent", payload=payload)
+
+    # held for the writer, still readable
+    assert _stored(blobs.db_path) == set()
+    assert blobs.get(sha) == BIG["tasks"]
+
+    assert store.flush(timeout=5)
+    assert _stored(blobs.db_path) == {sha}
+    store.close()
+    assert not blobs.deferred
+
+
+def test_blob_writes_are_inline_without_a_writer(tmp_path):
+    blobs = PayloadBlobStore(os.path.join(str(tmp_path), "blobs.sqlite"))
+    sha, _ = blobs.put(BIG)
+    assert _stored(blobs.db_path) == {sha}
+    assert blobs.put(BIG)[0] == sha
+    assert blobs.stats()["dedup_hits"] == 1
+
+
+def test_maintenance_prunes_events_and_blobs_past_retention(engine, session, tmp_path, monkeypatch):
+    blobs = _blob_store(tmp_path, monkeypatch)
+    old_sha, _ = blobs.put({"old": "x" * 300})
+    new_sha, _ = blobs.put({"new": "x" * 300})
+    with sqlite3.connect(blobs.db_path) as conn:
+        conn.execute("UPDATE payload_blobs SET used_at = ? WHERE sha256 = ?", (time.time() - 40 * 86400, old_sha))
+
+    now = dt.datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(EventLog), [
+            {"type": "x", "created_at": now - dt.timedelta(days=40)},
+            {"type": "x", "created_at": now - dt.timedelta(days=31)},
+            {"type": "x", "created_at": now},
+        ])
+
+    db_maintenance_job()
+
+    assert [r.id for r in session.query(EventLog.id)] == [3]
+    assert _stored(blobs.db_path) == {new_sha}
+    assert blobs.get(old_sha) is None
@@ -0,0 +1,52 @@
+import threading
+import time
+
+from sqlalchemy import insert
+
+from db.models import Task
+from events.event_bus import EventBus
+from workers.platform_workers.hive_worker import HiveWorker
+from workers.platform_workers.toloka_worker import TolokaWorker
+
+
+def _insert(engine, categories):
+    with engine.begin() as conn:
+        conn.execute(insert(Task), [
+            {"name": f"t{i}", "status": "pending", "priority": 50, "importance": 1, "category": c}
+            for i, c in enumerate(categories)
+        ])
+
+
+def _statuses(session):
+    session.expire_all()
+    return {(t.category, t.status) for t in session.query(Task)}
+
+
+def test_process_batch_claims_only_its_platform(engine, session):
+    _insert(engine, [None, "platform:toloka", "platform:hive", "platform_exec"])
+    worker = TolokaWorker(EventBus())
+    worker.dispatcher = None
+
+    assert worker.process_batch(session) == 2
+    assert _statuses(session) == {
+        (None, "pending"),
+        ("platform:toloka", "completed"),
+        ("platform:hive", "pending"),
+        ("platform_exec", "completed"),
+    }
+
+
+def test_run_forever_drains_its_queue_and_stops(engine, session):
+    _insert(engine, ["platform:hive"] * 5 + ["platform:toloka"])
+    worker = HiveWorker(EventBus())
+    thread = threading.Thread(target=worker.run_forever, kwargs={"poll_interval": 0.05})
+    thread.start()
+
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline and ("platform:hive", "pending") in _statuses(session):
+        time.sleep(0.05)
+    worker.stop()
+    thread.join(10)
+
+    assert not thread.is_alive()
+    assert _statuses(session) == {("platform:hive", "completed"), ("platform:toloka", "pending")}
@@ -0,0 +1,26 @@
+from events.event_bus import EventBus
+from pipelines.task_routing import accepts
+from workers.python_worker import PythonWorker
+
+
+def test_python_worker_builds_with_default_capabilities():
+    worker = PythonWorker(name="test_worker", event_bus=EventBus())
+
+    assert worker.capabilities == PythonWorker.CAPABILITIES
+    assert worker.capabilities is not PythonWorker.CAPABILITIES
+
+
+def test_python_worker_leaves_platform_tasks_to_platform_workers():
+    worker = PythonWorker(name="test_worker", event_bus=EventBus())
+
+    assert accepts(worker.capabilities, None)
+    assert accepts(worker.capabilities, "setup")
+    assert not accepts(worker.capabilities, "platform_exec")
+    assert not accepts(worker.capabilities, "platform:toloka")
+
+
+def test_python_worker_capabilities_override():
+    worker = PythonWorker(name="test_worker", event_bus=EventBus(), capabilities=["prep"])
+
+    assert worker.capabilities == ["prep"]
+    assert not accepts(worker.capabilities, "platform_exec")
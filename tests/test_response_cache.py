@@ -0,0 +1,79 @@
+import os
+import time
+
+from api.cache import ResponseCache, cache_key, get_response_cache
+from core.settings import settings
+from events.event_bus import EventBus
+
+RESPONSE = (200, [(b"content-type", b"application/json")], b"[]")
+
+
+def test_ttl_lru_and_query_normalisation():
+    cache = ResponseCache(max_entries=2)
+    assert cache_key("/tasks/pending", b"limit=5&cursor=x") == cache_key("/tasks/pending", b"cursor=x&limit=5")
+
+    cache.put("a", RESPONSE, ttl=60)
+    cache.put("b", RESPONSE, ttl=60)
+    assert cache.get("a") == RESPONSE   # "a" is now the most recent
+    cache.put("c", RESPONSE, ttl=60)
+    assert cache.get("b") is None and cache.evictions == 1
+
+    cache.put("short", RESPONSE, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None and cache.expirations == 1
+
+
+def test_bus_events_invalidate_tagged_responses():
+    bus = EventBus()
+    cache = ResponseCache(event_tags={"task_*": ["tasks"], "income_recorded": ["income"]})
+    cache.attach_to_bus(bus)
+    cache.put("/tasks/pending", RESPONSE, ttl=60, tags=["tasks"])
+    cache.put("/income/total", RESPONSE, ttl=60, tags=["income"])
+
+    bus.publish(event_type="task_completed", category="task")
+
+    assert cache.get("/tasks/pending") is None
+    assert cache.get("/income/total") == RESPONSE
+    cache.close()
+
+
+def test_response_computed_across_an_invalidation_is_not_stored():
+    cache = ResponseCache()
+    token = cache.begin(["tasks"])
+    cache.invalidate(["tasks"])  # a write lands while the response is computed
+
+    assert cache.put("/tasks/pending", RESPONSE, ttl=60, tags=["tasks"], token=token) is False
+    assert cache.get("/tasks/pending") is None
+
+
+def test_shared_tier_serves_and_invalidates_across_processes(tmp_path):
+    path = os.path.join(str(tmp_path), "cache.sqlite")
+    api = ResponseCache(db_path=path, sync_interval=0)
+    engine = ResponseCache(db_path=path, sync_interval=0)
+
+    api.put("/tasks/pending", RESPONSE, ttl=60, tags=["tasks"])
+    other = ResponseCache(db_path=path, sync_interval=0)
+    assert other.get("/tasks/pending") == RESPONSE and other.shared_hits == 1
+
+    engine.invalidate(["tasks"])
+    assert api.get("/tasks/pending") is None
+    assert other.get("/tasks/pending") is None
+    for cache in (api, engine, other):
+        cache.close()
+
+
+def test_middleware_caches_and_route_writes_invalidate(api, monkeypatch):
+    monkeypatch.setattr(settings, "API_CACHE_ENABLED", True)
+    get_response_cache().clear()
+
+    async def calls(client):
+        seen = []
+        for request in ("get", "get", "add", "get"):
+            if request == "add":
+                await client.post("/tasks/add", json={"name": "new"})
+                continue
+            response = await client.get("/tasks/pending")
+            seen.append((response.headers["x-cache"], len(response.json())))
+        return seen
+
+    assert api(calls) == [("MISS", 0), ("HIT", 0), ("MISS", 1)]
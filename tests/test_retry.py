@@ -0,0 +1,78 @@
+import datetime as dt
+
+from sqlalchemy import insert, update
+
+from db.models import DeadLetter, Task
+from events.event_bus import EventBus
+from events.event_definitions import EventType
+from pipelines.execution_pipeline import mark_tasks_failed, requeue_due_retries
+from pipelines.retry_policy import next_attempt_at, retry_delay
+
+
+def test_backoff_doubles_with_jitter_and_is_capped():
+    for attempts in range(1, 6):
+        ceiling = min(600.0, 10.0 * 2 ** (attempts - 1))
+        delay = retry_delay("compute", attempts)
+        assert ceiling / 2 <= delay <= ceiling
+    assert retry_delay("compute", 30) <= 600.0
+
+
+def test_attempt_cap_returns_none():
+    now = dt.datetime.utcnow()
+    assert next_attempt_at("compute", 2, now) > now
+    assert next_attempt_at("compute", 3, now) is None
+
+
+def test_failed_tasks_retry_then_dead_letter(session):
+    session.add(Task(name="t", status="running", category="compute", priority=1, importance=1))
+    session.commit()
+
+    for attempt in range(1, 4):
+        mark_tasks_failed(session, None, {1: f"boom {attempt}"})
+        session.expire_all()
+        task = session.get(Task, 1)
+        assert task.attempts == attempt
+        if attempt < 3:
+            assert task.status == "failed" and task.next_attempt_at is not None
+
+    assert task.status == "dead_letter"
+    letter = session.query(DeadLetter).one()
+    assert (letter.task_id, letter.attempts, letter.last_error_message) == (1, 3, "boom 3")
+
+
+def test_requeue_publishes_only_the_rows_it_changed(engine, session):
+    past = dt.datetime.utcnow() - dt.timedelta(seconds=1)
+    future = dt.datetime.utcnow() + dt.timedelta(hours=1)
+    with engine.begin() as conn:
+        conn.execute(insert(Task), [
+            {"name": "due", "status": "failed", "next_attempt_at": past, "priority": 1, "importance": 1},
+            {"name": "later", "status": "failed", "next_attempt_at": future, "priority": 1, "importance": 1},
+            {"name": "due", "status": "failed", "next_attempt_at": past, "priority": 1, "importance": 1},
+        ])
+    bus = EventBus()
+    seen = []
+    bus.subscribe(seen.append, threaded=False)
+
+    assert requeue_due_retries(session, bus) == 2
+    assert [(e["type"], e["payload"]["task_ids"]) for e in seen] == [(EventType.TASK_REQUEUED, [1, 3])]
+
+    # nothing left to do: no event
+    with engine.begin() as conn:
+        conn.execute(update(Task).where(Task.id == 1).values(status="running"))
+    assert requeue_due_retries(session, bus) == 0
+    assert len(seen) == 1
+
+
+def test_retry_job_requeues_due_tasks(engine, session, monkeypatch):
+    from scheduler import context
+    from scheduler.jobs_retry import retry_failed_tasks_job
+
+    past = dt.datetime.utcnow() - dt.timedelta(seconds=1)
+    session.add(Task(name="t", status="failed", next_attempt_at=past, priority=1, importance=1))
+    session.commit()
+    monkeypatch.setattr(context, "event_bus", EventBus())
+
+    retry_failed_tasks_job()
+
+    session.expire_all()
+    assert session.get(Task, 1).status == "pending"
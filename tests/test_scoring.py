@@ -0,0 +1,45 @@
+import numpy as np
+
+from agents.opportunity_classifier import OpportunityClassifierAgent
+from agents.roi_ranker import ROIRankerAgent
+from events.event_bus import EventBus
+
+TITLES = [
+    "Get paid to label AI datasets",
+    "Earn crypto with a trading bot",
+    "Manual typing from home, no experience",
+    "Beginner surveys and captcha solving",
+    "Paid forex binary options course",   # "ai" inside "paid"
+    "Bottle collecting",                   # "bot" prefix only
+    "",
+    "EARN INCOME WITH AUTOMATION\nand AI",
+]
+
+
+def test_classify_batch_matches_classify(session):
+    agent = OpportunityClassifierAgent(session, EventBus())
+    batch = agent.classify_batch(TITLES)
+
+    for i, title in enumerate(TITLES):
+        single = agent.classify(title)
+        for key in ("roi_score", "automation_score", "risk_score"):
+            assert batch[key][i] == single[key], (title, key)
+
+    empty = agent.classify_batch([])
+    assert len(empty["roi_score"]) == 0
+
+
+def test_rank_batch_returns_the_same_top_items_as_rank(session):
+    classifier = OpportunityClassifierAgent(session, EventBus())
+    ranker = ROIRankerAgent(session, EventBus())
+    scores = classifier.classify_batch(TITLES)
+
+    items = [
+        {key: float(scores[key][i]) for key in scores} for i in range(len(TITLES))
+    ]
+    expected = [round(r["combined_score"], 9) for r in ranker.rank(items)[:3]]
+
+    top = ranker.rank_batch(scores, top_k=3, labels=TITLES)
+    assert [round(r["combined_score"], 9) for r in top] == expected
+    assert all(TITLES[r["index"]] == r["label"] for r in top)
+    assert ranker.rank_batch({k: np.array([]) for k in scores}) == []
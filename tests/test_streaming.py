@@ -0,0 +1,63 @@
+import asyncio
+import json
+
+from sqlalchemy import insert
+
+from api.streaming import EventStreamHub
+from core.settings import settings
+from db.models import EventLog
+from events.event_bus import EventBus
+
+
+def _ids(frames):
+    return [json.loads(f.split("data: ", 1)[1])["id"] for f in frames if f.startswith("id:")]
+
+
+async def _collect(hub, bus, client, last_event_id, polls=1):
+    left = [polls]
+
+    async def is_disconnected():
+        left[0] -= 1
+        return left[0] < 0
+
+    return [frame async for frame in hub.stream(bus, client, last_event_id, is_disconnected)]
+
+
+def test_resume_pages_the_store_up_to_the_ring(engine, monkeypatch):
+    monkeypatch.setattr(settings, "SSE_CATCHUP_LIMIT", 5)
+    with engine.begin() as conn:
+        conn.execute(insert(EventLog), [{"id": i, "type": "task_created", "category": "task"} for i in range(1, 13)])
+    bus = EventBus(buffer_size=100)
+    bus.seed_ids(13)
+    for _ in range(3):
+        bus.publish(event_type="task_created", category="task")
+
+    async def run():
+        hub = EventStreamHub()
+        client = hub.connect(bus)
+        return await _collect(hub, bus, client, last_event_id=0, polls=0)
+
+    assert _ids(asyncio.run(run())) == list(range(1, 16))
+
+
+def test_no_event_is_lost_while_connecting(monkeypatch):
+    bus = EventBus()
+    bus.publish(event_type="task_created", category="task")
+    real_subscribe = bus.subscribe
+
+    def racing_subscribe(*args, **kwargs):
+        # another thread publishes while the client is being set up
+        bus.publish(event_type="task_created", category="task")
+        return real_subscribe(*args, **kwargs)
+
+    monkeypatch.setattr(bus, "subscribe", racing_subscribe)
+
+    async def run():
+        hub = EventStreamHub()
+        client = hub.connect(bus)
+        bus.publish(event_type="task_created", category="task")
+        await asyncio.sleep(0)  # let call_soon_threadsafe deliver
+        return client.start_id, _ids(await _collect(hub, bus, client, last_event_id=None))
+
+    start_id, delivered = asyncio.run(run())
+    assert delivered == [i for i in (1, 2, 3) if i > start_id]
@@ -0,0 +1,69 @@
+import datetime as dt
+
+from sqlalchemy import insert
+
+from db.models import Task
+from events.event_bus import EventBus
+from events.event_definitions import EventCategory, EventType
+from pipelines.task_dispatcher import TaskDispatcher
+
+
+def _insert(engine, rows):
+    with engine.begin() as conn:
+        conn.execute(insert(Task), [{"name": "t", "status": "pending", "importance": 1, **r} for r in rows])
+
+
+def test_take_orders_by_priority_and_filters_capabilities(engine):
+    _insert(engine, [
+        {"priority": 30, "category": None},
+        {"priority": 10, "category": "platform:toloka"},
+        {"priority": 20, "category": None},
+    ])
+    dispatcher = TaskDispatcher(engine=engine, aging_rate=0)
+    dispatcher.rebuild()
+
+    assert dispatcher.take(10, ["compute"]) == [3, 1]
+    assert dispatcher.take(10, ["platform:toloka"]) == [2]
+    assert len(dispatcher) == 0
+
+
+def test_aging_uses_created_at_for_rebuilt_and_requeued_tasks(engine):
+    old = dt.datetime.utcnow() - dt.timedelta(hours=1)
+    _insert(engine, [{"priority": 50, "created_at": old}, {"priority": 40, "created_at": dt.datetime.utcnow()}])
+    dispatcher = TaskDispatcher(engine=engine, aging_rate=1 / 60.0)
+    dispatcher.rebuild()
+
+    # an hour of waiting outweighs 10 priority points
+    assert dispatcher.take(1) == [1]
+
+    # handed back later: same key as the rebuild gave it
+    with engine.connect() as conn:
+        task = conn.execute(Task.__table__.select().where(Task.id == 1)).one()
+    dispatcher.requeue([task])
+    assert dispatcher.take(2) == [1, 2]
+
+
+def test_load_new_picks_up_tasks_created_elsewhere(engine):
+    _insert(engine, [{"priority": 50}])
+    dispatcher = TaskDispatcher(engine=engine)
+    dispatcher.rebuild()
+    assert dispatcher.take(5) == [1]
+
+    _insert(engine, [{"priority": 50}, {"priority": 50, "status": "running"}])
+    assert dispatcher.load_new() == 1
+    assert dispatcher.take(5) == [2]
+    assert dispatcher.load_new() == 0
+
+
+def test_bus_events_enqueue_and_dequeue(engine):
+    bus = EventBus()
+    dispatcher = TaskDispatcher(engine=engine)
+    dispatcher.attach_to_bus(bus)
+    dispatcher.rebuild()
+    _insert(engine, [{"priority": 50}, {"priority": 60}])
+
+    bus.publish(event_type=EventType.TASK_REQUEUED, category=EventCategory.TASK, message="",
+                payload={"task_ids": [1, 2], "count": 2})
+    bus.publish(event_type=EventType.TASK_STARTED, category=EventCategory.TASK, message="", task_id=1)
+
+    assert dispatcher.take(5) == [2]
@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pytest
+
+from workers.task_executor import TaskExecutor
+
+
+def _tracking_run(peak, lock, running):
+    def run(task):
+        with lock:
+            running[task["category"]] += 1
+            peak[task["category"]] = max(peak[task["category"]], running[task["category"]])
+        time.sleep(0.02)
+        with lock:
+            running[task["category"]] -= 1
+        if task["id"] == 3:
+            raise RuntimeError("boom")
+    return run
+
+
+def test_run_batch_respects_category_limits_and_collects_failures():
+    peak, running, lock = {"compute": 0, "io": 0}, {"compute": 0, "io": 0}, threading.Lock()
+    executor = TaskExecutor(
+        mode="thread",
+        max_in_flight=4,
+        category_limits={"compute": 1},
+        run=_tracking_run(peak, lock, running),
+    )
+    tasks = [{"id": i, "category": "compute" if i % 2 else "io"} for i in range(8)]
+    try:
+        completed, failures = executor.run_batch(tasks)
+    finally:
+        executor.shutdown()
+
+    assert sorted(completed) == [0, 1, 2, 4, 5, 6, 7]
+    assert failures == {3: "boom"}
+    assert peak["compute"] == 1
+    assert peak["io"] > 1
+
+
+@pytest.mark.parametrize("limit", [0, -1, 1.5])
+def test_category_limit_below_one_is_rejected(limit):
+    with pytest.raises(ValueError):
+        TaskExecutor(mode="thread", category_limits={"compute": limit})
+
+
+def test_async_mode_runs_the_batch():
+    executor = TaskExecutor(mode="async", max_in_flight=2)
+    try:
+        completed, failures = executor.run_batch([{"id": i, "category": None} for i in range(3)])
+    finally:
+        executor.shutdown()
+    assert sorted(completed) == [0, 1, 2] and failures == {}
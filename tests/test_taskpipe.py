@@ -0,0 +1,73 @@
+import pytest
+import sqlalchemy
+
+from core.settings import settings
+from db.models import Blueprint, Task
+from events.event_bus import EventBus
+from events.event_definitions import EventType
+from pipelines.blueprint_pipeline import process_new_blueprints
+from pipelines.taskpipe import TaskPipe
+
+STATUSES = ["new", "approved", "rejected", "new", "new"]
+FLOW = ["NodeWorker", "APIConnector", "ManualStepPrep", "PythonWorker"]
+
+
+@pytest.fixture(autouse=True)
+def _quiet_wakeups(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_WAKEUP_DIR", str(tmp_path / "wakeup"))
+
+
+def _blueprints(session):
+    session.add_all(
+        Blueprint(
+            title=f"Label AI images {i}",
+            status=s,
+            strategy={"execution_flow": FLOW[: i % 4 + 1], "recommended_priority": 40 + i},
+        )
+        for i, s in enumerate(STATUSES)
+    )
+    session.commit()
+    return session.query(Blueprint).order_by(Blueprint.id).all()
+
+
+def _tasks(session):
+    return sorted(
+        (t.blueprint_id, t.name, t.category, t.priority, t.status)
+        for t in session.query(Task)
+    )
+
+
+def test_batch_creates_the_same_tasks_as_one_by_one(engine, session):
+    blueprints = _blueprints(session)
+    pipe = TaskPipe(session, EventBus())
+    for bp in blueprints[:2]:
+        pipe.create_tasks_for_blueprint(bp)
+    expected = _tasks(session)
+    session.query(Task).delete()
+    session.query(Blueprint).update({"status": "new"})
+    session.commit()
+
+    bus = EventBus()
+    seen = []
+    bus.subscribe(lambda e: seen.append(e), types=[EventType.TASK_CREATED, EventType.BLUEPRINT_ACTIVATED])
+    commits = []
+    sqlalchemy.event.listen(engine, "commit", lambda conn: commits.append(1))
+
+    task_ids = TaskPipe(session, bus).create_tasks_for_blueprints(blueprints[:2])
+
+    assert len(commits) == 1
+    assert expected and _tasks(session) == expected
+    assert [e["type"] for e in seen] == [EventType.TASK_CREATED, EventType.BLUEPRINT_ACTIVATED]
+    assert seen[0]["payload"]["task_ids"] == task_ids
+    assert seen[1]["payload"]["blueprint_ids"] == [blueprints[0].id, blueprints[1].id]
+
+
+def test_process_new_blueprints_drains_all_chunks(session):
+    blueprints = _blueprints(session)
+
+    assert process_new_blueprints(session, EventBus(), chunk_size=2) == 4
+    assert process_new_blueprints(session, EventBus(), chunk_size=2) == 0
+
+    session.expire_all()
+    assert [bp.status for bp in blueprints] == ["active", "active", "rejected", "active", "active"]
+    assert {t[0] for t in _tasks(session)} == {bp.id for bp in blueprints if bp.status == "active"}
@@ -0,0 +1,66 @@
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from core.settings import settings
+from events.event_bus import EventBus
+from events.event_definitions import EventCategory, EventType
+from workers.wakeup import TaskWakeup, notify_workers
+
+
+def _wait_in_thread(wakeup, timeout=5.0):
+    result = {}
+
+    def run():
+        t0 = time.monotonic()
+        result["woke"] = wakeup.wait(timeout)
+        result["elapsed"] = time.monotonic() - t0
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread, result
+
+
+def test_new_task_events_wake_an_idle_worker():
+    bus = EventBus()
+    wakeup = TaskWakeup("test")
+    wakeup.attach_to_bus(bus)
+
+    bus.publish(event_type=EventType.TASK_COMPLETED, category=EventCategory.TASK)
+    assert wakeup.wait(0.05) is False
+
+    thread, result = _wait_in_thread(wakeup)
+    time.sleep(0.05)
+    bus.publish(event_type=EventType.TASK_CREATED, category=EventCategory.TASK)
+    thread.join(5)
+    assert result["woke"] and result["elapsed"] < 2
+
+    # a notification while busy is not lost
+    bus.publish(event_type=EventType.TASK_REQUEUED, category=EventCategory.TASK)
+    assert wakeup.wait(0) is True
+    wakeup.close()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs UNIX sockets")
+def test_notify_workers_wakes_listeners_and_drops_stale_sockets(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "WORKER_WAKEUP_DIR", str(tmp_path))
+    stale = os.path.join(str(tmp_path), "gone.sock")
+    dead = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    dead.bind(stale)
+    dead.close()  # leaves the file behind, like a killed worker
+
+    wakeup = TaskWakeup("listener")
+    wakeup.listen()
+    thread, result = _wait_in_thread(wakeup)
+    time.sleep(0.05)
+
+    assert notify_workers() == 1
+    thread.join(5)
+    assert result["woke"] and result["elapsed"] < 2
+    assert not os.path.exists(stale)
+
+    wakeup.close()
+    assert os.listdir(str(tmp_path)) == []
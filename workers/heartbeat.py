@@ -0,0 +1,92 @@
+import datetime as dt
+import threading
+from typing import Optional
+
+from sqlalchemy import update
+
+from db.engine import init_engine
+from db.models import Task, Worker
+from events.event_bus import EventBus
+from events.event_definitions import EventType, EventCategory
+from core.logger import logger
+from core.settings import settings
+
+
+class HeartbeatThread:
+    """
+    Writes a worker's liveness on its own timer, independent of how fast the
+    run loop spins.
+
+    The run loop only calls touch() (in memory). Every `interval` seconds the
+    thread coalesces that into one UPDATE of last_seen_at / last_heartbeat_at
+    and extends the lease on every task the worker is running.
+    A WORKER_HEARTBEAT event is published only if WORKER_HEARTBEAT_EVENTS is on.
+    """
+
+    def __init__(
+        self,
+        worker_id: int,
+        worker_name: str,
+        event_bus: Optional[EventBus] = None,
+        interval: Optional[float] = None,
+        publish_events: Optional[bool] = None,
+    ):
+        self.worker_id = worker_id
+        self.worker_name = worker_name
+        self.event_bus = event_bus
+        self.interval = interval or settings.WORKER_HEARTBEAT_INTERVAL
+        self.publish_events = settings.WORKER_HEARTBEAT_EVENTS if publish_events is None else publish_events
+
+        self._last_seen = dt.datetime.utcnow()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def touch(self) -> None:
+        """
+        Record activity; persisted on the next beat.
+        """
+        self._last_seen = dt.datetime.utcnow()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.beat()
+        self._thread = threading.Thread(target=self._run, name=f"Heartbeat:{self.worker_name}", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.beat()
+            except Exception as e:
+                # a missed beat must never kill the thread
+                logger.error(f"[Heartbeat] '{self.worker_name}' beat failed: {e}")
+
+    def beat(self) -> None:
+        now = dt.datetime.utcnow()
+        with init_engine().begin() as conn:
+            conn.execute(
+                update(Worker)
+                .where(Worker.id == self.worker_id)
+                .values(last_seen_at=self._last_seen, last_heartbeat_at=now, is_active=True)
+            )
+            conn.execute(
+                update(Task)
+                .where(Task.assigned_worker_id == self.worker_id, Task.status == "running")
+                .values(lease_expires_at=now + dt.timedelta(seconds=settings.TASK_LEASE_SECONDS))
+            )
+
+        if self.publish_events and self.event_bus is not None:
+            self.event_bus.publish(
+                event_type=EventType.WORKER_HEARTBEAT,
+                category=EventCategory.WORKER,
+                message=f"Worker '{self.worker_name}' heartbeat.",
+                worker_id=self.worker_id,
+                payload={"worker_name": self.worker_name},
+            )
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(self.interval + 5)
+            self._thread = None
@@ -1,29 +1,214 @@
-from typing import Dict, Any
+import datetime as dt
+import time
+from typing import Dict, List, Optional
+
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
-from db.models import Task
+from db.engine import init_engine
+from db.models import Task, Worker
+from db.session import create_session
 from events.event_bus import EventBus
-from events.event_definitions import EventType, EventCategory
+from pipelines.execution_pipeline import claim_tasks, mark_tasks_finished
+from pipelines.task_dispatcher import TaskDispatcher
+from pipelines.task_routing import PLATFORM_PREFIX
+from scheduler import context
+from workers.heartbeat import HeartbeatThread
+from workers.wakeup import TaskWakeup
+from core.logger import logger
+from core.settings import settings
 
 
 class GenericPlatformWorker:
     """
     Base class for specific platform workers (Toloka, Hive, Remotasks).
+
+    Each platform worker has its own queue: it claims "platform:<name>"
+    tasks plus the shared "platform_exec" category (capability "platform"),
+    never compute / prep work meant for PythonWorkers.
+
+    run_forever() is the worker's loop (launcher/start_platform_workers.py):
+    batches via process_batch(), a HeartbeatThread for liveness and leases,
+    and a TaskWakeup + capability-scoped TaskDispatcher like PythonWorker.
     """
 
-    def __init__(self, platform_name: str, event_bus: EventBus):
+    def __init__(self, platform_name: str, event_bus: EventBus, dispatcher: Optional[TaskDispatcher] = None):
         self.platform_name = platform_name
         self.event_bus = event_bus
+        self.dispatcher = dispatcher if dispatcher is not None else context.dispatcher
+        self.capabilities = [f"{PLATFORM_PREFIX}{platform_name}", "platform"]
+        self.worker_id: Optional[int] = None
+
+        self._running = False
+        self._own_dispatcher = False
+        self._wakeup: Optional[TaskWakeup] = None
+        self._heartbeat: Optional[HeartbeatThread] = None
+
+    @property
+    def name(self) -> str:
+        return f"{self.platform_name}_worker"
+
+    def register(self, session: Session) -> Worker:
+        """
+        Get or create this worker's row so it shows up in routing and /workers/status.
+        """
+        worker: Optional[Worker] = session.query(Worker).filter(Worker.name == self.name).first()
+        if not worker:
+            worker = Worker(
+                name=self.name,
+                kind="platform",
+                capabilities=self.capabilities,
+                is_active=True,
+                last_seen_at=dt.datetime.utcnow(),
+                last_heartbeat_at=dt.datetime.utcnow(),
+            )
+            session.add(worker)
+            session.commit()
+        self.worker_id = worker.id
+        return worker
 
     def execute_task(self, session: Session, task: Task) -> bool:
         """
         Execute a single task. Stub in v1.5.
         """
-        self.event_bus.publish(
-            event_type=EventType.TASK_COMPLETED,
-            category=EventCategory.TASK,
-            message=f"[{self.platform_name}] Stub executed task #{task.id}",
-            task_id=task.id,
-            payload={"platform": self.platform_name},
+        return True
+
+    def beat(self, session: Session) -> None:
+        """
+        Write liveness and extend the lease on every task this worker is
+        running, like workers.heartbeat.HeartbeatThread.beat().
+        """
+        now = dt.datetime.utcnow()
+        session.execute(
+            update(Worker)
+            .where(Worker.id == self.worker_id)
+            .values(last_seen_at=now, last_heartbeat_at=now, is_active=True)
+        )
+        session.execute(
+            update(Task)
+            .where(Task.assigned_worker_id == self.worker_id, Task.status == "running")
+            .values(lease_expires_at=now + dt.timedelta(seconds=settings.TASK_LEASE_SECONDS)),
+            execution_options={"synchronize_session": False},
         )
-        return True
\ No newline at end of file
+        session.commit()
+
+    def process_batch(self, session: Session, limit: Optional[int] = None) -> int:
+        """
+        Claim up to `limit` tasks from this platform's queue, execute them and
+        record the outcome in one transaction. Returns the number claimed.
+        """
+        if self.worker_id is None:
+            self.register(session)
+        limit = limit or settings.WORKER_BATCH_SIZE
+
+        # without run_forever()'s heartbeat thread the batch beats itself, at
+        # the start and between tasks every WORKER_HEARTBEAT_INTERVAL, so
+        # neither the worker nor the leases of the tasks still waiting expire
+        self_beating = self._heartbeat is None
+        if self_beating:
+            self.beat(session)
+        last_beat = time.monotonic()
+
+        if self.dispatcher is not None:
+            task_ids = self.dispatcher.take(limit, self.capabilities)
+            tasks = claim_tasks(session, self.worker_id, limit=limit, event_bus=self.event_bus, task_ids=task_ids)
+        else:
+            tasks = claim_tasks(
+                session,
+                self.worker_id,
+                limit=limit,
+                event_bus=self.event_bus,
+                capabilities=self.capabilities,
+            )
+
+        completed: List[int] = []
+        failures: Dict[int, str] = {}
+        for task in tasks:
+            if self_beating and time.monotonic() - last_beat >= settings.WORKER_HEARTBEAT_INTERVAL:
+                self.beat(session)
+                last_beat = time.monotonic()
+            try:
+                if self.execute_task(session, task):
+                    completed.append(task.id)
+                else:
+                    failures[task.id] = f"{self.platform_name} rejected the task"
+            except Exception as e:
+                logger.error(f"[{self.platform_name}] Error executing task #{task.id}: {e}")
+                failures[task.id] = str(e) or e.__class__.__name__
+
+        mark_tasks_finished(session, self.event_bus, completed, failures, worker_id=self.worker_id)
+        return len(tasks)
+
+    def run_forever(self, poll_interval: Optional[float] = None) -> None:
+        """
+        Blocking loop: process batches until stop(); when idle, sleep on the
+        wakeup with the same exponential backoff as PythonWorker.
+        """
+        poll_interval = poll_interval or settings.WORKER_POLL_INTERVAL
+        logger.info(f"[{self.platform_name}] Starting worker '{self.name}' run loop.")
+        self._running = True
+
+        session = create_session(init_engine())
+        try:
+            self.register(session)
+        finally:
+            session.close()
+
+        self._wakeup = TaskWakeup(self.name)
+        self._wakeup.attach_to_bus(self.event_bus)
+        self._wakeup.listen()
+
+        if self.dispatcher is None and settings.TASK_DISPATCH_ENABLED:
+            self.dispatcher = TaskDispatcher(capabilities=self.capabilities)
+            self.dispatcher.attach_to_bus(self.event_bus)
+            self.dispatcher.rebuild()
+            self._own_dispatcher = True
+
+        self._heartbeat = HeartbeatThread(self.worker_id, self.name, event_bus=self.event_bus)
+        self._heartbeat.start()
+
+        idle_delay = poll_interval
+        try:
+            while self._running:
+                self._heartbeat.touch()
+                session = create_session(init_engine())
+                try:
+                    processed = self.process_batch(session)
+                except Exception as e:
+                    logger.error(f"[{self.platform_name}] Batch failed: {e}")
+                    processed = 0
+                finally:
+                    session.close()
+
+                if processed:
+                    idle_delay = poll_interval
+                    continue
+
+                woke = self._wakeup.wait(idle_delay)
+                if self._own_dispatcher:
+                    # tasks created in other processes never reach this bus
+                    try:
+                        woke = self.dispatcher.load_new() > 0 or woke
+                    except Exception as e:
+                        logger.error(f"[{self.platform_name}] Dispatcher load failed: {e}")
+                if woke:
+                    idle_delay = poll_interval
+                else:
+                    idle_delay = min(idle_delay * 2, settings.WORKER_MAX_POLL_INTERVAL)
+        finally:
+            self._shutdown()
+
+    def _shutdown(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.close()
+            self._wakeup = None
+        if self._own_dispatcher:
+            self.dispatcher.close()
+        if self._heartbeat is not None:
+            self._heartbeat.stop()
+            self._heartbeat = None
+
+    def stop(self) -> None:
+        self._running = False
+        if self._wakeup is not None:
+            self._wakeup.notify()
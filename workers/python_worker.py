@@ -1,6 +1,6 @@
-import time
 import datetime as dt
-from typing import Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, List
 
 from sqlalchemy.orm import Session
 
@@ -8,13 +8,17 @@ from db.engine import init_engine
 from db.session import create_session
 from db.models import Worker, Task
 from events.event_bus import EventBus
-from events.event_definitions import EventType, EventCategory
 from pipelines.execution_pipeline import (
-    select_pending_tasks,
-    mark_task_started,
-    mark_task_completed,
-    mark_task_failed,
+    claim_tasks,
+    mark_tasks_finished,
+    release_tasks,
 )
+from pipelines.task_dispatcher import TaskDispatcher
+from scheduler import context
+from workers.heartbeat import HeartbeatThread
+from workers.task_executor import TaskExecutor
+from workers.wakeup import TaskWakeup
+from core.settings import settings
 from core.logger import logger
 
 
@@ -25,14 +29,61 @@ class PythonWorker:
     For v1.5:
     - it simulates executing each task
     - in future versions we plug real platform logic / APIs here
+
+    Claimed tasks run concurrently on a TaskExecutor (thread / process /
+    async, see WORKER_CONCURRENCY_MODE). While a batch runs, the next one is
+    claimed so the executor never waits on the DB between batches.
+
+    It only claims tasks whose category maps to one of its `capabilities`
+    (see pipelines.task_routing), plus tasks routed to it directly.
+
+    The next batch comes from a TaskDispatcher's in-memory priority queue
+    and is claimed by id: the argument, scheduler.context's (same process as
+    bootstrap), or else one the worker builds and resyncs itself, fed by
+    TaskDispatcher.load_new() whenever it wakes up.
+
+    When idle it sleeps on a TaskWakeup (TASK_CREATED events / wakeup
+    socket) instead of polling; the fallback poll backs off exponentially
+    from poll_interval up to WORKER_MAX_POLL_INTERVAL.
     """
 
-    def __init__(self, name: str, event_bus: EventBus, poll_interval: float = 2.0):
+    # platform_exec / platform:<name> tasks belong to the platform workers
+    # (launcher/start_platform_workers.py)
+    CAPABILITIES = ["compute", "strategy", "prep"]
+
+    def __init__(
+        self,
+        name: str,
+        event_bus: EventBus,
+        poll_interval: float = 2.0,
+        concurrency: Optional[str] = None,
+        max_in_flight: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        category_limits: Optional[Dict[str, int]] = None,
+        prefetch: Optional[bool] = None,
+        dispatcher: Optional[TaskDispatcher] = None,
+        capabilities: Optional[List[str]] = None,
+    ):
         self.name = name
         self.event_bus = event_bus
         self.poll_interval = poll_interval
         self._running = False
 
+        self.concurrency = concurrency or settings.WORKER_CONCURRENCY_MODE
+        self.max_in_flight = max_in_flight or settings.WORKER_MAX_IN_FLIGHT
+        self.batch_size = batch_size or settings.WORKER_BATCH_SIZE
+        self.category_limits = category_limits
+        self.prefetch = settings.WORKER_PREFETCH if prefetch is None else prefetch
+        self.dispatcher = dispatcher if dispatcher is not None else context.dispatcher
+        self._own_dispatcher = False
+        self.capabilities = list(capabilities or self.CAPABILITIES)
+
+        self._executor: Optional[TaskExecutor] = None
+        self._batch_runner: Optional[ThreadPoolExecutor] = None
+        self._prefetched: List[Task] = []
+        self._wakeup = TaskWakeup(name)
+        self._heartbeat: Optional[HeartbeatThread] = None
+
     def _get_session(self) -> Session:
         engine = init_engine()
         return create_session(engine)
@@ -45,46 +96,67 @@ class PythonWorker:
             worker = Worker(
                 name=self.name,
                 kind="python",
-                capabilities=["compute", "strategy", "prep"],
+                capabilities=self.capabilities,
                 is_active=True,
                 last_seen_at=dt.datetime.utcnow(),
                 last_heartbeat_at=dt.datetime.utcnow(),
             )
             session.add(worker)
             session.commit()
+        elif worker.capabilities != self.capabilities:
+            worker.capabilities = self.capabilities
+            session.commit()
         return worker
 
-    def _heartbeat(self, session: Session, worker: Worker) -> None:
-        worker.last_seen_at = dt.datetime.utcnow()
-        worker.last_heartbeat_at = dt.datetime.utcnow()
-        session.add(worker)
-        session.commit()
-
-        self.event_bus.publish(
-            event_type=EventType.WORKER_HEARTBEAT,
-            category=EventCategory.WORKER,
-            message=f"Python worker '{worker.name}' heartbeat.",
-            worker_id=worker.id,
-            payload={"worker_name": worker.name, "kind": worker.kind},
+    @staticmethod
+    def _snapshot(task: Task) -> Dict[str, Any]:
+        # plain dict: safe to hand to other threads / processes
+        return {
+            "id": task.id,
+            "name": task.name,
+            "category": task.category,
+            "payload": task.payload,
+        }
+
+    def _start_executor(self) -> None:
+        if self._executor is None:
+            self._executor = TaskExecutor(
+                mode=self.concurrency,
+                max_in_flight=self.max_in_flight,
+                category_limits=self.category_limits,
+            )
+            self._batch_runner = ThreadPoolExecutor(1, thread_name_prefix=f"{self.name}-batch")
+
+    def _claim(self, session: Session, worker_id: int) -> List[Task]:
+        # claimed tasks are already 'running' and owned by this worker
+        if self.dispatcher is not None:
+            task_ids = self.dispatcher.take(self.batch_size, self.capabilities)
+            return claim_tasks(session, worker_id, limit=self.batch_size, event_bus=self.event_bus, task_ids=task_ids)
+        return claim_tasks(
+            session,
+            worker_id,
+            limit=self.batch_size,
+            event_bus=self.event_bus,
+            capabilities=self.capabilities,
         )
 
-    def _process_batch(self, session: Session, worker: Worker) -> int:
-        tasks: List[Task] = select_pending_tasks(session, limit=5)
+    def _process_batch(self, session: Session, worker_id: int) -> int:
+        self._start_executor()
+
+        tasks = self._prefetched or self._claim(session, worker_id)
+        self._prefetched = []
         if not tasks:
             return 0
 
-        for t in tasks:
-            try:
-                mark_task_started(session, self.event_bus, t)
+        running = self._batch_runner.submit(self._executor.run_batch, [self._snapshot(t) for t in tasks])
 
-                # Simulated work:
-                # later we map categories to real implementations
-                time.sleep(0.1)
+        if self.prefetch:
+            self._prefetched = self._claim(session, worker_id)
 
-                mark_task_completed(session, self.event_bus, t)
-            except Exception as e:
-                logger.error(f"[PythonWorker] Error processing task #{t.id}: {e}")
-                mark_task_failed(session, self.event_bus, t, str(e))
+        completed, failures = running.result()
+
+        # one transaction + one event per outcome for the whole batch
+        mark_tasks_finished(session, self.event_bus, completed, failures, worker_id=worker_id)
 
         return len(tasks)
 
@@ -96,17 +168,80 @@ class PythonWorker:
         logger.info(f"[PythonWorker] Starting worker '{self.name}' run loop.")
         self._running = True
 
+        self._wakeup.attach_to_bus(self.event_bus)
+        self._wakeup.listen()
+
+        if self.dispatcher is None and settings.TASK_DISPATCH_ENABLED:
+            # standalone worker process: no bootstrap dispatcher to share
+            self.dispatcher = TaskDispatcher(capabilities=self.capabilities)
+            self.dispatcher.attach_to_bus(self.event_bus)
+            self.dispatcher.rebuild()
+            self._own_dispatcher = True
+
+        session = self._get_session()
+        try:
+            worker_id = self._get_or_create_worker_row(session).id
+        finally:
+            session.close()
+
+        # liveness is written by its own timer thread, not per loop
+        self._heartbeat = HeartbeatThread(worker_id, self.name, event_bus=self.event_bus)
+        self._heartbeat.start()
+
+        idle_delay = self.poll_interval
+
         while self._running:
+            self._heartbeat.touch()
             session = self._get_session()
             try:
-                worker = self._get_or_create_worker_row(session)
-                self._heartbeat(session, worker)
-                processed = self._process_batch(session, worker)
+                processed = self._process_batch(session, worker_id)
+            finally:
+                session.close()
 
-                if processed == 0:
-                    time.sleep(self.poll_interval)
+            if processed:
+                idle_delay = self.poll_interval
+                continue
+
+            woke = self._wakeup.wait(idle_delay)
+            if self._own_dispatcher:
+                # tasks created in other processes never reach this bus
+                try:
+                    woke = self.dispatcher.load_new() > 0 or woke
+                except Exception as e:
+                    logger.error(f"[PythonWorker] '{self.name}' dispatcher load failed: {e}")
+            if woke:
+                idle_delay = self.poll_interval
+            else:
+                idle_delay = min(idle_delay * 2, settings.WORKER_MAX_POLL_INTERVAL)
+
+        self._shutdown()
+
+    def _shutdown(self) -> None:
+        self._wakeup.close()
+        if self._own_dispatcher:
+            self.dispatcher.close()
+
+        if self._heartbeat is not None:
+            self._heartbeat.stop()
+            self._heartbeat = None
+
+        if self._prefetched:
+            # hand claimed-but-unstarted tasks back to the queue
+            session = self._get_session()
+            try:
+                release_tasks(session, [t.id for t in self._prefetched])
             finally:
                 session.close()
+            if self.dispatcher is not None:
+                self.dispatcher.requeue(self._prefetched)
+            self._prefetched = []
+
+        if self._executor is not None:
+            self._batch_runner.shutdown(wait=True)
+            self._executor.shutdown()
+            self._executor = None
+            self._batch_runner = None
 
     def stop(self):
-        self._running = False
\ No newline at end of file
+        self._running = False
+        self._wakeup.notify()
\ No newline at end of file
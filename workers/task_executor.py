@@ -0,0 +1,128 @@
+import asyncio
+import collections
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from core.logger import logger
+from core.settings import settings
+
+
+def run_task(task: Dict[str, Any]) -> None:
+    """
+    Execute one claimed task snapshot (module-level so process pools can pickle it).
+    """
+    # Simulated work:
+    # later we map categories to real implementations
+    time.sleep(0.1)
+
+
+async def run_task_async(task: Dict[str, Any]) -> None:
+    """
+    asyncio flavour of run_task for I/O-bound platform calls.
+    """
+    await asyncio.sleep(0.1)
+
+
+class TaskExecutor:
+    """
+    Runs a batch of claimed tasks concurrently.
+
+    - mode "thread":  ThreadPoolExecutor (I/O-bound platform tasks)
+    - mode "process": ProcessPoolExecutor (CPU-bound work)
+    - mode "async":   one asyncio loop on a background thread
+    - at most `max_in_flight` tasks run at once, and at most
+      category_limits[category] of any one category
+    """
+
+    MODES = ("thread", "process", "async")
+
+    def __init__(
+        self,
+        mode: Optional[str] = None,
+        max_in_flight: Optional[int] = None,
+        category_limits: Optional[Dict[str, int]] = None,
+        run: Callable[[Dict[str, Any]], None] = run_task,
+        run_async: Callable[[Dict[str, Any]], Awaitable[None]] = run_task_async,
+    ):
+        self.mode = mode or settings.WORKER_CONCURRENCY_MODE
+        if self.mode not in self.MODES:
+            raise ValueError(f"Unknown concurrency mode '{self.mode}', expected one of {self.MODES}")
+
+        self.max_in_flight = max(1, max_in_flight or settings.WORKER_MAX_IN_FLIGHT)
+        self.category_limits = dict(settings.WORKER_CATEGORY_LIMITS if category_limits is None else category_limits)
+        # a category that may never start would leave run_batch() waiting forever
+        bad = {c: n for c, n in self.category_limits.items() if not isinstance(n, int) or n < 1}
+        if bad:
+            raise ValueError(f"Category limits must be integers >= 1, got {bad}")
+        self._run = run
+        self._run_async = run_async
+
+        self._pool = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+
+        if self.mode == "thread":
+            self._pool = ThreadPoolExecutor(self.max_in_flight, thread_name_prefix="TaskExec")
+        elif self.mode == "process":
+            self._pool = ProcessPoolExecutor(self.max_in_flight)
+        else:
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever, name="TaskExecLoop", daemon=True)
+            self._loop_thread.start()
+
+    def _submit(self, task: Dict[str, Any]) -> Future:
+        if self._loop is not None:
+            return asyncio.run_coroutine_threadsafe(self._run_async(task), self._loop)
+        return self._pool.submit(self._run, task)
+
+    def _limit(self, category: Optional[str]) -> int:
+        return self.category_limits.get(category, self.max_in_flight)
+
+    def run_batch(self, tasks: List[Dict[str, Any]]) -> Tuple[List[int], Dict[int, str]]:
+        """
+        Run every task in `tasks`; returns (completed ids, {failed id: error}).
+        Tasks held back by a category limit keep their order and start as
+        soon as a slot in that category frees up.
+        """
+        pending: Deque[Dict[str, Any]] = collections.deque(tasks)
+        in_flight: Dict[Future, Dict[str, Any]] = {}
+        per_category: Dict[Optional[str], int] = collections.Counter()
+
+        completed: List[int] = []
+        failures: Dict[int, str] = {}
+
+        while pending or in_flight:
+            held: Deque[Dict[str, Any]] = collections.deque()
+            while pending and len(in_flight) < self.max_in_flight:
+                task = pending.popleft()
+                category = task.get("category")
+                if per_category[category] >= self._limit(category):
+                    held.append(task)
+                    continue
+                in_flight[self._submit(task)] = task
+                per_category[category] += 1
+            held.extend(pending)
+            pending = held
+
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                task = in_flight.pop(future)
+                per_category[task.get("category")] -= 1
+                try:
+                    future.result()
+                    completed.append(task["id"])
+                except Exception as e:
+                    logger.error(f"[TaskExecutor] Error processing task #{task['id']}: {e}")
+                    failures[task["id"]] = str(e) or e.__class__.__name__
+
+        return completed, failures
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(5)
+            self._loop.close()
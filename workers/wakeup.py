@@ -0,0 +1,138 @@
+import glob
+import os
+import socket
+import threading
+from typing import Optional
+
+from core.logger import logger
+from core.settings import settings
+from events.event_bus import EventBus, Subscription
+from events.event_definitions import EventType
+
+_HAS_UNIX_SOCKETS = hasattr(socket, "AF_UNIX")
+
+
+def _socket_path(name: str) -> str:
+    return os.path.join(settings.WORKER_WAKEUP_DIR, f"{name}.sock")
+
+
+def notify_workers() -> int:
+    """
+    Wake every idle worker process listening in WORKER_WAKEUP_DIR.
+    Best-effort: returns how many sockets were pinged.
+    """
+    if not _HAS_UNIX_SOCKETS:
+        return 0
+
+    sent = 0
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+    sock.setblocking(False)
+    try:
+        for path in glob.glob(os.path.join(settings.WORKER_WAKEUP_DIR, "*.sock")):
+            try:
+                sock.sendto(b"task", path)
+                sent += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # worker died without cleaning up
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except (BlockingIOError, OSError):
+                # receiver buffer full: it is already awake with pings queued
+                pass
+    finally:
+        sock.close()
+    return sent
+
+
+class TaskWakeup:
+    """
+    Lets an idle worker sleep until new work shows up.
+
+    - in-process: TASK_CREATED / TASK_REQUEUED events on the EventBus wake the worker
+    - cross-process: the worker binds a UNIX datagram socket in
+      WORKER_WAKEUP_DIR, and notify_workers() (called after tasks are
+      committed) pings every socket there
+    - wait(timeout) always returns after `timeout`, so polling remains as
+      the fallback
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._cond = threading.Condition()
+        self._pending = False
+        self._subscription: Optional[Subscription] = None
+        self._bus: Optional[EventBus] = None
+        self._sock: Optional[socket.socket] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def notify(self) -> None:
+        with self._cond:
+            self._pending = True
+            self._cond.notify_all()
+
+    def wait(self, timeout: float) -> bool:
+        """
+        Block until notified or `timeout` elapses. True if woken by a notification.
+        """
+        with self._cond:
+            if not self._pending:
+                self._cond.wait(timeout)
+            woke = self._pending
+            self._pending = False
+            return woke
+
+    def attach_to_bus(self, bus: EventBus) -> None:
+        self._bus = bus
+        self._subscription = bus.subscribe(lambda e: self.notify(), types=[EventType.TASK_CREATED, EventType.TASK_REQUEUED])
+
+    def listen(self) -> None:
+        """
+        Start receiving cross-process wakeups (no-op without UNIX sockets).
+        """
+        if not _HAS_UNIX_SOCKETS or self._sock is not None:
+            return
+
+        os.makedirs(settings.WORKER_WAKEUP_DIR, exist_ok=True)
+        path = _socket_path(self.name)
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sock.bind(path)
+        self._thread = threading.Thread(target=self._recv_loop, name=f"Wakeup:{self.name}", daemon=True)
+        self._thread.start()
+        logger.info(f"[TaskWakeup] '{self.name}' listening on {path}")
+
+    def _recv_loop(self) -> None:
+        sock = self._sock
+        while True:
+            try:
+                sock.recv(64)
+            except OSError:
+                return  # socket closed
+            self.notify()
+
+    def close(self) -> None:
+        if self._bus is not None and self._subscription is not None:
+            self._bus.unsubscribe(self._subscription)
+            self._subscription = None
+
+        if self._sock is not None:
+            try:
+                # shutdown() unblocks recv() in the listener thread
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+            self._sock = None
+            try:
+                os.unlink(_socket_path(self.name))
+            except OSError:
+                pass
+
+        # release anyone still blocked in wait()
+        self.notify()